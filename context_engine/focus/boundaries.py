@@ -0,0 +1,293 @@
+"""
+Offline episode boundaries for a recorded event log.
+
+The streaming heuristics (Sessionizer, SessionBuilder, GoalContinuity)
+decide on a boundary the moment they see an event. Here the whole log
+is segmented at once: penalized change-point detection over coalesced
+runs, where a segment costs the negative log-likelihood of its title
+tokens under the segment's own token distribution and every boundary
+costs PENALTY. PELT pruning drops split points that can never be
+optimal again, so on logs that keep changing the search stays close to
+linear in runs; long silences always split, which bounds it elsewhere.
+
+The optimum is exact for the cost, and serves as a reference to score
+the streaming output against (see compare()).
+"""
+
+import argparse
+import math
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from context_engine.runtime.coalesce import coalesce
+from context_engine.runtime.event_bus import EventBus
+from context_engine.runtime.events import EventType
+from context_engine.runtime.loop_detector import LoopDetector
+from context_engine.runtime.replay import ReplayStats, read_events
+from context_engine.runtime.run_runtime import EpisodeController
+from context_engine.runtime.tokenizer import tokenize
+from context_engine.state.event import Event
+
+
+# ---------------- PARAMETERS ----------------
+
+PENALTY = 40.0  # nats a boundary must save to be worth placing
+HARD_GAP = 180.0  # seconds of silence or idle that always split
+TOLERANCE = 60.0  # seconds between two boundaries that still match
+
+
+# ---------------- SEGMENTS ----------------
+
+
+@dataclass
+class Segment:
+    start: float
+    end: float
+    runs: int
+    cost: float
+    tokens: List[str] = field(default_factory=list)  # most frequent first
+
+
+class _Candidate:
+    """
+    A segment starting at run `first`, grown one run at a time, with
+    sum(c log c) over its token counts kept incrementally.
+    """
+
+    __slots__ = ("first", "base", "counts", "total", "clogc")
+
+    def __init__(self, first: int, base: float):
+        self.first = first
+        self.base = base  # optimal cost of everything before `first`
+        self.counts: Dict[str, int] = {}
+        self.total = 0
+        self.clogc = 0.0
+
+    def add(self, tokens: Sequence[str]) -> None:
+        counts = self.counts
+        for t in tokens:
+            c = counts.get(t, 0)
+            counts[t] = c + 1
+            self.clogc += _clogc(c + 1) - _clogc(c)
+        self.total += len(tokens)
+
+    def cost(self) -> float:
+        # multinomial NLL at the maximum-likelihood token distribution
+        n = self.total
+        return n * math.log(n) - self.clogc if n else 0.0
+
+
+def _clogc(c: int) -> float:
+    return c * math.log(c) if c > 1 else 0.0
+
+
+# ---------------- PELT ----------------
+
+
+def _pelt(tokens: List[Sequence[str]], penalty: float) -> List[int]:
+    """
+    Optimal split points (run indices starting a segment, 0 included).
+
+    The cost satisfies C(a, b) + C(b, c) <= C(a, c), so a split point s
+    whose F(s) + C(s, t) exceeds F(t) can be pruned for good.
+    """
+    n = len(tokens)
+    best = [0.0] * (n + 1)
+    best[0] = -penalty
+    prev = [0] * (n + 1)
+
+    candidates = [_Candidate(0, best[0])]
+
+    for t in range(1, n + 1):
+        run = tokens[t - 1]
+
+        scored = []
+        for cand in candidates:
+            cand.add(run)
+            scored.append((cand.base + cand.cost(), cand))
+
+        total, winner = min(scored, key=lambda sc: sc[0])
+        best[t] = total + penalty
+        prev[t] = winner.first
+
+        candidates = [cand for cost, cand in scored if cost <= best[t]]
+        candidates.append(_Candidate(t, best[t]))
+
+    starts = []
+    t = n
+    while t > 0:
+        t = prev[t]
+        starts.append(t)
+    return starts[::-1]
+
+
+def segment(
+    events: Iterable[Event],
+    penalty: Optional[float] = None,
+    hard_gap: Optional[float] = None,
+) -> List[Segment]:
+    """
+    Segments a recorded log. Events must be in timestamp order.
+    """
+    penalty = PENALTY if penalty is None else penalty
+    hard_gap = HARD_GAP if hard_gap is None else hard_gap
+
+    memo: Dict[Tuple[str, str], List[str]] = {}
+    segments: List[Segment] = []
+
+    chunk = []
+    last_ts = None
+
+    def close() -> None:
+        if not chunk:
+            return
+
+        tokens = []
+        for run in chunk:
+            key = (run.app, run.title)
+            found = memo.get(key)
+            if found is None:
+                found = memo[key] = tokenize(f"{run.app} {run.title}")
+            tokens.append(found)
+
+        starts = _pelt(tokens, penalty)
+        for a, b in zip(starts, starts[1:] + [len(chunk)]):
+            cand = _Candidate(a, 0.0)
+            for toks in tokens[a:b]:
+                cand.add(toks)
+
+            top = sorted(cand.counts, key=lambda k: -cand.counts[k])[:4]
+            segments.append(
+                Segment(chunk[a].start_ts, chunk[b - 1].ts, b - a, cand.cost(), top)
+            )
+
+        chunk.clear()
+
+    for run in coalesce(events):
+        if last_ts is not None and (
+            run.start_ts - last_ts > hard_gap or run.first_over(hard_gap) is not None
+        ):
+            close()
+
+        chunk.append(run)
+        last_ts = run.ts
+
+    close()
+    return segments
+
+
+def boundaries(
+    events: Iterable[Event],
+    penalty: Optional[float] = None,
+    hard_gap: Optional[float] = None,
+) -> List[float]:
+    """
+    Start timestamps of the offline segments.
+    """
+    return [s.start for s in segment(events, penalty, hard_gap)]
+
+
+# ---------------- COMPARISON ----------------
+
+
+def streaming_boundaries(events: Iterable[Event]) -> List[float]:
+    """
+    EPISODE_START timestamps of the streaming runtime over the same log.
+    """
+    bus = EventBus()
+    detector = LoopDetector(bus)
+    controller = EpisodeController(bus)
+
+    starts: List[float] = []
+    bus.subscribe(lambda e: starts.append(e.ts), types=(EventType.EPISODE_START,))
+    bus.subscribe(controller, types=EpisodeController.TYPES)
+
+    for event in events:
+        detector.process(event)
+
+    return starts
+
+
+@dataclass
+class BoundaryScore:
+    reference: int
+    predicted: int
+    matched: int
+
+    @property
+    def precision(self) -> float:
+        return self.matched / self.predicted if self.predicted else 0.0
+
+    @property
+    def recall(self) -> float:
+        return self.matched / self.reference if self.reference else 0.0
+
+    @property
+    def f1(self) -> float:
+        p, r = self.precision, self.recall
+        return 2 * p * r / (p + r) if p + r else 0.0
+
+
+def compare(
+    reference: Sequence[float],
+    predicted: Sequence[float],
+    tolerance: Optional[float] = None,
+) -> BoundaryScore:
+    """
+    One-to-one matching of boundary timestamps within tolerance
+    seconds, greedily in time order (both inputs sorted).
+    """
+    tolerance = TOLERANCE if tolerance is None else tolerance
+
+    matched = 0
+    i = j = 0
+    while i < len(reference) and j < len(predicted):
+        d = predicted[j] - reference[i]
+        if abs(d) <= tolerance:
+            matched += 1
+            i += 1
+            j += 1
+        elif d < 0:
+            j += 1
+        else:
+            i += 1
+
+    return BoundaryScore(len(reference), len(predicted), matched)
+
+
+# ---------------- ENTRYPOINT ----------------
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Score streaming episode boundaries against offline segmentation"
+    )
+    parser.add_argument("paths", nargs="+", type=Path)
+    parser.add_argument("--penalty", type=float, default=PENALTY)
+    parser.add_argument("--hard-gap", type=float, default=HARD_GAP)
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    args = parser.parse_args(argv)
+
+    events = list(read_events(args.paths, ReplayStats()))
+
+    started = time.perf_counter()
+    offline = boundaries(events, args.penalty, args.hard_gap)
+    elapsed = time.perf_counter() - started
+
+    streaming = streaming_boundaries(events)
+    score = compare(offline, streaming, args.tolerance)
+
+    print(
+        f"{len(events)} events: {len(offline)} offline segments "
+        f"in {elapsed:.2f}s, {len(streaming)} streaming episodes"
+    )
+    print(
+        f"streaming vs offline: precision {score.precision:.1%} "
+        f"recall {score.recall:.1%} f1 {score.f1:.3f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
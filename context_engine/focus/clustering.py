@@ -0,0 +1,231 @@
+"""
+Groups anchors (and the episodes carrying them) into recurring tasks.
+
+Pairwise token overlap, as IntentBinder.related does for one pair, is
+quadratic over months of anchors. Here each anchor's token set (app
+left out, see anchor_tokens) gets a MinHash signature; LSH banding
+puts anchors that agree on any band of rows into a shared bucket, so
+an insert only verifies the few anchors it collides with. Verified
+pairs are merged with union-find, so clusters grow incrementally as
+episodes arrive.
+"""
+
+import random
+import zlib
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, Iterable, List, Optional, Set
+
+from context_engine.runtime.episode import Episode
+
+
+# ---------------- PARAMETERS ----------------
+
+NUM_PERM = 64  # MinHash permutations
+BANDS = 32  # LSH bands of NUM_PERM // BANDS rows; ~0.18 Jaccard knee
+RELATED_THRESHOLD = 0.35  # same overlap rule as IntentBinder.related
+MAX_BUCKET = 32  # most recent anchors kept per bucket
+MINHASH_SEED = 1
+
+_PRIME = (1 << 61) - 1
+
+
+def _permutations(n: int, seed: int):
+    rng = random.Random(seed)
+    return [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(n)]
+
+
+_PERMS = _permutations(NUM_PERM, MINHASH_SEED)
+
+
+# ---------------- SIGNATURES ----------------
+
+
+def anchor_tokens(anchor: str) -> Set[str]:
+    """
+    Anchors are already normalized, space separated keywords, the
+    first being the app. The app is left out: every anchor of an app
+    shares it, so two short anchors there ("code x", "code y") would
+    pass the overlap rule, and union-find would chain every task in
+    that app into one cluster. An anchor that is only an app matches
+    nothing but itself.
+    """
+    return set(anchor.split()[1:])
+
+
+def minhash(tokens: Iterable[str]) -> List[int]:
+    """
+    crc32 token hashes are stable across processes and runs, unlike
+    hash(str), so signatures can be stored and compared later.
+    """
+    hashes = [zlib.crc32(t.encode("utf-8")) for t in tokens]
+    if not hashes:
+        return []
+    return [min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMS]
+
+
+def overlap(a: Set[str], b: Set[str]) -> float:
+    """
+    IntentBinder's relatedness: shared tokens over the larger set.
+    Always >= Jaccard, which LSH estimates, hence the low band knee.
+    """
+    if not a or not b:
+        return 0.0
+    return len(a & b) / max(len(a), len(b))
+
+
+# ---------------- CLUSTERS ----------------
+
+
+@dataclass
+class AnchorEntry:
+    anchor: str
+    tokens: Set[str]
+    count: int = 1
+
+
+class AnchorClusters:
+    """
+    Incremental MinHash / LSH anchor clustering.
+
+    Identical anchors share one entry. Buckets keep only the
+    MAX_BUCKET most recent entries, so one very common signature can
+    never make an insert scan a large part of the history.
+    """
+
+    def __init__(
+        self,
+        threshold: Optional[float] = None,
+        bands: Optional[int] = None,
+        max_bucket: Optional[int] = None,
+    ):
+        self.threshold = RELATED_THRESHOLD if threshold is None else threshold
+        self.bands = BANDS if bands is None else bands
+        self.rows = NUM_PERM // self.bands
+        self.max_bucket = MAX_BUCKET if max_bucket is None else max_bucket
+
+        self.entries: List[AnchorEntry] = []
+        self.ids: Dict[str, int] = {}
+        self.buckets: Dict[int, Deque[int]] = {}
+
+        # union-find over entry ids
+        self.parent: List[int] = []
+        self.size: List[int] = []
+
+        self.episodes: Dict[int, int] = {}  # episode id -> entry id
+        self.comparisons = 0
+
+    # ---------- INSERT ----------
+
+    def add(self, anchor: str) -> int:
+        """
+        Inserts one anchor; returns its entry id (see cluster()).
+        """
+        i = self.ids.get(anchor)
+        if i is not None:
+            self.entries[i].count += 1
+            return i
+
+        tokens = anchor_tokens(anchor)
+        i = len(self.entries)
+        self.entries.append(AnchorEntry(anchor, tokens))
+        self.ids[anchor] = i
+        self.parent.append(i)
+        self.size.append(1)
+
+        signature = minhash(tokens)
+        if not signature:
+            return i
+
+        seen = set()
+        rows = self.rows
+
+        for band in range(self.bands):
+            key = hash((band, *signature[band * rows : (band + 1) * rows]))
+
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                self.buckets[key] = deque((i,), maxlen=self.max_bucket)
+                continue
+
+            for j in bucket:
+                if j in seen:
+                    continue
+                seen.add(j)
+
+                self.comparisons += 1
+                if overlap(tokens, self.entries[j].tokens) > self.threshold:
+                    self.union(i, j)
+
+            bucket.append(i)
+
+        return i
+
+    def add_episode(self, episode: Episode) -> int:
+        """
+        Inserts every anchor of an episode and merges them: one episode
+        is one task, however far its anchors drifted. Returns the
+        cluster id.
+        """
+        anchors = episode.anchors or [episode.main_anchor]
+
+        first = self.add(anchors[0])
+        for anchor in anchors[1:]:
+            self.union(first, self.add(anchor))
+
+        self.episodes[episode.id] = first
+        return self.find(first)
+
+    # ---------- QUERY ----------
+
+    def cluster(self, anchor: str) -> Optional[int]:
+        i = self.ids.get(anchor)
+        return None if i is None else self.find(i)
+
+    def episode_cluster(self, episode_id: int) -> Optional[int]:
+        i = self.episodes.get(episode_id)
+        return None if i is None else self.find(i)
+
+    def clusters(self, min_size: int = 1) -> Dict[int, List[str]]:
+        """
+        cluster id -> anchors, largest clusters first.
+        """
+        groups: Dict[int, List[str]] = {}
+        for i, entry in enumerate(self.entries):
+            groups.setdefault(self.find(i), []).append(entry.anchor)
+
+        return dict(
+            sorted(
+                ((k, v) for k, v in groups.items() if len(v) >= min_size),
+                key=lambda kv: -len(kv[1]),
+            )
+        )
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    # ---------- UNION-FIND ----------
+
+    def find(self, i: int) -> int:
+        parent = self.parent
+
+        root = i
+        while parent[root] != root:
+            root = parent[root]
+
+        while parent[i] != root:
+            parent[i], i = root, parent[i]
+
+        return root
+
+    def union(self, a: int, b: int) -> int:
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return a
+
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+
+        self.parent[b] = a
+        self.size[a] += self.size[b]
+        return a
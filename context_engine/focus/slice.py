@@ -0,0 +1,253 @@
+"""
+Vectorized CognitiveState metrics over a whole timeline.
+
+The streaming detector recomputes switch frequency, anchor stability
+and title entropy after every event over a sliding time window. Here a
+day of events is loaded into NumPy arrays once and every metric is
+computed for every event in a handful of array passes, with the same
+eviction rule, so values match CognitiveState (entropy to float
+rounding) on timelines with non-decreasing timestamps.
+
+Needs NumPy (the `analysis` extra).
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+from context_engine.runtime.cognitive_state import (
+    CognitiveState,
+    EXECUTING,
+    EXPLORING,
+    IDLE,
+    ORIENTING,
+    VERIFYING,
+)
+from context_engine.state.event import Event
+from context_engine.state.session_store import SessionStore
+
+
+# ---------------- TIMELINE ----------------
+
+
+@dataclass
+class Timeline:
+    """
+    Column arrays of one event log. app / title are integer codes
+    (equal code = equal string); has_title marks non-empty titles.
+    """
+
+    ts: np.ndarray
+    idle: np.ndarray
+    app: np.ndarray
+    title: np.ndarray
+    has_title: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    @classmethod
+    def from_events(cls, events: Iterable[Event]) -> "Timeline":
+        ts, idle, apps, titles = [], [], [], []
+        for e in events:
+            ts.append(e.ts)
+            idle.append(e.idle)
+            apps.append(e.app)
+            titles.append(e.title)
+
+        names, title = np.unique(np.array(titles, dtype=object), return_inverse=True)
+        _, app = np.unique(np.array(apps, dtype=object), return_inverse=True)
+
+        return cls(
+            ts=np.asarray(ts, dtype=np.float64),
+            idle=np.asarray(idle, dtype=np.float64),
+            app=app,
+            title=title,
+            has_title=(names != "")[title],
+        )
+
+    @classmethod
+    def from_store(
+        cls,
+        store: SessionStore,
+        t0: Optional[float] = None,
+        t1: Optional[float] = None,
+    ) -> "Timeline":
+        """
+        Straight from the store's mapped columns; app / title keep the
+        store's string ids. Open the store read_only if the runtime may
+        be writing to it.
+        """
+        parts = list(store.columns(t0, t1))
+
+        def column(name: str, dtype) -> np.ndarray:
+            if not parts:
+                return np.empty(0, dtype=dtype)
+            return np.concatenate(
+                [np.frombuffer(getattr(p, name), dtype=dtype) for p in parts]
+            )
+
+        title = column("title", np.uint32)
+        empty = np.array([s == "" for s in store.strings], dtype=bool)
+
+        return cls(
+            ts=column("ts", np.float64),
+            idle=column("idle", np.float64),
+            app=column("app", np.uint32),
+            title=title,
+            has_title=~empty[title] if len(empty) else np.zeros(len(title), bool),
+        )
+
+
+# ---------------- WINDOW ----------------
+
+
+def window_starts(ts: np.ndarray, window: float) -> np.ndarray:
+    """
+    Index of the oldest event still in the window after each event,
+    using CognitiveState's rule: evict while ts[i] - ts[first] > window.
+    """
+    if np.any(np.diff(ts) < 0):
+        raise ValueError("timeline timestamps must be non-decreasing")
+
+    lo = np.searchsorted(ts, ts - window, side="left")
+
+    # searchsorted compares ts[j] >= ts[i] - window, the detector
+    # compares ts[i] - ts[j] > window; fix the rare rounding mismatch
+    evict = ts - ts[lo] > window
+    lo[evict] = np.searchsorted(ts, ts[lo[evict]], side="right")
+
+    keep = (lo > 0) & ~(ts - ts[np.maximum(lo - 1, 0)] > window)
+    lo[keep] = np.searchsorted(ts, ts[lo[keep] - 1], side="left")
+
+    return lo
+
+
+def _changes(tl: Timeline) -> np.ndarray:
+    """
+    changes[i]: event i starts a new (app, title) context.
+    """
+    changed = np.ones(len(tl), dtype=bool)
+    changed[1:] = (tl.app[1:] != tl.app[:-1]) | (tl.title[1:] != tl.title[:-1])
+    return changed
+
+
+# ---------------- METRICS ----------------
+
+
+def switch_frequency(tl: Timeline, window: Optional[float] = None) -> np.ndarray:
+    window = CognitiveState.WINDOW if window is None else window
+    lo = window_starts(tl.ts, window)
+
+    switches = np.cumsum(_changes(tl))
+    in_window = switches - switches[lo]
+    span = tl.ts - tl.ts[lo]
+
+    size = np.arange(len(tl)) - lo + 1
+    return np.where(size < 2, 0.0, in_window / np.maximum(span, 1))
+
+
+def anchor_stability(tl: Timeline, window: Optional[float] = None) -> np.ndarray:
+    """
+    Seconds since the trailing same-context run began, clipped to the
+    window like the detector's run_first.
+    """
+    window = CognitiveState.WINDOW if window is None else window
+    lo = window_starts(tl.ts, window)
+
+    idx = np.arange(len(tl))
+    run_start = np.maximum.accumulate(np.where(_changes(tl), idx, 0))
+
+    return tl.ts - tl.ts[np.maximum(run_start, lo)]
+
+
+def _clogc(c: np.ndarray) -> np.ndarray:
+    c = c.astype(np.float64)
+    out = np.zeros_like(c)
+    big = c > 1
+    out[big] = c[big] * np.log2(c[big])
+    return out
+
+
+def title_entropy(tl: Timeline, window: Optional[float] = None) -> np.ndarray:
+    """
+    Rolling entropy of non-empty titles, H = log2(n) - sum(c log2 c) / n.
+
+    Every push and eviction is an op of +-1 on one title's count. Ops
+    are stably sorted by title, so a grouped cumsum gives each title's
+    count after every op, hence the change it makes to sum(c log2 c);
+    a cumsum in time order then gives the sum after each event.
+    """
+    window = CognitiveState.WINDOW if window is None else window
+    n = len(tl)
+    lo = window_starts(tl.ts, window)
+    idx = np.arange(n)
+
+    # event j leaves the window at the first step whose start exceeds j
+    leaves = np.searchsorted(lo, idx, side="right")
+
+    adds = idx[tl.has_title]
+    removes = idx[tl.has_title & (leaves < n)]
+
+    step = np.concatenate([adds, leaves[removes]])
+    phase = np.concatenate([np.zeros(len(adds), int), np.ones(len(removes), int)])
+    delta = np.concatenate([np.ones(len(adds), int), -np.ones(len(removes), int)])
+    key = np.concatenate([tl.title[adds], tl.title[removes]])
+
+    # per-title running counts (ops in time order within each title)
+    by_title = np.lexsort((phase, step, key))
+    counts = np.empty(len(step), dtype=np.int64)
+    if len(by_title):
+        d = delta[by_title]
+        running = np.cumsum(d)
+        keys = key[by_title]
+        group_start = np.r_[True, keys[1:] != keys[:-1]]
+        first = np.maximum.accumulate(np.where(group_start, np.arange(len(d)), 0))
+        counts[by_title] = running - (running - d)[first]
+
+    change = _clogc(counts) - _clogc(counts - delta)
+
+    # running sum in time order, read after each event's last op
+    in_time = np.lexsort((phase, step))
+    clogc = np.cumsum(change[in_time])
+    last_op = np.searchsorted(step[in_time], idx, side="right") - 1
+    total_clogc = np.where(last_op >= 0, clogc[np.maximum(last_op, 0)], 0.0)
+
+    titled = np.cumsum(tl.has_title)
+    size = titled - np.where(lo > 0, titled[lo - 1], 0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        h = np.log2(size) - total_clogc / size
+    return np.where(size > 0, np.maximum(h, 0.0), 0.0)
+
+
+# ---------------- STATES ----------------
+
+
+def states(tl: Timeline) -> np.ndarray:
+    """
+    CognitiveState's phase after every event.
+    """
+    stability = anchor_stability(tl)
+    switches = switch_frequency(tl)
+    entropy = title_entropy(tl)
+
+    out = np.full(len(tl), ORIENTING, dtype=object)
+
+    busy = switches > 0.08
+    out[busy & (entropy <= 1.2)] = VERIFYING
+    out[busy & (entropy > 1.2)] = EXPLORING
+    out[(stability > CognitiveState.EXEC_STABLE) & (switches < 0.02)] = EXECUTING
+    out[tl.idle > CognitiveState.IDLE_THRESHOLD] = IDLE
+
+    return out
+
+
+def metrics(tl: Timeline) -> Dict[str, np.ndarray]:
+    return {
+        "switch_frequency": switch_frequency(tl),
+        "anchor_stability": anchor_stability(tl),
+        "title_entropy": title_entropy(tl),
+        "state": states(tl),
+    }
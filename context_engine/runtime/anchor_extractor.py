@@ -1,45 +1,6 @@
-import re
 from dataclasses import dataclass
 
-
-STOP_WORDS = {
-    "youtube",
-    "google",
-    "search",
-    "stackoverflow",
-    "github",
-    "docs",
-    "documentation",
-    "home",
-    "watch",
-    "video",
-    "player",
-}
-
-
-def normalize(text: str) -> str:
-    text = text.lower()
-
-    # remove urls & separators
-    text = re.sub(r"https?://\S+", "", text)
-    text = re.sub(r"[-–—|•·]", " ", text)
-
-    # remove punctuation
-    text = re.sub(r"[^\w\s]", "", text)
-
-    # collapse spaces
-    text = re.sub(r"\s+", " ", text).strip()
-
-    return text
-
-
-def extract_keywords(title: str):
-    title = normalize(title)
-
-    words = [w for w in title.split() if len(w) > 2 and w not in STOP_WORDS]
-
-    # keep top 4 words only (working memory constraint)
-    return tuple(words[:4])
+from .tokenizer import TOKENIZER, STOP_WORDS, normalize, extract_keywords
 
 
 @dataclass(frozen=True)
@@ -52,7 +13,12 @@ class Anchor:
 
 
 def extract_anchor(event):
-    tokens = extract_keywords(event.title)
+    # runtime.features.Features records carry theirs
+    anchor = getattr(event, "anchor", None)
+    if anchor is not None:
+        return anchor
+
+    tokens = TOKENIZER.title(event.app, event.title).keywords
 
     if not tokens:
         tokens = (event.app.lower(),)
@@ -0,0 +1,254 @@
+import argparse
+import asyncio
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+from ..state.event import Event
+from .metrics import Metrics, serve
+from .replay import parse_line
+from .run_runtime import LOG_CMD, Persistence, build_runtime
+from .stream import AGENT_PATH
+
+
+# -------- PARAMETERS --------
+
+QUEUE_SIZE = 64  # batches waiting for detection
+BATCH_SIZE = 512  # max events per batch
+READ_CHUNK = 1 << 16  # bytes per pipe read
+
+BLOCK = "block"  # stop reading; the producer blocks on a full pipe
+DROP_NEWEST = "drop_newest"  # discard the incoming batch
+DROP_OLDEST = "drop_oldest"  # discard the oldest queued batch
+DROP_POLICIES = (BLOCK, DROP_NEWEST, DROP_OLDEST)
+
+
+@dataclass
+class IngestStats:
+    lines: int = 0
+    events: int = 0
+    batches: int = 0
+    dropped_batches: int = 0
+    dropped_events: int = 0
+    max_depth: int = 0
+
+
+# -------- PIPELINE --------
+
+
+class AsyncRuntime:
+    """
+    asyncio ingestion in front of the detector.
+
+    The reader coroutine drains the subprocess pipe in chunks, parses
+    whatever lines arrived as one batch and queues it. Batches grow with
+    load: one line when idle, up to batch_size under bursts.
+
+    Detection runs in a worker thread, one batch at a time, so a slow
+    listener delays detection but never stops the pipe from being read.
+    When the queue is full, drop_policy decides between backpressure
+    (block) and shedding load (drop_newest / drop_oldest).
+    """
+
+    def __init__(
+        self,
+        cmd: Sequence[str] = tuple(LOG_CMD),
+        queue_size: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        drop_policy: str = BLOCK,
+        record: bool = True,
+        queued_output: bool = False,
+        metrics: Optional[Metrics] = None,
+    ):
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"unknown drop policy {drop_policy!r}")
+
+        self.cmd = list(cmd)
+        self.queue_size = QUEUE_SIZE if queue_size is None else queue_size
+        self.batch_size = BATCH_SIZE if batch_size is None else batch_size
+        self.drop_policy = drop_policy
+
+        self.bus, self.detector, self.controller, labeler = build_runtime(
+            queued_output
+        )
+        self.persistence = Persistence(
+            self.bus, self.detector, self.controller, labeler, record
+        )
+
+        self.stats = IngestStats()
+        self.metrics = metrics
+
+        # the batch being processed in the worker thread
+        self.in_flight: Optional[asyncio.Future] = None
+
+    # ---------- READ ----------
+
+    async def read(self, stdout: asyncio.StreamReader, queue: asyncio.Queue):
+        pending = b""
+
+        while True:
+            chunk = await stdout.read(READ_CHUNK)
+            if not chunk:
+                break
+
+            lines = (pending + chunk).split(b"\n")
+            pending = lines.pop()
+
+            await self.enqueue(queue, self.parse(lines))
+
+        if pending:
+            await self.enqueue(queue, self.parse([pending]))
+
+        await queue.put(None)
+
+    def parse(self, lines: List[bytes]) -> List[Event]:
+        self.stats.lines += len(lines)
+
+        events = []
+        for raw in lines:
+            event = parse_line(raw.decode("utf-8", errors="replace"))
+            if event is not None:
+                events.append(event)
+
+        self.stats.events += len(events)
+        return events
+
+    async def enqueue(self, queue: asyncio.Queue, events: List[Event]):
+        size = self.batch_size
+
+        for i in range(0, len(events), size):
+            batch = events[i : i + size]
+
+            if queue.full():
+                if self.drop_policy == DROP_NEWEST:
+                    self._dropped(batch)
+                    continue
+
+                if self.drop_policy == DROP_OLDEST:
+                    self._dropped(queue.get_nowait())
+                    queue.task_done()
+
+            # BLOCK: waits here, so the pipe stops being drained
+            await queue.put(batch)
+
+            self.stats.batches += 1
+            self.stats.max_depth = max(self.stats.max_depth, queue.qsize())
+
+    def _dropped(self, batch: List[Event]):
+        self.stats.dropped_batches += 1
+        self.stats.dropped_events += len(batch)
+
+    # ---------- DETECT ----------
+
+    def process_batch(self, batch: List[Event]):
+        process = self.detector.process
+        record = self.persistence.record
+
+        for event in batch:
+            record(event)
+            process(event)
+
+        self.persistence.maybe_save()
+
+    async def detect(self, queue: asyncio.Queue):
+        while True:
+            batch = await queue.get()
+            if batch is None:
+                queue.task_done()
+                return
+
+            # shielded: cancelling detect() cannot stop the thread, so
+            # the batch keeps running and run() waits for it on exit
+            self.in_flight = asyncio.ensure_future(
+                asyncio.to_thread(self.process_batch, batch)
+            )
+            await asyncio.shield(self.in_flight)
+            queue.task_done()
+
+    # ---------- RUN ----------
+
+    async def run(self):
+        self.persistence.restore()
+
+        # after restore, which replaces the instrumented sub-objects
+        if self.metrics is not None:
+            self.metrics.instrument(self.bus, self.detector, self.controller)
+
+        proc = await asyncio.create_subprocess_exec(
+            *self.cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+
+        print("Context runtime connected to agent (asyncio)\n")
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+
+        try:
+            assert proc.stdout is not None
+            await asyncio.gather(self.read(proc.stdout, queue), self.detect(queue))
+
+        finally:
+            if proc.returncode is None:
+                proc.terminate()
+                await proc.wait()
+
+            # never snapshot or close under a half-applied batch
+            if self.in_flight is not None:
+                await asyncio.wait([self.in_flight])
+
+            self.persistence.close()
+            self.bus.close()
+
+
+# -------- ENTRYPOINT --------
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="asyncio cognitive runtime")
+    parser.add_argument("--queue-size", type=int, default=QUEUE_SIZE)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--drop-policy", choices=DROP_POLICIES, default=BLOCK)
+    parser.add_argument(
+        "--agent",
+        action="store_true",
+        help="read the agent's pipe-delimited stdout instead of `log stream`",
+    )
+    parser.add_argument("--no-record", action="store_true")
+    parser.add_argument(
+        "--queued-output",
+        action="store_true",
+        help="print events from a worker thread instead of the detector thread",
+    )
+    parser.add_argument("--metrics-port", type=int, help="serve /metrics on localhost")
+    args = parser.parse_args(argv)
+
+    metrics = None
+    if args.metrics_port is not None:
+        metrics = Metrics()
+        serve(metrics, args.metrics_port)
+
+    runtime = AsyncRuntime(
+        cmd=[str(AGENT_PATH)] if args.agent else LOG_CMD,
+        queue_size=args.queue_size,
+        batch_size=args.batch_size,
+        drop_policy=args.drop_policy,
+        record=not args.no_record,
+        queued_output=args.queued_output,
+        metrics=metrics,
+    )
+
+    try:
+        asyncio.run(runtime.run())
+    except KeyboardInterrupt:
+        print("\nStopping context runtime...")
+
+    s = runtime.stats
+    print(
+        f"{s.events} events in {s.batches} batches, "
+        f"max queue depth {s.max_depth}, "
+        f"dropped {s.dropped_events} events ({s.dropped_batches} batches)"
+    )
+
+
+if __name__ == "__main__":
+    main()
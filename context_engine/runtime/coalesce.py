@@ -0,0 +1,120 @@
+from array import array
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional
+
+from ..state.event import Event
+
+
+# ---------------- PARAMETERS ----------------
+
+# runs longer than this are emitted in pieces, which bounds how long a
+# consumer waits for a run and how far a run overhangs a time window
+MAX_RUN_SPAN = 10.0
+
+
+# ---------------- RUN RECORD ----------------
+
+
+@dataclass(slots=True)
+class EventRun:
+    """
+    Consecutive events with the same (app, title).
+
+    ts / idle are the last sample, so code reading an Event's fields
+    sees the run as its most recent event; stamps / idles keep every
+    sample's timestamp and idle reading.
+    """
+
+    start_ts: float
+    ts: float
+    app: str
+    title: str
+    idle: float
+    stamps: array
+    idles: array
+
+    @classmethod
+    def start(cls, e: Event) -> "EventRun":
+        return cls(
+            e.ts,
+            e.ts,
+            e.app,
+            e.title,
+            e.idle,
+            array("d", (e.ts,)),
+            array("d", (e.idle,)),
+        )
+
+    def add(self, ts: float, idle: float) -> None:
+        self.ts = ts
+        self.idle = idle
+        self.stamps.append(ts)
+        self.idles.append(idle)
+
+    @property
+    def count(self) -> int:
+        return len(self.stamps)
+
+    def events(self) -> Iterator[Event]:
+        for ts, idle in zip(self.stamps, self.idles):
+            yield Event(ts, self.app, self.title, idle)
+
+    def first_over(self, idle: float) -> Optional[float]:
+        """
+        Timestamp of the first sample idle for longer than idle.
+        """
+        for ts, value in zip(self.stamps, self.idles):
+            if value > idle:
+                return ts
+        return None
+
+
+# ---------------- COALESCER ----------------
+
+
+class Coalescer:
+    """
+    Pipeline stage in front of the detectors: collapses consecutive
+    events with identical (app, title) into one EventRun.
+
+    feed() returns the previous run once a different context (or
+    max_span) closes it; flush() returns the open run at end of input.
+    """
+
+    def __init__(self, max_span: Optional[float] = None):
+        self.max_span = MAX_RUN_SPAN if max_span is None else max_span
+        self.run: Optional[EventRun] = None
+
+    def feed(self, e: Event) -> Optional[EventRun]:
+        run = self.run
+
+        if (
+            run is not None
+            and e.app == run.app
+            and e.title == run.title
+            and e.ts - run.start_ts <= self.max_span
+        ):
+            run.add(e.ts, e.idle)
+            return None
+
+        self.run = EventRun.start(e)
+        return run
+
+    def flush(self) -> Optional[EventRun]:
+        run, self.run = self.run, None
+        return run
+
+
+def coalesce(
+    events: Iterable[Event], max_span: Optional[float] = None
+) -> Iterator[EventRun]:
+    coalescer = Coalescer(max_span)
+
+    for e in events:
+        run = coalescer.feed(e)
+        if run is not None:
+            yield run
+
+    run = coalescer.flush()
+    if run is not None:
+        yield run
@@ -1,5 +1,8 @@
-from collections import deque, Counter
-from dataclasses import dataclass
+from typing import Optional
+
+from ..state.event import Event
+from .features import Features
+from .window_stats import WindowStats
 
 WINDOW = 40
 START_THRESHOLD = 8
@@ -7,23 +10,18 @@ STABLE = 0.6
 BREAK = 0.35
 
 
-@dataclass
-class Event:
-    ts: float
-    app: str
-    title: str
-    idle: float
-
-
 class CognitiveSession:
 
     def __init__(self):
-        self.events = deque(maxlen=WINDOW)
+        self.window = WindowStats()
+        self.events = self.window.events
         self.active = False
         self.start_ts = None
 
-    def process(self, e: Event):
-        self.events.append(e)
+    def process(self, e: Event, changed: Optional[bool] = None):
+        self.window.push(e, changed)
+        if len(self.window) > WINDOW:
+            self.window.popleft()
 
         if len(self.events) < START_THRESHOLD:
             return
@@ -40,18 +38,11 @@ class CognitiveSession:
             print(f"[SESSION END] {duration:.1f}s instability")
             self.active = False
 
-    def _stability(self):
-        transitions = Counter()
+    def process_features(self, f: Features):
+        """
+        process() on a FeatureExtractor record, reusing its context change.
+        """
+        self.process(f, f.changed)
 
-        prev = None
-        for e in self.events:
-            if prev:
-                transitions[(prev, e.app)] += 1
-            prev = e.app
-
-        if not transitions:
-            return 0
-
-        dominant = transitions.most_common(1)[0][1]
-        total = sum(transitions.values())
-        return dominant / total
+    def _stability(self):
+        return self.window.dominant_share()
@@ -1,6 +1,9 @@
-from collections import deque, Counter
-from dataclasses import dataclass
-from math import log2
+from typing import Optional
+
+from ..state.event import Event
+from .coalesce import EventRun
+from .features import Features
+from .window_stats import WindowStats
 
 # -------- States --------
 ORIENTING = "ORIENTING"
@@ -10,14 +13,6 @@ VERIFYING = "VERIFYING"
 IDLE = "IDLE"
 
 
-@dataclass
-class Event:
-    ts: float
-    app: str
-    title: str
-    idle: float
-
-
 class CognitiveState:
     """
     Streaming cognitive phase detector.
@@ -29,76 +24,58 @@ class CognitiveState:
     IDLE_THRESHOLD = 20  # idle cutoff
 
     def __init__(self):
-        self.events = deque()
+        self.window = WindowStats()
+        self.events = self.window.events
         self.last_state = None
 
     # ---------- PUBLIC ----------
 
-    def process(self, event: Event):
-        self._add_event(event)
+    def process(self, event: Event, changed: Optional[bool] = None):
+        self._add_event(event, changed)
         state = self._infer_state()
 
         if state != self.last_state:
             print(f"[STATE] {state}")
             self.last_state = state
 
+    def process_features(self, f: Features):
+        """
+        process() on a FeatureExtractor record, reusing its context change.
+        """
+        self.process(f, f.changed)
+
+    def process_run(self, run: EventRun):
+        """
+        A coalesced run is one window entry weighted by its sample
+        count, evicted sample by sample, so the metrics and the state
+        after the run are the ones its last sample would give. The
+        state is inferred once, so changes inside the run go unprinted.
+        """
+        self.process(run)
+
     # ---------- INTERNAL ----------
 
-    def _add_event(self, event):
-        self.events.append(event)
+    def _add_event(self, event, changed: Optional[bool] = None):
+        window = self.window
+        window.push(event, changed)
 
-        # remove old events outside window
-        while self.events and event.ts - self.events[0].ts > self.WINDOW:
-            self.events.popleft()
+        # remove old samples outside window
+        while window.events and event.ts - window.first_ts() > self.WINDOW:
+            window.pop_sample()
 
     # ---------- METRICS ----------
 
     def _switch_frequency(self):
-        if len(self.events) < 2:
+        if len(self.window) < 2:
             return 0
 
-        switches = 0
-        prev = self.events[0].app + self.events[0].title
-
-        for e in list(self.events)[1:]:
-            cur = e.app + e.title
-            if cur != prev:
-                switches += 1
-            prev = cur
-
-        duration = self.events[-1].ts - self.events[0].ts
-        return switches / max(duration, 1)
+        return self.window.switches / max(self.window.span(), 1)
 
     def _anchor_stability(self):
-        if not self.events:
-            return 0
-
-        last = self.events[-1]
-        anchor = last.app + last.title
-
-        stable_time = 0
-        for e in reversed(self.events):
-            if e.app + e.title == anchor:
-                stable_time = last.ts - e.ts
-            else:
-                break
-
-        return stable_time
+        return self.window.run_duration()
 
     def _title_entropy(self):
-        titles = [e.title for e in self.events if e.title]
-        if not titles:
-            return 0
-
-        counts = Counter(titles)
-        total = len(titles)
-
-        entropy = 0
-        for c in counts.values():
-            p = c / total
-            entropy -= p * log2(p)
-
-        return entropy
+        return self.window.title_entropy()
 
     # ---------- STATE MACHINE ----------
 
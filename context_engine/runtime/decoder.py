@@ -0,0 +1,78 @@
+import json
+from dataclasses import dataclass
+from typing import Iterable, List, Optional
+
+
+@dataclass
+class DecodeStats:
+    lines: int = 0
+    decoded: int = 0
+    no_payload: int = 0  # no '{' on the line
+    malformed: int = 0  # a '{' that does not start a JSON object
+
+
+class LineDecoder:
+    """
+    Pulls the JSON payload out of `log stream` lines.
+
+    The payload is located with one find("{") and decoded in place with
+    JSONDecoder.raw_decode, which stops at the end of the object, so
+    nested objects and braces inside strings decode correctly and the
+    line is scanned once. Trailing text after the object is ignored.
+    """
+
+    def __init__(self):
+        self.raw_decode = json.JSONDecoder().raw_decode
+        self.stats = DecodeStats()
+
+    def decode(self, line: str) -> Optional[dict]:
+        stats = self.stats
+        stats.lines += 1
+
+        start = line.find("{")
+        if start < 0:
+            stats.no_payload += 1
+            return None
+
+        try:
+            data, _ = self.raw_decode(line, start)
+        except json.JSONDecodeError:
+            stats.malformed += 1
+            return None
+
+        stats.decoded += 1
+        return data
+
+    def decode_batch(self, lines: Iterable[str]) -> List[dict]:
+        """
+        Payloads of every decodable line, in order; the rest are only
+        counted.
+        """
+        raw_decode = self.raw_decode
+        error = json.JSONDecodeError
+
+        out = []
+        n = no_payload = malformed = 0
+
+        for line in lines:
+            n += 1
+            start = line.find("{")
+            if start < 0:
+                no_payload += 1
+                continue
+
+            try:
+                out.append(raw_decode(line, start)[0])
+            except error:
+                malformed += 1
+
+        stats = self.stats
+        stats.lines += n
+        stats.no_payload += no_payload
+        stats.malformed += malformed
+        stats.decoded += len(out)
+        return out
+
+
+# shared by run_runtime.extract_json and replay
+DECODER = LineDecoder()
@@ -1,7 +1,9 @@
 from dataclasses import dataclass, field
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from time import time
 
+from .events import CognitiveEvent, EventType
+
 
 @dataclass
 class Episode:
@@ -22,3 +24,120 @@ class Episode:
 
     def duration(self):
         return self.last_ts - self.start_ts
+
+
+# ---------------- FOLLOWER ----------------
+
+
+class EpisodeFollower:
+    """
+    Base for bus listeners that follow EpisodeController's episodes
+    (attach with types=TYPES). Subclasses get on_start for each
+    EPISODE_START, on_loop for every later LOOP_START of the episode,
+    on_suspend and on_end.
+
+    EpisodeController emits EPISODE_END / START while handling the
+    LOOP_START that caused them, so depending on subscription order
+    that LOOP_START arrives just before or just after them. It is the
+    episode's opening anchor, already carried by START, so it never
+    reaches on_loop: a LOOP_START is held until the next event to find
+    out whether it opened an episode.
+    """
+
+    TYPES = (
+        EventType.LOOP_START,
+        EventType.SUSPEND,
+        EventType.EPISODE_START,
+        EventType.EPISODE_END,
+    )
+
+    def __init__(self):
+        self.current: Optional[int] = None  # open episode id
+        self.pending: Optional[CognitiveEvent] = None  # held LOOP_START
+        self.opening: Optional[Tuple[float, str]] = None  # awaited LOOP_START
+
+    def __call__(self, event: CognitiveEvent):
+        kind = event.type
+
+        opening, self.opening = self.opening, None
+        if kind == EventType.LOOP_START and opening == (event.ts, event.anchor):
+            return
+
+        # a held loop at the time of a boundary caused it
+        if self.pending is not None and not (
+            kind in (EventType.EPISODE_END, EventType.EPISODE_START)
+            and self.pending.ts == event.ts
+        ):
+            self.release()
+
+        if kind == EventType.LOOP_START:
+            self.pending = event
+
+        elif kind == EventType.EPISODE_END:
+            self._end(event.ts)
+
+        elif kind == EventType.EPISODE_START:
+            self._end(event.ts)
+            self.current = event.episode_id
+            self.on_start(event)
+
+            if self.pending is not None:
+                self.pending = None
+            else:
+                self.opening = (event.ts, event.anchor)
+
+        elif kind == EventType.SUSPEND and self.current is not None:
+            self.on_suspend(event)
+
+    def release(self) -> None:
+        """
+        Hands a held LOOP_START to the open episode now.
+        """
+        loop, self.pending = self.pending, None
+        if loop is not None and loop.anchor and self.current is not None:
+            self.on_loop(loop)
+
+    def resume(self, controller) -> None:
+        """
+        Picks up the episode a restored EpisodeController continues (see
+        state.snapshot). Call after the restore, before any event.
+        """
+        if controller.current_episode is None:
+            return
+
+        self.current = controller.current_episode
+        self.on_resume(
+            CognitiveEvent(
+                ts=controller.goal.episode_start_ts,
+                type=EventType.EPISODE_START,
+                anchor=controller.current_anchor,
+                episode_id=controller.current_episode,
+            )
+        )
+
+    # ---------- HOOKS ----------
+
+    def on_start(self, event: CognitiveEvent) -> None:
+        pass
+
+    def on_loop(self, event: CognitiveEvent) -> None:
+        pass
+
+    def on_suspend(self, event: CognitiveEvent) -> None:
+        pass
+
+    def on_end(self, ts: float) -> None:
+        pass
+
+    def on_resume(self, event: CognitiveEvent) -> None:
+        """
+        The EPISODE_START of the resumed episode, as it was emitted.
+        """
+        self.on_start(event)
+
+    # ---------- INTERNAL ----------
+
+    def _end(self, ts: float) -> None:
+        if self.current is not None:
+            self.on_end(ts)
+            self.current = None
@@ -1,36 +1,133 @@
-from typing import Callable, List
+import queue
+import threading
+import traceback
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 from .events import CognitiveEvent, EventType
 
 
+Listener = Callable[[CognitiveEvent], None]
+
+QUEUED_MAXSIZE = 10000  # events buffered per queued listener
+
+_STOP = object()
+
+
+class QueuedListener:
+    """
+    Runs a slow sink on its own worker thread. The emitter only pays for
+    a queue put; the put blocks once maxsize events are waiting, so a
+    stuck sink applies backpressure instead of growing without bound.
+    """
+
+    def __init__(self, fn: Listener, maxsize: int = QUEUED_MAXSIZE):
+        self.fn = fn
+        self.queue: queue.Queue = queue.Queue(maxsize)
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def __call__(self, event: CognitiveEvent):
+        self.queue.put(event)
+
+    def _run(self):
+        while True:
+            event = self.queue.get()
+            if event is _STOP:
+                return
+
+            try:
+                self.fn(event)
+            except Exception:
+                traceback.print_exc()
+
+    def close(self):
+        # drains everything queued before the stop marker
+        self.queue.put(_STOP)
+        self.thread.join()
+
+
 class EventBus:
 
     def __init__(self):
-        self.listeners: List[Callable[[CognitiveEvent], None]] = []
+        # (listener, types or None for all), in subscription order
+        self.subscriptions: List[Tuple[Listener, Optional[frozenset]]] = []
 
-    def subscribe(self, fn: Callable[[CognitiveEvent], None]):
-        self.listeners.append(fn)
+        # event type -> listeners; only types somebody listens to
+        self.routes: Dict[EventType, Tuple[Listener, ...]] = {}
+
+    def subscribe(
+        self,
+        fn: Listener,
+        types: Optional[Iterable[EventType]] = None,
+        queued: bool = False,
+    ) -> Listener:
+        """
+        types limits delivery to those event types (default: all).
+        queued dispatches on a worker thread. Returns the registered
+        listener, which is what unsubscribe() expects.
+        """
+        if queued:
+            fn = QueuedListener(fn)
+
+        self.subscriptions.append((fn, None if types is None else frozenset(types)))
+        self._rebuild()
+        return fn
+
+    def unsubscribe(self, fn: Listener):
+        self.subscriptions = [s for s in self.subscriptions if s[0] is not fn]
+        self._rebuild()
+
+        if isinstance(fn, QueuedListener):
+            fn.close()
+
+    def wants(self, type: EventType) -> bool:
+        return type in self.routes
 
     def emit(self, event: CognitiveEvent):
-        for l in self.listeners:
+        for l in self.routes.get(event.type, ()):
             l(event)
 
+    def close(self):
+        """
+        Drains and stops queued listeners.
+        """
+        for fn, _ in self.subscriptions:
+            if isinstance(fn, QueuedListener):
+                fn.close()
+
+    def _rebuild(self):
+        routes = {}
+        for t in EventType:
+            listeners = tuple(
+                fn for fn, types in self.subscriptions if types is None or t in types
+            )
+            if listeners:
+                routes[t] = listeners
+        self.routes = routes
+
     # -------- cognitive --------
 
     def emit_loop_start(self, ts, anchor):
-        self.emit(CognitiveEvent(ts, EventType.LOOP_START, anchor=anchor))
+        if EventType.LOOP_START in self.routes:
+            self.emit(CognitiveEvent(ts, EventType.LOOP_START, anchor=anchor))
 
     def emit_phase(self, ts, phase):
-        self.emit(CognitiveEvent(ts, EventType.PHASE, phase=phase))
+        if EventType.PHASE in self.routes:
+            self.emit(CognitiveEvent(ts, EventType.PHASE, phase=phase))
 
     def emit_suspend(self, ts):
-        self.emit(CognitiveEvent(ts, EventType.SUSPEND))
+        if EventType.SUSPEND in self.routes:
+            self.emit(CognitiveEvent(ts, EventType.SUSPEND))
 
     def emit_reentry(self, ts, verdict):
-        self.emit(CognitiveEvent(ts, EventType.REENTRY, verdict=verdict))
+        if EventType.REENTRY in self.routes:
+            self.emit(CognitiveEvent(ts, EventType.REENTRY, verdict=verdict))
 
     # -------- episodes --------
 
     def emit_episode_start(self, ep):
+        if EventType.EPISODE_START not in self.routes:
+            return
+
         self.emit(
             CognitiveEvent(
                 ts=ep.start_ts,
@@ -41,6 +138,9 @@ class EventBus:
         )
 
     def emit_episode_end(self, ep):
+        if EventType.EPISODE_END not in self.routes:
+            return
+
         self.emit(
             CognitiveEvent(
                 ts=ep.last_ts,
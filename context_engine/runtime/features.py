@@ -0,0 +1,145 @@
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+from ..state.event import Event
+from .anchor_extractor import Anchor
+from .tokenizer import TOKENIZER, TitleTokens
+from .vocab import VOCAB
+
+
+# ---------------- PARAMETERS ----------------
+
+RESET_DROP = 1.5  # idle drop (seconds) that counts as the user coming back
+RESET_IDLE = 0.3  # ... provided idle is now below this
+DETACHED_IDLE = 20  # idle above this is a detached sample
+
+ACTIVE = "ACTIVE"
+PASSIVE = "PASSIVE"
+DETACHED = "DETACHED"
+
+
+def idle_reset(prev_idle: Optional[float], idle: float) -> bool:
+    if prev_idle is None:
+        return False
+    return (prev_idle - idle) > RESET_DROP and idle < RESET_IDLE
+
+
+def micro_state(idle: float, reset: bool) -> str:
+    if idle > DETACHED_IDLE:
+        return DETACHED
+    if reset:
+        return ACTIVE
+    return PASSIVE
+
+
+# ---------------- FEATURES ----------------
+
+
+@dataclass(slots=True)
+class Features:
+    """
+    One event plus everything detectors derive from it.
+
+    Carries ts / app / title / idle (and start_ts / count, as a run of
+    one), so detectors written against Event accept it unchanged.
+    """
+
+    ts: float
+    app: str
+    title: str
+    idle: float
+
+    key: Tuple[str, str]  # (app, title)
+
+    # comparisons with the previous event; all None on a stream's first
+    # event, which has none, so consumers fall back to their own state
+    changed: Optional[bool]  # key differs from the previous event's
+    gap: Optional[float]  # seconds since the previous event
+    reset: Optional[bool]  # idle reset: the user just came back
+    micro: Optional[str]  # ACTIVE / PASSIVE / DETACHED
+
+    text: TitleTokens  # semantic text, token ids, keywords
+    anchor: Anchor
+
+    @property
+    def start_ts(self) -> float:
+        return self.ts
+
+    @property
+    def count(self) -> int:
+        return 1
+
+
+class FeatureExtractor:
+    """
+    Computes Features for consecutive events of one stream. While the
+    (app, title) stays the same its tokens and anchor are reused, unless
+    the vocabulary rolled over a generation meanwhile.
+    """
+
+    def __init__(self):
+        self.prev: Optional[Features] = None
+        self.generation = VOCAB.generation
+
+    def extract(self, e: Event) -> Features:
+        prev = self.prev
+        key = (e.app, e.title)
+
+        if prev is None:
+            changed, gap, reset, micro = None, None, None, None
+        else:
+            changed = key != prev.key
+            gap = e.ts - prev.ts
+            reset = idle_reset(prev.idle, e.idle)
+            micro = micro_state(e.idle, reset)
+
+        if prev is None or changed or self.generation != VOCAB.generation:
+            self.generation = VOCAB.generation
+            text = TOKENIZER.title(e.app, e.title)
+            anchor = Anchor(e.app, text.keywords or (e.app.lower(),))
+        else:
+            text, anchor = prev.text, prev.anchor
+
+        f = Features(
+            e.ts, e.app, e.title, e.idle, key, changed, gap, reset, micro, text, anchor
+        )
+        self.prev = f
+        return f
+
+
+# ---------------- PIPELINE ----------------
+
+
+class FeaturePipeline:
+    """
+    Feature extraction once per event, fanned out to every detector.
+
+        pipeline = FeaturePipeline()
+        pipeline.subscribe(detector.process_features)
+        pipeline.subscribe(state.process_features)
+        pipeline.process(event)
+
+    Consumers are called in subscription order with the same record,
+    and must see every record of the stream: they take changed / gap
+    as relative to the last record they saw. LoopDetector reads the
+    tokens, reset and micro-state; CognitiveState, CognitiveSession
+    and Sessionizer the context change; SessionBuilder the gap;
+    extract_anchor returns the record's anchor.
+    """
+
+    def __init__(self, extractor: Optional[FeatureExtractor] = None):
+        self.extractor = extractor or FeatureExtractor()
+        self.consumers: List[Callable[[Features], None]] = []
+
+    def subscribe(self, fn: Callable[[Features], None]) -> Callable:
+        self.consumers.append(fn)
+        return fn
+
+    def unsubscribe(self, fn: Callable[[Features], None]) -> None:
+        self.consumers.remove(fn)
+
+    def process(self, e: Event) -> Features:
+        f = self.extractor.extract(e)
+        for fn in self.consumers:
+            fn(f)
+        return f
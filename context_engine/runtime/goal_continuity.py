@@ -1,11 +1,17 @@
-from collections import Counter
-from typing import List, Optional
+from typing import Dict, Optional, Set, Tuple
 import math
 
+from .tokenizer import TOKENIZER
+
 
 # ---------------- PARAMETERS ----------------
 
 GOAL_MEMORY = 60
+GOAL_DECAY = 0.85  # applied to every goal token once memory exceeds GOAL_MEMORY
+GOAL_FORGET = 1e-3  # decayed weight below which a goal token is dropped
+
+# weights are stored divided by `scale`; fold it back in before it underflows
+RESCALE_LIMIT = 1e-6
 
 BASE_SILENCE_DECAY = 0.6
 OVERLAP_REINFORCE = 1.2
@@ -20,17 +26,35 @@ NEW_EPISODE_THRESHOLD = 0.40
 # ---------------- TOKENIZE ----------------
 
 
-def tokenset(text: str) -> List[str]:
-    return [t for t in text.lower().split() if len(t) > 2]
+Tokens = Tuple[str, ...]
+
+
+def tokenset(text: str) -> Tokens:
+    return TOKENIZER.goal_tokens(text)
 
 
 # ---------------- GOAL CONTINUITY ----------------
 
 
 class GoalContinuity:
+    """
+    Goal memory is decayed lazily: a token's weight is its stored value
+    times `scale`, and `total` keeps the sum of stored values, so a
+    decay step is one multiplication and is_same_goal never iterates
+    the memory. Tokens decayed below GOAL_FORGET lose their weight when
+    scale is folded back, but stay in `seen`: specialization still
+    counts only tokens never seen in the episode.
+
+    An episode can outlast the vocabulary generation of its first
+    tokens, so goal memory is keyed by token string, not interned id.
+    """
 
     def __init__(self):
-        self.goal_tokens = Counter()
+        # token -> weight / scale
+        self.goal_tokens: Dict[str, float] = {}
+        self.scale: float = 1.0
+        self.total: float = 0.0
+        self.seen: Set[str] = set()
 
         self.last_anchor: Optional[str] = None
         self.last_app: Optional[str] = None
@@ -102,8 +126,11 @@ class GoalContinuity:
 
     # ---------- INTERNAL ----------
 
-    def _start_new_episode(self, app: str, anchor: str, tokens: List[str], ts: float):
+    def _start_new_episode(self, app: str, anchor: str, tokens: Tokens, ts: float):
         self.goal_tokens.clear()
+        self.scale = 1.0
+        self.total = 0.0
+        self.seen.clear()
         self.goal_strength = 1.0
         self.loop_count = 1
         self.research_hops = 0
@@ -115,20 +142,38 @@ class GoalContinuity:
 
         self._absorb(tokens)
 
-    def _overlap_score(self, tokens: List[str]) -> float:
-        shared = sum(self.goal_tokens[t] for t in tokens if t in self.goal_tokens)
-        total = sum(self.goal_tokens.values()) + 1
+    def _overlap_score(self, tokens: Tokens) -> float:
+        goal = self.goal_tokens
+        shared = sum(goal[t] for t in tokens if t in goal) * self.scale
+        total = self.total * self.scale + 1
         return shared / total
 
-    def _specialization_score(self, tokens: List[str]) -> float:
-        new_tokens = [t for t in tokens if t not in self.goal_tokens]
+    def _specialization_score(self, tokens: Tokens) -> float:
+        new_tokens = [t for t in tokens if t not in self.seen]
         return math.tanh(len(new_tokens) / 6)
 
-    def _absorb(self, tokens: List[str]):
+    def _absorb(self, tokens: Tokens):
+        goal = self.goal_tokens
+        w = 1.0 / self.scale
+
         for t in tokens:
-            self.goal_tokens[t] += 1
+            goal[t] = goal.get(t, 0.0) + w
+        self.seen.update(tokens)
+        self.total += len(tokens) * w
 
         # decay memory
-        if sum(self.goal_tokens.values()) > GOAL_MEMORY:
-            for k in list(self.goal_tokens.keys()):
-                self.goal_tokens[k] *= 0.85
+        if self.total * self.scale > GOAL_MEMORY:
+            self.scale *= GOAL_DECAY
+            if self.scale < RESCALE_LIMIT:
+                self._rescale()
+
+    def _rescale(self):
+        # forgotten weight stays in the total, as the tokens were seen
+        scale = self.scale
+        self.goal_tokens = {
+            t: w * scale
+            for t, w in self.goal_tokens.items()
+            if w * scale >= GOAL_FORGET
+        }
+        self.total *= scale
+        self.scale = 1.0
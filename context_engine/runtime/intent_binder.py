@@ -1,5 +1,6 @@
 from typing import Optional
 from .episode import Episode
+from .tokenizer import TOKENIZER
 
 
 EPISODE_TIMEOUT = 180  # 3 min no return = finished
@@ -8,8 +9,9 @@ RELATED_WINDOW = 90  # 90s counts as mental continuity
 
 class IntentBinder:
 
-    def __init__(self, bus):
+    def __init__(self, bus, labeler=None):
         self.bus = bus
+        self.labeler = labeler  # semantics.labeler.Labeler, fed as anchors arrive
         self.current: Optional[Episode] = None
         self.counter = 0
         self.last_event_ts = 0
@@ -47,6 +49,10 @@ class IntentBinder:
         self.current = Episode(self.counter, ts, ts, anchor)
         self.current.anchors.append(anchor)
         self.current.loop_count = 1
+
+        if self.labeler is not None:
+            self.labeler.start(self.current.id, anchor)
+
         self.bus.emit_episode_start(self.current)
 
     def continue_episode(self, ts: float, anchor: str):
@@ -58,12 +64,19 @@ class IntentBinder:
             ep.research_hops += 1
             ep.anchors.append(anchor)
 
+        if self.labeler is not None:
+            self.labeler.add(ep.id, anchor)
+
     def end_episode(self, ts: float):
         if not self.current:
             return
 
         self.current.last_ts = ts
         self.current.ended = True
+
+        if self.labeler is not None:
+            self.labeler.finish(self.current.id, ts)
+
         self.bus.emit_episode_end(self.current)
         self.current = None
 
@@ -71,8 +84,8 @@ class IntentBinder:
 
     def related(self, a: str, b: str) -> bool:
 
-        ta = set(a.split())
-        tb = set(b.split())
+        ta = TOKENIZER.anchor_ids(a)
+        tb = TOKENIZER.anchor_ids(b)
 
         if not ta or not tb:
             return False
@@ -4,16 +4,36 @@ from .events import EventType, CognitiveEvent
 
 class IntentListener:
 
-    def __init__(self, bus):
-        self.binder = IntentBinder(bus)
+    TYPES = (EventType.LOOP_START, EventType.SUSPEND, EventType.REENTRY)
+
+    def __init__(self, bus, labeler=None):
+        self.binder = IntentBinder(bus, labeler)
+
+    def attach(self, bus):
+        """
+        Subscribes one handler per type, so the bus routes each event
+        straight to the binder without a type check here.
+        """
+        bus.subscribe(self.on_loop_start, types=(EventType.LOOP_START,))
+        bus.subscribe(self.on_suspend, types=(EventType.SUSPEND,))
+        bus.subscribe(self.on_reentry, types=(EventType.REENTRY,))
+
+    def on_loop_start(self, event: CognitiveEvent):
+        self.binder.on_loop_start(event.ts, event.anchor)
+
+    def on_suspend(self, event: CognitiveEvent):
+        self.binder.on_suspend(event.ts)
+
+    def on_reentry(self, event: CognitiveEvent):
+        self.binder.on_reentry(event.ts, event.verdict)
 
     def __call__(self, event: CognitiveEvent):
 
         if event.type == EventType.LOOP_START:
-            self.binder.on_loop_start(event.ts, event.anchor)
+            self.on_loop_start(event)
 
         elif event.type == EventType.SUSPEND:
-            self.binder.on_suspend(event.ts)
+            self.on_suspend(event)
 
         elif event.type == EventType.REENTRY:
-            self.binder.on_reentry(event.ts, event.verdict)
+            self.on_reentry(event)
@@ -2,6 +2,8 @@ from dataclasses import dataclass
 from typing import Optional
 import time
 
+from .tokenizer import TOKENIZER
+
 
 # ---------------- CONFIG ----------------
 
@@ -83,8 +85,8 @@ class IntentResolver:
     # ---------- semantics ----------
 
     def semantic_drift(self, a: str, b: str) -> float:
-        ta = set(a.split())
-        tb = set(b.split())
+        ta = TOKENIZER.anchor_ids(a)
+        tb = TOKENIZER.anchor_ids(b)
         if not ta or not tb:
             return 1.0
 
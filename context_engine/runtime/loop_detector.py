@@ -1,23 +1,16 @@
-from collections import deque, Counter
-from dataclasses import dataclass
-from typing import Deque, Optional, Tuple, List
-import re
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple, Union
 
+from ..state.event import Event
+from .coalesce import EventRun
+from .features import ACTIVE, DETACHED, PASSIVE, Features, idle_reset, micro_state
 from .reentry_classifier import ReentryClassifier
+from .token_stats import TokenStats
+from .tokenizer import TOKENIZER
+from .vocab import VOCAB, TokenIds
 from .event_bus import EventBus
 
 
-# ---------------- EVENT ----------------
-
-
-@dataclass
-class Event:
-    ts: float
-    app: str
-    title: str
-    idle: float
-
-
 # ---------------- PARAMETERS ----------------
 
 WINDOW = 60
@@ -34,15 +27,6 @@ LOOP_END_THRESHOLD = 0
 ANCHOR_STARVATION_TIME = 18
 
 
-# ---------------- TOKENIZATION ----------------
-
-TOKEN_RE = re.compile(r"[a-zA-Z0-9_]+")
-
-
-def tokenize(text: str) -> List[str]:
-    return TOKEN_RE.findall(text.lower())
-
-
 # ---------------- LOOP DETECTOR ----------------
 
 
@@ -52,9 +36,15 @@ class LoopDetector:
 
         self.bus = bus
 
-        self.memory: Deque[Tuple[float, List[str]]] = deque()
-        self.global_freq: Counter[str] = Counter()
-        self.total_tokens: int = 0
+        # (ts, interned token ids) in the sliding window; consecutive
+        # events with the same tokens share one entry (see remember)
+        self.memory: Deque[Tuple[float, TokenIds]] = deque()
+        self.token_stats = TokenStats()
+
+        # token -> sequence numbers of memory entries containing it.
+        # memory[i] has sequence number memory_base + i
+        self.postings: Dict[int, Deque[int]] = {}
+        self.memory_base: int = 0
 
         self.anchor_hits = 0
         self.anchor_text: Optional[str] = None
@@ -78,62 +68,110 @@ class LoopDetector:
 
     def process(self, e: Event) -> None:
 
+        semantic_now = TOKENIZER.title(e.app, e.title).semantic
+
+        if self.observe_reentry(e.ts, e.idle, semantic_now):
+            return
+
+        self.update_state(e)
+        self.detect_loop(e)
+
+    def process_features(self, f: Features) -> None:
+        """
+        process() on a FeatureExtractor record: tokens, semantic text
+        and the idle reset / micro-state come precomputed (on a stream's
+        first record, e.g. after a restore, they fall back to prev_idle).
+        """
+        if self.observe_reentry(f.ts, f.idle, f.text.semantic, f.reset):
+            return
+
+        if f.micro is None:
+            self.observe_idle(f.ts, f.idle)
+        else:
+            self.prev_idle = f.idle
+            self.observe_micro(f.ts, f.micro)
+
+        self.detect_tokens(f, f.text.ids)
+
+    def process_run(self, run: EventRun) -> None:
+        """
+        A coalesced run of one (app, title), stepped through sample by
+        sample exactly as process() would, so output is the same; the
+        title is looked up once for the whole run.
+        """
+        text = TOKENIZER.title(run.app, run.title)
+        semantic_now, tokens = text.semantic, text.ids
+
+        for e in run.events():
+            if self.observe_reentry(e.ts, e.idle, semantic_now):
+                continue
+
+            self.observe_idle(e.ts, e.idle)
+            self.detect_tokens(e, tokens)
+
+    def observe_reentry(
+        self,
+        ts: float,
+        idle: float,
+        semantic_now: str,
+        reset: Optional[bool] = None,
+    ) -> bool:
+        """
+        Wake and reentry handling for one sample. True while a reentry
+        is being classified; the sample is not scored then. reset is
+        the idle reset if already known (see features.idle_reset).
+        """
+
         # wake from suspend
-        if self.suspended and e.idle < 0.5:
+        if self.suspended and idle < 0.5:
             self.suspended = False
-            self.reentry.start(e.ts, self.last_anchor_before_sleep)
-
-        semantic_now = f"{e.app} {e.title}".lower()
+            self.reentry.start(ts, self.last_anchor_before_sleep)
 
         similar = (
             self.last_anchor_before_sleep
             and self.last_anchor_before_sleep in semantic_now
         )
 
-        reset = False
-        if self.prev_idle is not None:
-            reset = (self.prev_idle - e.idle) > 1.5 and e.idle < 0.3
+        if reset is None:
+            reset = idle_reset(self.prev_idle, idle)
 
-        verdict = self.reentry.observe(e.ts, semantic_now, similar, reset)
+        verdict = self.reentry.observe(ts, semantic_now, similar, reset)
 
         if verdict:
-            self.bus.emit_reentry(e.ts, verdict)
+            self.bus.emit_reentry(ts, verdict)
 
         if self.reentry.active:
-            self.prev_idle = e.idle
-            return
+            self.prev_idle = idle
+            return True
 
-        self.update_state(e)
-        self.detect_loop(e)
+        return False
 
     # ---------------- STATE ----------------
 
     def update_state(self, e: Event) -> None:
+        self.observe_idle(e.ts, e.idle)
+
+    def observe_idle(self, ts: float, idle: float) -> None:
 
         if self.prev_idle is None:
-            self.prev_idle = e.idle
+            self.prev_idle = idle
             return
 
-        delta = self.prev_idle - e.idle
-        self.prev_idle = e.idle
+        reset = idle_reset(self.prev_idle, idle)
+        self.prev_idle = idle
 
-        reset = delta > 1.5 and e.idle < 0.3
+        self.observe_micro(ts, micro_state(idle, reset))
 
-        if e.idle > 20:
-            micro = "DETACHED"
-        elif reset:
-            micro = "ACTIVE"
-        else:
-            micro = "PASSIVE"
+    def observe_micro(self, ts: float, micro: str) -> None:
 
         self.micro_buffer.append(micro)
 
         if len(self.micro_buffer) < 8:
             return
 
-        active = self.micro_buffer.count("ACTIVE")
-        passive = self.micro_buffer.count("PASSIVE")
-        detached = self.micro_buffer.count("DETACHED")
+        active = self.micro_buffer.count(ACTIVE)
+        passive = self.micro_buffer.count(PASSIVE)
+        detached = self.micro_buffer.count(DETACHED)
 
         if detached >= 6:
             new_phase = "DETACHED"
@@ -146,7 +184,7 @@ class LoopDetector:
 
         if new_phase != self.phase:
             self.phase = new_phase
-            self.bus.emit_phase(e.ts, new_phase)
+            self.bus.emit_phase(ts, new_phase)
 
         if self.anchor_text:
 
@@ -166,12 +204,12 @@ class LoopDetector:
 
     # ---------------- FIXED SEMANTIC SUSPEND ----------------
 
-    def check_semantic_suspend(self, e: Event, tokens: List[str]):
+    def check_semantic_suspend(self, e: Union[Event, Features], tokens: TokenIds):
 
         if not self.anchor_text:
             return
 
-        anchor_tokens = set(self.anchor_text.split())
+        anchor_tokens = TOKENIZER.anchor_ids(self.anchor_text)
         token_set = set(tokens)
 
         overlap = len(anchor_tokens & token_set) / max(len(anchor_tokens), 1)
@@ -215,7 +253,7 @@ class LoopDetector:
 
     # ---------------- SIMILARITY ----------------
 
-    def weighted_similarity(self, a: List[str], b: List[str]) -> float:
+    def weighted_similarity(self, a: TokenIds, b: TokenIds) -> float:
 
         if not a or not b:
             return 0.0
@@ -228,38 +266,66 @@ class LoopDetector:
         norm = 0.0
 
         for token in shared:
-            freq = self.global_freq[token] / max(1, self.total_tokens)
+            freq = self.token_stats.frequency(token)
             weight = 1.0 / (1.0 + 10 * freq)
             score += weight
             norm += weight
 
         return score / max(norm, 1e-6)
 
-    # ---------------- LOOP MODEL ----------------
-
-    def detect_loop(self, e: Event) -> None:
+    # ---------------- WINDOW INDEX ----------------
 
-        text = f"{e.app} {e.title}"
-        tokens = tokenize(text)
+    def remember(self, ts: float, tokens: TokenIds) -> None:
+        memory = self.memory
 
-        if not tokens:
+        # a repeat of the newest entry only refreshes its ts: best_match
+        # skips entries equal to the query and keeps the first of equal
+        # scores, so a streak of identical entries ranks like its first
+        # one, and stays a candidate while its newest is in the window
+        if memory and memory[-1][1] == tokens:
+            memory[-1] = (ts, tokens)
             return
 
-        self.check_semantic_suspend(e, tokens)
-
-        for t in tokens:
-            self.global_freq[t] += 1
-            self.total_tokens += 1
-
-        self.memory.append((e.ts, tokens))
-
-        while self.memory and (e.ts - self.memory[0][0]) > WINDOW:
-            self.memory.popleft()
+        seq = self.memory_base + len(memory)
+        memory.append((ts, tokens))
+
+        for t in set(tokens):
+            posting = self.postings.get(t)
+            if posting is None:
+                self.postings[t] = deque((seq,))
+            else:
+                posting.append(seq)
+
+    def forget_oldest(self) -> None:
+        _, tokens = self.memory.popleft()
+        self.memory_base += 1
+
+        # entries leave in FIFO order, so the oldest posting is always first
+        for t in set(tokens):
+            posting = self.postings[t]
+            posting.popleft()
+            if not posting:
+                del self.postings[t]
+
+    def best_match(self, tokens: TokenIds) -> Tuple[float, Optional[TokenIds]]:
+        """
+        Same result as scoring every memory entry in order, but only
+        entries sharing a token can score above zero, so only those are
+        visited (oldest first, keeping the first-best tie break).
+        """
+        candidates = set()
+        for t in set(tokens):
+            posting = self.postings.get(t)
+            if posting:
+                candidates.update(posting)
 
         best_score = 0.0
-        best_match: Optional[List[str]] = None
+        best_match: Optional[TokenIds] = None
 
-        for _, past in self.memory:
+        memory = self.memory
+        base = self.memory_base
+        for seq in sorted(candidates):
+            past = memory[seq - base][1]
             if past == tokens:
                 continue
 
@@ -269,16 +335,53 @@ class LoopDetector:
                 best_score = s
                 best_match = past
 
+                # similarity is normalised to 1.0, nothing later can beat it
+                if s >= 1.0:
+                    break
+
+        return best_score, best_match
+
+    # ---------------- LOOP MODEL ----------------
+
+    def detect_loop(self, e: Event) -> None:
+        self.detect_tokens(e, TOKENIZER.title(e.app, e.title).ids)
+
+    def detect_tokens(self, e: Union[Event, Features], tokens: TokenIds) -> None:
+
+        if not tokens:
+            return
+
+        best_score, best_match = self.observe_tokens(e, tokens)
+
         if best_score > 0.35:
             self.anchor_hits += 1
         else:
             self.anchor_hits *= 0.9
 
         if self.anchor_hits >= ANCHOR_CONFIRM and best_match:
-            new_anchor = " ".join(best_match)
+            self.confirm_anchor(e.ts, best_match)
+
+    def observe_tokens(
+        self, e: Union[Event, Features], tokens: TokenIds
+    ) -> Tuple[float, Optional[TokenIds]]:
+
+        self.check_semantic_suspend(e, tokens)
+
+        self.token_stats.add(tokens, e.ts)
+
+        self.remember(e.ts, tokens)
+
+        while self.memory and (e.ts - self.memory[0][0]) > WINDOW:
+            self.forget_oldest()
+
+        return self.best_match(tokens)
+
+    def confirm_anchor(self, ts: float, best_match: TokenIds) -> None:
+
+        new_anchor = " ".join(VOCAB.decode(best_match))
 
-            if self.anchor_text != new_anchor:
-                self.anchor_text = new_anchor
-                self.attention_score = 60
-                self.last_anchor_seen_ts = e.ts
-                self.bus.emit_loop_start(e.ts, new_anchor)
+        if self.anchor_text != new_anchor:
+            self.anchor_text = new_anchor
+            self.attention_score = 60
+            self.last_anchor_seen_ts = ts
+            self.bus.emit_loop_start(ts, new_anchor)
@@ -0,0 +1,344 @@
+import json
+import sys
+import threading
+import time
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Deque, Dict, List, Optional, TextIO, Tuple
+
+from .events import CognitiveEvent
+
+
+# -------- PARAMETERS --------
+
+BUCKETS = 64  # log2 buckets; bucket b holds values in [2^(b-1), 2^b)
+METRICS_PORT = 9464
+DUMP_INTERVAL = 10.0  # wall-clock seconds between periodic dumps
+RATE_WINDOW = 10.0  # seconds events/s is measured over
+MARK_INTERVAL = 1.0  # seconds between event count marks
+
+# detector methods timed by instrument(), as (attribute path, stage)
+DETECTOR_STAGES = (
+    ("update_state", "update_state"),
+    ("detect_loop", "detect_loop"),
+    ("check_semantic_suspend", "semantic_suspend"),
+    ("reentry.observe", "reentry.observe"),
+)
+
+
+# -------- HISTOGRAM --------
+
+
+class Histogram:
+    """
+    Log2-bucketed histogram of non-negative integers (ns, ms).
+    Recording is a bit_length and two adds; quantiles are bucket upper
+    bounds, so at most 2x off.
+    """
+
+    __slots__ = ("buckets", "count", "total")
+
+    def __init__(self):
+        self.buckets = [0] * BUCKETS
+        self.count = 0
+        self.total = 0
+
+    def record(self, value: int) -> None:
+        self.buckets[min(value.bit_length(), BUCKETS - 1)] += 1
+        self.count += 1
+        self.total += value
+
+    def quantile(self, q: float) -> int:
+        rank = q * self.count
+        seen = 0
+        for b, n in enumerate(self.buckets):
+            seen += n
+            if n and seen >= rank:
+                return 1 << b
+        return 0
+
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "mean": round(self.mean(), 1),
+            "p50": self.quantile(0.50),
+            "p99": self.quantile(0.99),
+            "max_bucket": max(
+                (1 << b for b, n in enumerate(self.buckets) if n), default=0
+            ),
+        }
+
+
+# -------- INSTRUMENTATION --------
+
+
+class Timed:
+    """
+    Replaces one method on one instance and times every call into a
+    histogram (ns). Removing it restores the class method, so disabled
+    metrics cost nothing.
+
+    Pickles as the plain bound method, so snapshots never carry
+    instrumentation or metrics state.
+    """
+
+    def __init__(self, owner, name: str, hist: Histogram):
+        self.owner = owner
+        self.name = name
+        self.__wrapped__ = getattr(owner, name)
+        self.hist = hist
+
+    def __call__(self, *args, **kwargs):
+        started = time.perf_counter_ns()
+        try:
+            return self.__wrapped__(*args, **kwargs)
+        finally:
+            self.hist.record(time.perf_counter_ns() - started)
+
+    def __reduce__(self):
+        return getattr, (self.owner, self.name)
+
+
+class TimedProcess(Timed):
+    """
+    Timing for LoopDetector.process / process_run, plus throughput and
+    the lag between event time and processing time.
+    """
+
+    def __init__(self, owner, name: str, hist: Histogram, metrics: "Metrics"):
+        super().__init__(owner, name, hist)
+        self.metrics = metrics
+
+    def __call__(self, e):
+        metrics = self.metrics
+        metrics.events += e.count
+
+        now = time.time()
+        metrics.lag.record(max(int((now - e.ts) * 1000), 0))
+
+        if now >= metrics.next_mark:
+            metrics.mark(now)
+
+        started = time.perf_counter_ns()
+        try:
+            return self.__wrapped__(e)
+        finally:
+            self.hist.record(time.perf_counter_ns() - started)
+
+
+class Metrics:
+    """
+    Opt-in runtime metrics. Nothing is measured until instrument() or
+    timed() puts wrappers on the hot path.
+
+    stages: per-stage latency (ns); lag: event ts to processing (ms);
+    emitted: cognitive events per type; events/s over the last
+    RATE_WINDOW seconds, from event count marks taken every
+    MARK_INTERVAL. snapshot() may run on another thread (the HTTP
+    endpoint); state it iterates is shared under `lock`.
+    """
+
+    def __init__(self):
+        self.stages: Dict[str, Histogram] = {}
+        self.lag = Histogram()
+        self.events = 0
+        self.emitted: Counter = Counter()
+
+        self.lock = threading.Lock()
+        self.marks: Deque[Tuple[float, int]] = deque([(time.time(), 0)])
+        self.next_mark = self.marks[0][0] + MARK_INTERVAL
+
+        self.installed: List[Timed] = []
+        self.bus = None
+        self.listener = None
+
+    def stage(self, name: str) -> Histogram:
+        hist = self.stages.get(name)
+        if hist is None:
+            hist = self.stages[name] = Histogram()
+        return hist
+
+    def timed(self, fn: Callable, name: str) -> Callable:
+        """
+        Timed version of a free function (e.g. line parsing).
+        """
+        hist = self.stage(name)
+        clock = time.perf_counter_ns
+
+        def wrapper(*args, **kwargs):
+            started = clock()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                hist.record(clock() - started)
+
+        return wrapper
+
+    def wrap(self, owner, name: str, stage: Optional[str] = None) -> None:
+        timer = Timed(owner, name, self.stage(stage or name))
+        setattr(owner, name, timer)
+        self.installed.append(timer)
+
+    def instrument(self, bus, detector, controller=None) -> None:
+        for name in ("process", "process_run"):
+            timer = TimedProcess(detector, name, self.stage(name), self)
+            setattr(detector, name, timer)
+            self.installed.append(timer)
+
+        for path, stage in DETECTOR_STAGES:
+            owner = detector
+            *parents, name = path.split(".")
+            for parent in parents:
+                owner = getattr(owner, parent)
+            self.wrap(owner, name, stage)
+
+        if controller is not None:
+            self.wrap(controller, "on_loop_start", "episodes")
+
+        self.wrap(bus, "emit", "bus.emit")
+        self.listener = bus.subscribe(self.count_event)
+        self.bus = bus
+
+    def uninstrument(self) -> None:
+        for timer in self.installed:
+            if vars(timer.owner).get(timer.name) is timer:
+                delattr(timer.owner, timer.name)
+        self.installed.clear()
+
+        if self.bus is not None:
+            self.bus.unsubscribe(self.listener)
+            self.bus = None
+
+    def count_event(self, event: CognitiveEvent) -> None:
+        with self.lock:
+            self.emitted[event.type.value] += 1
+
+    def mark(self, now: float) -> None:
+        """
+        Records the event count at now; keeps the marks of the last
+        RATE_WINDOW seconds plus the newest one before them.
+        """
+        with self.lock:
+            marks = self.marks
+            marks.append((now, self.events))
+            while len(marks) > 2 and marks[1][0] <= now - RATE_WINDOW:
+                marks.popleft()
+        self.next_mark = now + MARK_INTERVAL
+
+    def rate(self, now: float, events: int) -> float:
+        """
+        events/s since the newest mark at least RATE_WINDOW old (or the
+        oldest mark, early on).
+        """
+        with self.lock:
+            since, count = self.marks[0]
+            for ts, n in self.marks:
+                if ts > now - RATE_WINDOW:
+                    break
+                since, count = ts, n
+
+        return (events - count) / max(now - since, 1e-9)
+
+    # ---------- EXPORT ----------
+
+    def snapshot(self) -> dict:
+        now = time.time()
+        events = self.events
+
+        with self.lock:
+            emitted = dict(self.emitted)
+
+        return {
+            "events": events,
+            "events_per_s": round(self.rate(now, events), 1),
+            "emitted": emitted,
+            "stages_ns": {k: h.summary() for k, h in self.stages.items()},
+            "lag_ms": self.lag.summary(),
+        }
+
+    def report(self, out: TextIO = sys.stdout) -> None:
+        snap = self.snapshot()
+        whole = sum(
+            self.stages[name].total
+            for name in ("process", "process_run")
+            if name in self.stages
+        )
+
+        print(f"{snap['events']} events, {snap['events_per_s']:.0f} events/s", file=out)
+
+        # share is of total process() time; nested stages overlap
+        stages = sorted(self.stages.items(), key=lambda kv: -kv[1].total)
+        for name, hist in stages:
+            if not hist.count:
+                continue
+            share = f"{hist.total / whole:6.1%}" if whole else ""
+            print(
+                f"  {name:18s} {hist.count:9d} calls "
+                f"{hist.mean() / 1000:8.2f} us avg  "
+                f"p50 <{hist.quantile(0.5) / 1000:.1f} us  "
+                f"p99 <{hist.quantile(0.99) / 1000:.1f} us  {share}",
+                file=out,
+            )
+
+        lag = self.lag
+        print(
+            f"  lag p50 <{lag.quantile(0.5)} ms, p99 <{lag.quantile(0.99)} ms",
+            file=out,
+        )
+        print(f"  emitted {snap['emitted']}", file=out)
+
+
+class MetricsDumper:
+    """
+    Periodic report from the ingestion loop; call maybe_dump() after
+    every event; it only does work once per interval.
+    """
+
+    def __init__(
+        self,
+        metrics: Metrics,
+        interval: Optional[float] = None,
+        out: TextIO = sys.stderr,
+    ):
+        self.metrics = metrics
+        self.interval = DUMP_INTERVAL if interval is None else interval
+        self.out = out
+        self.last_dump = time.monotonic()
+
+    def maybe_dump(self) -> None:
+        now = time.monotonic()
+        if now - self.last_dump >= self.interval:
+            self.metrics.report(self.out)
+            self.last_dump = now
+
+
+def serve(metrics: Metrics, port: Optional[int] = None) -> ThreadingHTTPServer:
+    """
+    GET /metrics on localhost returns Metrics.snapshot() as JSON, from a
+    daemon thread.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != "/metrics":
+                self.send_error(404)
+                return
+
+            body = json.dumps(metrics.snapshot()).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(
+        ("127.0.0.1", METRICS_PORT if port is None else port), Handler
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,297 @@
+import argparse
+import gzip
+import json
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, Optional, TextIO
+
+from ..state.episode_store import EpisodeRecorder, EpisodeStore
+from ..state.session_store import SessionStore
+from .loop_detector import LoopDetector, Event
+from .coalesce import coalesce
+from .event_bus import EventBus
+from .decoder import DECODER
+from .events import CognitiveEvent
+from .metrics import Metrics
+from .run_runtime import EpisodeController, extract_json, parse_event
+from .tokenizer import TOKENIZER
+
+
+RAW_LOGS = Path("data/raw_logs")
+DEFAULT_OUTPUT = Path("data/processed/cognitive_events.jsonl")
+
+LOG_SUFFIXES = {".jsonl", ".log", ".txt", ".gz"}
+
+
+# -------- LINE PARSING --------
+
+
+def parse_line(line: str) -> Optional[Event]:
+    """
+    Accepts both recorded formats:
+    - `log stream` lines carrying a JSON payload (see extract_json)
+    - pipe-delimited `ts|app|title|idle` lines from the agent stdout
+    """
+    if "{" in line:
+        data = extract_json(line)
+        if data is not None:
+            try:
+                return parse_event(data)
+            except (KeyError, ValueError, TypeError):
+                return None
+
+        # no JSON object: an agent line whose title contains '{'
+
+    line = line.strip()
+    if line.count("|") < 3:
+        return None
+
+    # titles may contain '|', so split the fixed fields from both ends
+    ts, app, rest = line.split("|", 2)
+    title, idle = rest.rsplit("|", 1)
+
+    try:
+        return Event(float(ts), app, title, float(idle))
+    except ValueError:
+        return None
+
+
+# -------- LOG FILES --------
+
+
+def discover(paths: Iterable[Path]) -> List[Path]:
+    """
+    Expands directories into their log files, ordered by name so that
+    date-stamped recordings replay chronologically.
+    """
+    files: List[Path] = []
+
+    for path in paths:
+        if path.is_dir():
+            files.extend(
+                sorted(
+                    p
+                    for p in path.iterdir()
+                    if p.is_file()
+                    and not p.name.startswith(".")
+                    and p.suffix in LOG_SUFFIXES
+                )
+            )
+        else:
+            files.append(path)
+
+    return files
+
+
+def open_log(path: Path) -> TextIO:
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", encoding="utf-8", errors="replace")
+    return open(path, "r", encoding="utf-8", errors="replace")
+
+
+def is_store(path: Path) -> bool:
+    return path.is_dir() and (path / "meta.json").exists()
+
+
+def read_events(
+    paths: Iterable[Path],
+    stats: "ReplayStats",
+    parse: Callable[[str], Optional[Event]] = parse_line,
+) -> Iterator[Event]:
+    """
+    Events from recorded log files, or from SessionStore directories
+    (already decoded, so they skip line parsing entirely).
+    """
+    for path in paths:
+        if is_store(path):
+            for event in SessionStore(path, read_only=True).scan():
+                stats.lines += 1
+                stats.events += 1
+                yield event
+        else:
+            yield from read_log_events([path], stats, parse)
+
+
+def read_log_events(
+    paths: Iterable[Path],
+    stats: "ReplayStats",
+    parse: Callable[[str], Optional[Event]] = parse_line,
+) -> Iterator[Event]:
+    for path in discover(paths):
+        with open_log(path) as f:
+            for line in f:
+                stats.lines += 1
+
+                event = parse(line)
+                if event is None:
+                    stats.skipped += 1
+                    continue
+
+                stats.events += 1
+                yield event
+
+
+# -------- OUTPUT --------
+
+
+class JsonlSink:
+    """
+    Bus listener writing every CognitiveEvent as one JSON line.
+    """
+
+    def __init__(self, out: TextIO):
+        self.out = out
+        self.count = 0
+
+    def __call__(self, event: CognitiveEvent):
+        self.out.write(json.dumps(vars(event)))
+        self.out.write("\n")
+        self.count += 1
+
+
+# -------- REPLAY --------
+
+
+@dataclass
+class ReplayStats:
+    lines: int = 0
+    events: int = 0
+    skipped: int = 0
+    emitted: int = 0
+    elapsed: float = 0.0
+
+    def rate(self) -> float:
+        return self.events / max(self.elapsed, 1e-9)
+
+
+def replay(
+    events: Iterable[Event],
+    out: TextIO,
+    stats: Optional[ReplayStats] = None,
+    metrics: Optional[Metrics] = None,
+    runs: bool = False,
+    episodes: Optional[EpisodeStore] = None,
+) -> ReplayStats:
+    """
+    Drives LoopDetector and EpisodeController over recorded events
+    without any wall-clock pacing. Event timestamps drive all windows,
+    so the output matches what the live runtime would have produced.
+
+    runs=True coalesces identical consecutive contexts first and feeds
+    the detector one EventRun per run. With an EpisodeStore, finished
+    episodes are recorded into it in batches.
+    """
+    stats = stats or ReplayStats()
+
+    bus = EventBus()
+    detector = LoopDetector(bus)
+    controller = EpisodeController(bus)
+    sink = JsonlSink(out)
+
+    bus.subscribe(sink)
+    bus.subscribe(controller, types=EpisodeController.TYPES)
+
+    recorder = None
+    if episodes is not None:
+        recorder = EpisodeRecorder(episodes)
+        recorder.attach(bus)
+
+    if metrics is not None:
+        metrics.instrument(bus, detector, controller)
+
+    started = time.perf_counter()
+
+    if runs:
+        process_run = detector.process_run
+        for run in coalesce(events):
+            process_run(run)
+    else:
+        process = detector.process
+        for event in events:
+            process(event)
+
+    if recorder is not None:
+        recorder.flush()
+
+    stats.elapsed = time.perf_counter() - started
+    stats.emitted = sink.count
+    return stats
+
+
+def replay_files(
+    paths: Iterable[Path],
+    out_path: Path,
+    metrics: Optional[Metrics] = None,
+    runs: bool = False,
+    episodes_path: Optional[Path] = None,
+) -> ReplayStats:
+    stats = ReplayStats()
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+
+    parse = parse_line if metrics is None else metrics.timed(parse_line, "parse")
+
+    episodes = None if episodes_path is None else EpisodeStore(episodes_path)
+
+    try:
+        with open(out_path, "w", encoding="utf-8", buffering=1 << 20) as out:
+            replay(
+                read_events(paths, stats, parse), out, stats, metrics, runs, episodes
+            )
+    finally:
+        if episodes is not None:
+            episodes.close()
+
+    return stats
+
+
+# -------- ENTRYPOINT --------
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Replay recorded agent logs through the cognitive runtime"
+    )
+    parser.add_argument("paths", nargs="*", type=Path, default=[RAW_LOGS])
+    parser.add_argument("-o", "--output", type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument(
+        "--metrics", action="store_true", help="report per-stage latency"
+    )
+    parser.add_argument(
+        "--runs",
+        action="store_true",
+        help="coalesce identical consecutive contexts before detection",
+    )
+    parser.add_argument(
+        "--episodes", type=Path, help="record episodes into this SQLite store"
+    )
+    args = parser.parse_args(argv)
+
+    metrics = Metrics() if args.metrics else None
+    stats = replay_files(args.paths, args.output, metrics, args.runs, args.episodes)
+
+    print(
+        f"replayed {stats.events} events "
+        f"({stats.skipped} skipped) in {stats.elapsed:.2f}s "
+        f"-> {stats.rate():.0f} events/s, "
+        f"{stats.emitted} cognitive events written to {args.output}"
+    )
+
+    cache = TOKENIZER.stats()
+    print(
+        f"tokenizer cache: {cache['hit_rate']:.1%} hits "
+        f"({cache['hits']} hits / {cache['misses']} misses)"
+    )
+
+    decoded = DECODER.stats
+    print(
+        f"json payloads: {decoded.decoded} decoded, "
+        f"{decoded.malformed} malformed"
+    )
+
+    if metrics is not None:
+        metrics.report()
+
+
+if __name__ == "__main__":
+    main()
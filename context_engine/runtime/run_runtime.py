@@ -1,12 +1,18 @@
+import argparse
 import subprocess
-import json
-import re
-from typing import Optional
+from pathlib import Path
+from typing import List, Optional
 
+from ..semantics.labeler import Labeler
+from ..state.episode_store import EpisodeRecorder, EpisodeStore
+from ..state.session_store import SessionStore
+from ..state.snapshot import Snapshotter
 from .loop_detector import LoopDetector, Event
+from .decoder import DECODER
 from .event_bus import EventBus
 from .events import CognitiveEvent, EventType
 from .goal_continuity import GoalContinuity
+from .metrics import DUMP_INTERVAL, Metrics, MetricsDumper, serve
 
 
 # -------- HELPERS --------
@@ -36,29 +42,55 @@ LOG_CMD = [
 ]
 
 
-# -------- JSON EXTRACTION --------
+# raw events are kept here for replay and analytics
+STORE_PATH = Path("data/processed/events")
+
+# finished episodes, queryable by time range and anchor token
+EPISODE_PATH = Path("data/processed/episodes.sqlite")
 
-JSON_RE = re.compile(r"{.*?}")
+
+# -------- JSON EXTRACTION --------
 
 
 def extract_json(line: str) -> Optional[dict]:
-    match = JSON_RE.search(line)
-    if not match:
-        return None
+    """
+    JSON object carried by a `log stream` line, or None. Counters for
+    skipped lines live on DECODER.stats.
+    """
+    return DECODER.decode(line)
 
-    raw = match.group(0)
+
+def read_event(line: str) -> Optional[Event]:
+    data = extract_json(line)
+    if not data:
+        return None
 
     try:
-        return json.loads(raw)
-    except json.JSONDecodeError:
+        return parse_event(data)
+    except (KeyError, ValueError, TypeError):
         return None
 
 
+def parse_event(data: dict) -> Event:
+    """
+    Raises KeyError / ValueError / TypeError on malformed payloads.
+    """
+    return Event(
+        ts=float(data["ts"]),
+        app=str(data.get("app", "")),
+        title=str(data.get("title", "")),
+        idle=float(data["idle"]),
+    )
+
+
 # -------- EPISODE CONTROLLER --------
 
 
 class EpisodeController:
 
+    # subscribe with types=TYPES; nothing else affects episode boundaries
+    TYPES = (EventType.LOOP_START,)
+
     def __init__(self, bus: EventBus):
         self.bus = bus
         self.goal = GoalContinuity()
@@ -66,20 +98,29 @@ class EpisodeController:
         self.next_episode_id = 1
         self.current_anchor: Optional[str] = None
 
-    def on_loop_start(self, event: CognitiveEvent):
+    def __call__(self, event: CognitiveEvent):
+
+        # Only LOOP_START affects episode boundaries
+        if event.type != EventType.LOOP_START or event.anchor is None:
+            return
+
+        self.on_loop_start(
+            ts=event.ts,
+            app=extract_app_from_anchor(event.anchor),
+            anchor=event.anchor,
+        )
 
-        anchor = event.anchor or ""
-        app = anchor.split()[0] if anchor else ""
+    def on_loop_start(self, ts: float, app: str, anchor: str):
 
-        same_goal = self.goal.is_same_goal(app=app, anchor=anchor)
+        same_goal = self.goal.is_same_goal(app=app, anchor=anchor, ts=ts)
 
         if same_goal:
             return
 
-        if self.current_episode is not None:
+        if self.current_episode is not None and self.bus.wants(EventType.EPISODE_END):
             self.bus.emit(
                 CognitiveEvent(
-                    ts=event.ts,
+                    ts=ts,
                     type=EventType.EPISODE_END,
                     anchor=self.current_anchor,
                     episode_id=self.current_episode,
@@ -90,9 +131,12 @@ class EpisodeController:
         self.next_episode_id += 1
         self.current_anchor = anchor
 
+        if not self.bus.wants(EventType.EPISODE_START):
+            return
+
         self.bus.emit(
             CognitiveEvent(
-                ts=event.ts,
+                ts=ts,
                 type=EventType.EPISODE_START,
                 anchor=anchor,
                 episode_id=self.current_episode,
@@ -107,35 +151,114 @@ def debug_listener(event: CognitiveEvent):
     print(event)
 
 
-# -------- MAIN RUNTIME --------
+def print_label(episode_id: int, label: str):
+    print(f"[EPISODE {episode_id}] {label}")
 
 
-def main() -> None:
+# -------- MAIN RUNTIME --------
+
 
+def build_runtime(queued_output: bool = False):
+    """
+    queued_output prints the cognition stream from a worker thread, so
+    a slow terminal never stalls detection; call bus.close() on exit.
+    After a snapshot restore, call labeler.resume(controller) (see
+    Persistence).
+    """
     bus = EventBus()
 
     detector = LoopDetector(bus)
     controller = EpisodeController(bus)
 
-    # -------- EPISODE ROUTER --------
-    def router(event: CognitiveEvent):
+    # Always print cognition stream, then route episode boundaries
+    bus.subscribe(debug_listener, queued=queued_output)
+    bus.subscribe(controller, types=EpisodeController.TYPES)
 
-        # Always print cognition stream
-        debug_listener(event)
+    # name every finished episode
+    labeler = Labeler(on_label=print_label)
+    labeler.attach(bus, queued=queued_output)
 
-        # Only LOOP_START affects episode boundaries
-        if event.type == EventType.LOOP_START:
+    return bus, detector, controller, labeler
 
-            if event.anchor is None:
-                return
 
-            controller.on_loop_start(
-                ts=event.ts,
-                app=extract_app_from_anchor(event.anchor),
-                anchor=event.anchor,
-            )
+class Persistence:
+    """
+    What a live runtime keeps on disk: raw events (SessionStore, unless
+    record is False), every episode as it ends (EpisodeStore) and
+    periodic snapshots. Shared by main() and AsyncRuntime.
 
-    bus.subscribe(router)
+    restore() before the first event, record() and maybe_save() per
+    event, close() on exit.
+    """
+
+    def __init__(self, bus, detector, controller, labeler, record: bool = True):
+        self.controller = controller
+        self.labeler = labeler
+
+        self.store = SessionStore(STORE_PATH) if record else None
+
+        # live episodes are rare: write each one as it ends
+        self.episodes = EpisodeStore(EPISODE_PATH)
+        self.recorder = EpisodeRecorder(self.episodes, batch=1)
+        self.recorder.attach(bus)
+
+        self.snapshots = Snapshotter(detector, controller)
+
+    def restore(self) -> bool:
+        """
+        Warm restart: resumes windows, anchors and episode ids, and the
+        open episode in the recorder and the labeler.
+        """
+        if not self.snapshots.restore():
+            return False
+
+        self.recorder.resume(self.controller)
+        self.labeler.resume(self.controller)
+        print(f"Restored runtime state from {self.snapshots.path}")
+        return True
+
+    def record(self, event: Event) -> None:
+        if self.store is not None:
+            self.store.append(event)
+
+    def maybe_save(self) -> None:
+        self.snapshots.maybe_save()
+
+    def close(self) -> None:
+        self.snapshots.save()
+        if self.store is not None:
+            self.store.close()
+        self.recorder.flush()
+        self.episodes.close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Live cognitive runtime")
+    parser.add_argument(
+        "--metrics",
+        action="store_true",
+        help="time each stage and dump a report periodically to stderr",
+    )
+    parser.add_argument("--metrics-port", type=int, help="serve /metrics on localhost")
+    parser.add_argument("--metrics-interval", type=float, default=DUMP_INTERVAL)
+    args = parser.parse_args(argv)
+
+    bus, detector, controller, labeler = build_runtime()
+
+    persistence = Persistence(bus, detector, controller, labeler)
+    persistence.restore()
+
+    # after restore, which replaces the instrumented sub-objects
+    read = read_event
+    dumper = None
+    if args.metrics or args.metrics_port is not None:
+        metrics = Metrics()
+        metrics.instrument(bus, detector, controller)
+        read = metrics.timed(read_event, "parse")
+        dumper = MetricsDumper(metrics, args.metrics_interval)
+
+        if args.metrics_port is not None:
+            serve(metrics, args.metrics_port)
 
     proc = subprocess.Popen(
         LOG_CMD,
@@ -151,27 +274,23 @@ def main() -> None:
         assert proc.stdout is not None
 
         for line in proc.stdout:
-            data = extract_json(line)
-            if not data:
+            event = read(line)
+            if event is None:
                 continue
 
-            try:
-                event = Event(
-                    ts=float(data["ts"]),
-                    app=str(data.get("app", "")),
-                    title=str(data.get("title", "")),
-                    idle=float(data["idle"]),
-                )
+            persistence.record(event)
+            detector.process(event)
+            persistence.maybe_save()
 
-                detector.process(event)
-
-            except (KeyError, ValueError, TypeError):
-                continue
+            if dumper is not None:
+                dumper.maybe_dump()
 
     except KeyboardInterrupt:
         print("\nStopping context runtime...")
 
     finally:
+        persistence.close()
+        bus.close()
         proc.terminate()
         proc.wait(timeout=2)
 
@@ -1,6 +1,7 @@
-from collections import deque
+from collections import deque, Counter
 from dataclasses import dataclass
 from difflib import SequenceMatcher
+from typing import Deque, Dict, Optional, Tuple
 
 WINDOW = 60
 SIM_THRESHOLD = 0.72
@@ -16,17 +17,55 @@ class MemoryItem:
     text: str
 
 
+class Signature:
+    """
+    Per-item data reused by every lookup: the text length, its character
+    histogram and a SequenceMatcher with the item prepared as seq2
+    (building seq2's index is the expensive half of ratio()).
+    """
+
+    __slots__ = ("length", "chars", "matcher")
+
+    def __init__(self, text: str):
+        self.length = len(text)
+        self.chars: Dict[str, int] = Counter(text)
+        self.matcher = SequenceMatcher(None, "", text)
+
+
+def _bound(matches: int, length: int) -> float:
+    # SequenceMatcher's ratio formula, 1.0 for two empty strings
+    return 2.0 * matches / length if length else 1.0
+
+
 class WorkingMemory:
-    def __init__(self):
-        self.items = deque()
+    """
+    Sliding window of recent texts with nearest-text lookup.
+
+    indexed=True returns exactly what the linear scan returns, but ranks
+    items by cheap upper bounds on ratio() (the real_quick_ratio and
+    quick_ratio bounds, computed from cached signatures) and runs the
+    exact ratio only while a candidate can still win.
+    """
+
+    def __init__(self, indexed: bool = True):
+        self.items: Deque[MemoryItem] = deque()
+        self.indexed = indexed
+        self.signatures: Deque[Signature] = deque()
 
     def add(self, ts, text):
         self.items.append(MemoryItem(ts, text))
+        if self.indexed:
+            self.signatures.append(Signature(text))
 
         while self.items and (ts - self.items[0].ts) > WINDOW:
             self.items.popleft()
+            if self.indexed:
+                self.signatures.popleft()
 
     def nearest(self, text):
+        if self.indexed:
+            return self._nearest_indexed(text, 0.0)
+
         best = None
         best_score = 0
 
@@ -37,3 +76,72 @@ class WorkingMemory:
                 best = item
 
         return best, best_score
+
+    def match(self, text) -> Optional[MemoryItem]:
+        """
+        Nearest item if it clears SIM_THRESHOLD. Anything whose bound is
+        below the threshold is skipped without an exact ratio.
+        """
+        if self.indexed:
+            best, score = self._nearest_indexed(text, SIM_THRESHOLD)
+        else:
+            best, score = self.nearest(text)
+
+        return best if score >= SIM_THRESHOLD else None
+
+    # ---------- INDEXED ----------
+
+    def _nearest_indexed(
+        self, text: str, floor: float
+    ) -> Tuple[Optional[MemoryItem], float]:
+
+        la = len(text)
+        query = Counter(text)
+
+        # pass 1: real_quick_ratio / quick_ratio bounds. A repeated text
+        # scores like its first copy, which wins ties, so skip repeats
+        candidates = []
+        seen = set()
+        for i, (item, sig) in enumerate(zip(self.items, self.signatures)):
+            if item.text in seen:
+                continue
+            seen.add(item.text)
+
+            total = la + sig.length
+            if _bound(min(la, sig.length), total) < floor:
+                continue
+
+            chars = sig.chars
+            if len(query) < len(chars):
+                shared = sum(min(n, chars.get(c, 0)) for c, n in query.items())
+            else:
+                shared = sum(min(n, query.get(c, 0)) for c, n in chars.items())
+
+            bound = _bound(shared, total)
+            if bound >= floor:
+                candidates.append((-bound, i))
+
+        # pass 2: exact ratios, best bound first; ties keep the earliest
+        # item, exactly like the linear scan's strict '>'
+        candidates.sort()
+
+        best_i = -1
+        best_score = 0.0
+
+        for neg_bound, i in candidates:
+            if -neg_bound < best_score:
+                break
+            if -neg_bound == best_score and i > best_i >= 0:
+                continue
+
+            matcher = self.signatures[i].matcher
+            matcher.set_seq1(text)
+            s = matcher.ratio()
+
+            if s > best_score or (s == best_score and s > 0 and i < best_i):
+                best_score = s
+                best_i = i
+
+        if best_i < 0:
+            return None, 0
+        return self.items[best_i], best_score
@@ -1,19 +1,16 @@
 from dataclasses import dataclass, field
 from collections import Counter
+from typing import Optional
 import time
 
+from ..state.event import Event
+from .coalesce import EventRun
+from .features import Features
+
 IDLE_BREAK = 180
 SOFT_SWITCH_WINDOW = 25
 
 
-@dataclass
-class Event:
-    ts: float
-    app: str
-    title: str
-    idle: float
-
-
 @dataclass
 class Session:
     start: float
@@ -26,7 +23,11 @@ class SessionBuilder:
         self.current = None
         self.last_event = None
 
-    def process(self, e: Event):
+    def process(self, e: Event, gap: Optional[float] = None):
+        """
+        gap: seconds since the previous event, if the caller already
+        knows.
+        """
         # 1. Hard break: idle
         if e.idle > IDLE_BREAK:
             self._end("Idle Break")
@@ -41,7 +42,8 @@ class SessionBuilder:
             return
 
         # 3. Time gap
-        gap = e.ts - self.last_event.ts
+        if gap is None:
+            gap = e.ts - self.last_event.ts
         if gap > IDLE_BREAK:
             self._end("Time Gap")
             self._start_new(e)
@@ -58,6 +60,20 @@ class SessionBuilder:
         self.current.last = e.ts
         self.last_event = e
 
+    def process_features(self, f: Features):
+        """
+        process() on a FeatureExtractor record, reusing its gap.
+        """
+        self.process(f, f.gap)
+
+    def process_run(self, run: EventRun):
+        """
+        process() for a coalesced run, stepped through sample by sample
+        so sessions are the same.
+        """
+        for e in run.events():
+            self.process(e)
+
     def _start_new(self, e):
         self.current = Session(e.ts, e.ts)
         self.current.apps[e.app] += 1
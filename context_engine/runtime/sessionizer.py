@@ -1,14 +1,10 @@
 from dataclasses import dataclass
-from typing import Optional
+from typing import List, Optional
 import time
 
-
-@dataclass
-class Event:
-    ts: float
-    app: str
-    title: str
-    idle: float
+from ..state.event import Event
+from .coalesce import EventRun
+from .features import Features
 
 
 @dataclass
@@ -27,7 +23,11 @@ class Sessionizer:
         self.current: Optional[Event] = None
         self.start_ts: Optional[float] = None
 
-    def feed(self, event: Event):
+    def feed(self, event: Event, changed: Optional[bool] = None):
+        """
+        changed: whether event's context differs from the previous
+        event's, if the caller already knows.
+        """
         if self.current is None:
             self.current = event
             self.start_ts = event.ts
@@ -42,7 +42,12 @@ class Sessionizer:
             return session
 
         # context change
-        if event.app != self.current.app or event.title != self.current.title:
+        if changed is None:
+            changed = (
+                event.app != self.current.app or event.title != self.current.title
+            )
+
+        if changed:
             if event.ts - self.current.ts > self.SWITCH_GAP:
                 session = Session(
                     self.start_ts, self.current.ts, self.current.app, self.current.title
@@ -53,3 +58,21 @@ class Sessionizer:
 
         self.current = event
         return None
+
+    def feed_features(self, f: Features):
+        """
+        feed() on a FeatureExtractor record, reusing its context change.
+        """
+        return self.feed(f, f.changed)
+
+    def feed_run(self, run: EventRun) -> List[Session]:
+        """
+        feed() for a coalesced run, stepped through sample by sample so
+        sessions are the same; an idle run can close several.
+        """
+        sessions = []
+        for e in run.events():
+            session = self.feed(e)
+            if session is not None:
+                sessions.append(session)
+        return sessions
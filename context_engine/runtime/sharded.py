@@ -0,0 +1,422 @@
+import argparse
+import heapq
+import json
+import multiprocessing as mp
+import os
+import queue
+import sys
+import threading
+import time
+import traceback
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple, TypeVar
+
+from ..state.event import Event
+from .event_bus import EventBus
+from .events import CognitiveEvent
+from .loop_detector import LoopDetector
+from .replay import ReplayStats, read_events
+from .run_runtime import EpisodeController, extract_json, parse_event
+
+
+# -------- PARAMETERS --------
+
+WORKERS = os.cpu_count() or 1
+SHARD_BATCH = 1024  # events per message to a worker
+INBOX_SIZE = 16  # batches queued per worker before submit() blocks
+DRAIN_EVENTS = 50000  # live mode: events between ordered output flushes
+DRAIN_INTERVAL = 2.0  # ... or wall-clock seconds, whichever comes first
+WORKER_POLL = 1.0  # seconds between worker liveness checks while waiting
+
+# payload keys naming the stream, in order of preference
+STREAM_KEYS = ("stream", "user", "host")
+DEFAULT_STREAM = "default"
+
+
+# one output record: which stream emitted it, and the event
+Emitted = Tuple[str, CognitiveEvent]
+
+
+def shard_of(stream: str, shards: int) -> int:
+    """
+    Stable across processes and runs, unlike hash(str).
+    """
+    return zlib.crc32(stream.encode("utf-8")) % shards
+
+
+# -------- WORKER --------
+
+
+class StreamRuntime:
+    """
+    Detector + episode controller for one stream, wired like replay():
+    everything emitted is collected, LOOP_START also drives episodes.
+    """
+
+    def __init__(self):
+        self.bus = EventBus()
+        self.detector = LoopDetector(self.bus)
+        self.controller = EpisodeController(self.bus)
+        self.emitted: List[CognitiveEvent] = []
+
+        self.bus.subscribe(self.emitted.append)
+        self.bus.subscribe(self.controller, types=EpisodeController.TYPES)
+
+
+@dataclass
+class WorkerError:
+    """
+    Sent instead of a batch's output when a worker fails; the worker
+    exits after sending it.
+    """
+
+    shard: int
+    traceback: str
+
+
+def shard_worker(shard: int, inbox, outbox) -> None:
+    """
+    Owns every stream hashed to its shard. Answers each batch with one
+    list of (stream, event), in processing order.
+    """
+    streams: Dict[str, StreamRuntime] = {}
+
+    while True:
+        batch = inbox.get()
+        if batch is None:
+            return
+
+        out: List[Emitted] = []
+
+        try:
+            for stream, ts, app, title, idle in batch:
+                runtime = streams.get(stream)
+                if runtime is None:
+                    runtime = streams[stream] = StreamRuntime()
+
+                runtime.detector.process(Event(ts, app, title, idle))
+
+                if runtime.emitted:
+                    out.extend((stream, e) for e in runtime.emitted)
+                    runtime.emitted.clear()
+
+        except Exception:
+            outbox.put(WorkerError(shard, traceback.format_exc()))
+            return
+
+        outbox.put(out)
+
+
+# -------- SHARDED RUNTIME --------
+
+
+@dataclass
+class ShardStats:
+    events: int = 0
+    batches: int = 0
+    emitted: int = 0
+
+
+class ShardedRuntime:
+    """
+    Multi-tenant runtime: events are sharded by stream id (crc32) over
+    worker processes, each holding isolated per-stream detector state.
+
+    submit() only buffers and ships batches; drain() waits for every
+    shipped batch and returns what the workers emitted, merged by ts
+    across streams. Each stream's own output keeps its emission order.
+
+    A worker that raises or dies makes submit() / drain() raise
+    RuntimeError instead of waiting forever.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        batch_size: Optional[int] = None,
+    ):
+        self.workers = WORKERS if workers is None else workers
+        self.batch_size = SHARD_BATCH if batch_size is None else batch_size
+
+        self.outbox = mp.Queue()
+        self.inboxes = [mp.Queue(INBOX_SIZE) for _ in range(self.workers)]
+        self.procs = [
+            mp.Process(
+                target=shard_worker, args=(shard, inbox, self.outbox), daemon=True
+            )
+            for shard, inbox in enumerate(self.inboxes)
+        ]
+        for proc in self.procs:
+            proc.start()
+
+        self.pending: List[list] = [[] for _ in range(self.workers)]
+        self.shards: Dict[str, int] = {}
+        self.in_flight = 0
+        self.stats = ShardStats()
+
+    def submit(self, stream: str, event: Event) -> None:
+        shard = self.shards.get(stream)
+        if shard is None:
+            shard = self.shards[stream] = shard_of(stream, self.workers)
+
+        # plain tuples pickle much faster than Event instances
+        pending = self.pending[shard]
+        pending.append((stream, event.ts, event.app, event.title, event.idle))
+        self.stats.events += 1
+
+        if len(pending) >= self.batch_size:
+            self._send(shard)
+
+    def drain(self) -> List[Emitted]:
+        for shard, pending in enumerate(self.pending):
+            if pending:
+                self._send(shard)
+
+        by_stream: Dict[str, List[Emitted]] = {}
+
+        while self.in_flight:
+            try:
+                out = self.outbox.get(timeout=WORKER_POLL)
+            except queue.Empty:
+                self._check_workers()
+                continue
+
+            if isinstance(out, WorkerError):
+                raise RuntimeError(f"shard {out.shard} failed:\n{out.traceback}")
+
+            for item in out:
+                by_stream.setdefault(item[0], []).append(item)
+            self.in_flight -= 1
+
+        merged = list(
+            heapq.merge(
+                *(by_stream[s] for s in sorted(by_stream)),
+                key=lambda item: item[1].ts,
+            )
+        )
+        self.stats.emitted += len(merged)
+        return merged
+
+    def close(self) -> None:
+        for inbox, proc in zip(self.inboxes, self.procs):
+            # after a failure, output nobody will read keeps workers
+            # from exiting
+            if self.in_flight:
+                proc.terminate()
+            elif proc.is_alive():
+                inbox.put(None)
+        for proc in self.procs:
+            proc.join()
+
+    def __enter__(self) -> "ShardedRuntime":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _send(self, shard: int) -> None:
+        # a full inbox blocks, so keep checking its worker is still there
+        while True:
+            try:
+                self.inboxes[shard].put(self.pending[shard], timeout=WORKER_POLL)
+                break
+            except queue.Full:
+                self._check_workers()
+
+        self.pending[shard] = []
+        self.in_flight += 1
+        self.stats.batches += 1
+
+    def _check_workers(self) -> None:
+        for shard, proc in enumerate(self.procs):
+            if not proc.is_alive():
+                raise RuntimeError(
+                    f"shard {shard} worker exited with code {proc.exitcode}"
+                )
+
+
+# -------- INPUT --------
+
+
+def stream_events(
+    paths: Iterable[Path], stats: ReplayStats
+) -> Iterator[Tuple[str, Event]]:
+    """
+    One stream per path (log file, directory of logs, or SessionStore),
+    named by its resolved path, so same-named logs in different
+    directories stay apart. Streams are interleaved by ts, as a central
+    collector would receive them.
+    """
+
+    def tagged(path: Path):
+        name = str(path.resolve())
+        for event in read_events([path], stats):
+            yield name, event
+
+    return heapq.merge(*(tagged(p) for p in paths), key=lambda item: item[1].ts)
+
+
+def live_events(lines: Iterable[str]) -> Iterator[Tuple[str, Event]]:
+    """
+    `log stream`-style lines whose payload names its stream.
+    """
+    for line in lines:
+        data = extract_json(line)
+        if data is None:
+            continue
+
+        try:
+            event = parse_event(data)
+        except (KeyError, ValueError, TypeError):
+            continue
+
+        stream = next(
+            (str(data[k]) for k in STREAM_KEYS if k in data), DEFAULT_STREAM
+        )
+        yield stream, event
+
+
+T = TypeVar("T")
+
+
+def ticking(items: Iterable[T], interval: float) -> Iterator[Optional[T]]:
+    """
+    items, read on a background thread, with None yielded whenever
+    interval seconds pass without one, so a consumer can act on time
+    while its input is quiet. Errors raised by items are raised here.
+    """
+    inbox: "queue.Queue" = queue.Queue(SHARD_BATCH)
+    done = object()
+    failure: List[BaseException] = []
+
+    def read() -> None:
+        try:
+            for item in items:
+                inbox.put(item)
+        except BaseException as exc:
+            failure.append(exc)
+        finally:
+            inbox.put(done)
+
+    threading.Thread(target=read, name="sharded-input", daemon=True).start()
+
+    while True:
+        try:
+            item = inbox.get(timeout=interval)
+        except queue.Empty:
+            yield None
+            continue
+
+        if item is done:
+            break
+        yield item
+
+    if failure:
+        raise failure[0]
+
+
+# -------- OUTPUT --------
+
+
+def write_emitted(out: TextIO, emitted: List[Emitted]) -> None:
+    for stream, event in emitted:
+        out.write(json.dumps({"stream": stream, **vars(event)}))
+        out.write("\n")
+
+
+def run_sharded(
+    events: Iterable[Tuple[str, Event]],
+    out: TextIO,
+    workers: Optional[int] = None,
+    drain_every: Optional[int] = None,
+    drain_interval: Optional[float] = None,
+) -> ShardStats:
+    """
+    Output is drained every drain_every events or drain_interval
+    seconds, whichever comes first; the interval is kept while input is
+    quiet too, since input is then read on a thread (see ticking). With
+    neither, everything is merged once at the end, which gives a fully
+    ts-ordered output for recorded input.
+    """
+    if drain_interval:
+        # a few polls per interval bound how late a quiet drain runs
+        events = ticking(events, drain_interval / 4)
+
+    with ShardedRuntime(workers) as runtime:
+        submit = runtime.submit
+        drained_at = time.monotonic()
+        n = undrained = 0
+
+        for item in events:
+            if item is not None:
+                submit(*item)
+                n += 1
+                undrained += 1
+
+            if undrained and (
+                (drain_every and n % drain_every == 0)
+                or (
+                    drain_interval
+                    and time.monotonic() - drained_at >= drain_interval
+                )
+            ):
+                write_emitted(out, runtime.drain())
+                out.flush()
+                drained_at = time.monotonic()
+                undrained = 0
+
+        write_emitted(out, runtime.drain())
+
+    return runtime.stats
+
+
+# -------- ENTRYPOINT --------
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Sharded multi-stream runtime")
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        type=Path,
+        help="one stream per path; without paths, read stream-tagged lines from stdin",
+    )
+    parser.add_argument("-o", "--output", type=Path)
+    parser.add_argument("-w", "--workers", type=int, default=WORKERS)
+    args = parser.parse_args(argv)
+
+    replay_stats = ReplayStats()
+
+    if args.paths:
+        events = stream_events(args.paths, replay_stats)
+        drain_every = drain_interval = None
+    else:
+        events = live_events(sys.stdin)
+        drain_every, drain_interval = DRAIN_EVENTS, DRAIN_INTERVAL
+
+    out = (
+        open(args.output, "w", encoding="utf-8", buffering=1 << 20)
+        if args.output
+        else sys.stdout
+    )
+
+    started = time.perf_counter()
+    try:
+        stats = run_sharded(events, out, args.workers, drain_every, drain_interval)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - started
+
+    print(
+        f"{stats.events} events on {args.workers} workers in {elapsed:.2f}s "
+        f"-> {stats.events / max(elapsed, 1e-9):.0f} events/s, "
+        f"{stats.emitted} cognitive events",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
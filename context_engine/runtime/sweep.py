@@ -0,0 +1,366 @@
+"""
+Parameter sweeps over recorded logs.
+
+Detection thresholds are module constants. A sweep patches them per
+configuration (patched()), replays the logs and aggregates one
+scoreboard row per configuration, fanned out over a process pool.
+
+The pipeline has two stages with disjoint parameters: LoopDetector
+turns events into LOOP_START / SUSPEND, and GoalContinuity /
+IntentResolver turn those into episodes. Configurations sharing their
+detector parameters share one detector replay; only the cheap episode
+stage runs per configuration, so wide grids over the episode
+parameters cost little more than the detector grid.
+"""
+
+import argparse
+import csv
+import importlib
+import itertools
+import multiprocessing as mp
+import os
+import sys
+import time
+from contextlib import contextmanager, redirect_stdout
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from ..focus.boundaries import boundaries, compare
+from .event_bus import EventBus
+from .events import EventType
+from .intent_resolver import IntentResolver
+from .loop_detector import LoopDetector, Event
+from .replay import ReplayStats, read_events
+from .run_runtime import EpisodeController, extract_app_from_anchor
+
+
+# -------- PARAMETERS --------
+
+WORKERS = os.cpu_count() or 1
+
+# modules whose UPPER_CASE constants may be swept, by pipeline stage
+DETECTOR_MODULES = ("loop_detector",)
+EPISODE_MODULES = ("goal_continuity", "intent_resolver")
+
+PACKAGE = __package__  # context_engine.runtime
+
+Params = Dict[str, float]  # "module.CONSTANT" -> value
+
+# (ts, type, anchor) of every LOOP_START / SUSPEND, in emission order
+Signal = Tuple[float, str, Optional[str]]
+
+
+# -------- PATCHING --------
+
+
+def _resolve(name: str):
+    """
+    "loop_detector.WINDOW" -> (module, "WINDOW"). Raises ValueError
+    for anything but an existing constant of a sweepable module.
+    """
+    module_name, _, attr = name.partition(".")
+
+    if module_name not in DETECTOR_MODULES + EPISODE_MODULES:
+        raise ValueError(f"{name}: not a sweepable module")
+
+    module = importlib.import_module(f"{PACKAGE}.{module_name}")
+    if not attr.isupper() or not hasattr(module, attr):
+        raise ValueError(f"{name}: no such constant")
+
+    return module, attr
+
+
+def stage_of(name: str) -> str:
+    return "detector" if name.partition(".")[0] in DETECTOR_MODULES else "episode"
+
+
+@contextmanager
+def patched(params: Params) -> Iterator[None]:
+    """
+    Sets module constants for the duration of the block. Code reads
+    them at call time, so objects built or run inside see the values;
+    int constants stay int when the value is integral.
+    """
+    saved = []
+
+    try:
+        for name, value in params.items():
+            module, attr = _resolve(name)
+            old = getattr(module, attr)
+            if isinstance(old, int) and float(value).is_integer():
+                value = int(value)
+
+            saved.append((module, attr, old))
+            setattr(module, attr, value)
+
+        yield
+    finally:
+        for module, attr, old in reversed(saved):
+            setattr(module, attr, old)
+
+
+# -------- STAGES --------
+
+
+def detect(events: Sequence[Event]) -> List[Signal]:
+    bus = EventBus()
+    detector = LoopDetector(bus)
+
+    signals: List[Signal] = []
+    bus.subscribe(
+        lambda e: signals.append((e.ts, e.type, e.anchor)),
+        types=(EventType.LOOP_START, EventType.SUSPEND),
+    )
+
+    process = detector.process
+    for event in events:
+        process(event)
+
+    return signals
+
+
+@dataclass
+class Score:
+    loops: int = 0
+    suspends: int = 0
+    episodes: int = 0
+    intents: int = 0
+    mean_episode: float = 0.0  # seconds between episode starts
+    f1: Optional[float] = None  # vs reference boundaries, when given
+
+
+def episodes(signals: Sequence[Signal]) -> Tuple[Score, List[float]]:
+    """
+    Runs EpisodeController and IntentResolver over detector output,
+    as replay() would; returns the score and the episode start times.
+    """
+    bus = EventBus()
+    controller = EpisodeController(bus)
+    resolver = IntentResolver()
+
+    starts: List[float] = []
+    bus.subscribe(lambda e: starts.append(e.ts), types=(EventType.EPISODE_START,))
+
+    score = Score()
+
+    for ts, kind, anchor in signals:
+        if kind == EventType.SUSPEND:
+            score.suspends += 1
+            resolver.notify_suspend(ts)
+            continue
+
+        score.loops += 1
+        controller.on_loop_start(
+            ts=ts, app=extract_app_from_anchor(anchor), anchor=anchor
+        )
+        if resolver.resolve(ts, anchor):
+            score.intents += 1
+
+    score.episodes = len(starts)
+    if len(starts) > 1:
+        score.mean_episode = (starts[-1] - starts[0]) / (len(starts) - 1)
+
+    return score, starts
+
+
+# -------- WORKER --------
+
+_events: List[Event] = []
+_reference: Optional[List[float]] = None
+_tolerance: Optional[float] = None
+
+
+@contextmanager
+def quiet() -> Iterator[None]:
+    """
+    Discards what detectors print while replaying (ReentryClassifier
+    reports every reentry); stdout is left to the scoreboard.
+    """
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        yield
+
+
+def init_worker(
+    paths: List[Path],
+    reference: Optional[List[float]],
+    tolerance: Optional[float],
+) -> None:
+    global _events, _reference, _tolerance
+
+    _events = list(read_events(paths, ReplayStats()))
+    _reference = reference
+    _tolerance = tolerance
+
+
+def init_pool_worker(
+    paths: List[Path],
+    reference: Optional[List[float]],
+    tolerance: Optional[float],
+) -> None:
+    # for the life of the worker process
+    sys.stdout = open(os.devnull, "w")
+    init_worker(paths, reference, tolerance)
+
+
+def run_group(
+    task: Tuple[Params, List[Params]],
+) -> List[Tuple[Params, Score]]:
+    """
+    One detector replay, then the episode stage once per configuration.
+    """
+    detector_params, episode_grid = task
+
+    with patched(detector_params):
+        signals = detect(_events)
+
+    results = []
+    for episode_params in episode_grid:
+        with patched(episode_params):
+            score, starts = episodes(signals)
+
+        if _reference is not None:
+            score.f1 = compare(_reference, starts, _tolerance).f1
+
+        results.append(({**detector_params, **episode_params}, score))
+
+    return results
+
+
+# -------- GRID --------
+
+
+def expand(grid: Dict[str, Sequence[float]]) -> List[Params]:
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*grid.values())]
+
+
+def split_grid(
+    grid: Dict[str, Sequence[float]],
+) -> List[Tuple[Params, List[Params]]]:
+    """
+    One task per detector configuration, carrying every episode
+    configuration.
+    """
+    for name in grid:
+        _resolve(name)
+
+    detector = {k: v for k, v in grid.items() if stage_of(k) == "detector"}
+    episode = {k: v for k, v in grid.items() if stage_of(k) == "episode"}
+
+    episode_grid = expand(episode)
+    return [(params, episode_grid) for params in expand(detector)]
+
+
+def sweep(
+    paths: List[Path],
+    grid: Dict[str, Sequence[float]],
+    workers: Optional[int] = None,
+    reference: Optional[List[float]] = None,
+    tolerance: Optional[float] = None,
+) -> List[Tuple[Params, Score]]:
+    """
+    Scores every configuration of the grid, grouped by detector
+    configuration.
+    """
+    workers = WORKERS if workers is None else workers
+    tasks = split_grid(grid)
+
+    if workers <= 1:
+        with quiet():
+            init_worker(paths, reference, tolerance)
+            return [row for task in tasks for row in run_group(task)]
+
+    # fork: workers inherit the imported runtime instead of re-importing it
+    ctx = mp.get_context("fork") if "fork" in mp.get_all_start_methods() else mp
+    initargs = (paths, reference, tolerance)
+    with ctx.Pool(workers, init_pool_worker, initargs) as pool:
+        return [row for group in pool.imap(run_group, tasks) for row in group]
+
+
+# -------- SCOREBOARD --------
+
+
+def write_scoreboard(
+    rows: List[Tuple[Params, Score]], out, names: List[str]
+) -> None:
+    fields = list(asdict(Score()))
+    writer = csv.writer(out)
+    writer.writerow(names + fields)
+
+    for params, score in rows:
+        values = asdict(score)
+        writer.writerow([params[n] for n in names] + [values[f] for f in fields])
+
+
+def parse_grid(specs: List[str]) -> Dict[str, List[float]]:
+    """
+    "goal_continuity.NEW_EPISODE_THRESHOLD=0.3,0.4,0.5" per spec.
+    """
+    grid: Dict[str, List[float]] = {}
+    for spec in specs:
+        name, _, values = spec.partition("=")
+        grid[name.strip()] = [float(v) for v in values.split(",") if v.strip()]
+    return grid
+
+
+# -------- ENTRYPOINT --------
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Sweep detector thresholds over recorded logs"
+    )
+    parser.add_argument("paths", nargs="+", type=Path)
+    parser.add_argument(
+        "-p",
+        "--param",
+        action="append",
+        default=[],
+        metavar="MODULE.CONSTANT=V1,V2,...",
+        help="values to sweep; repeat for a grid",
+    )
+    parser.add_argument("-o", "--output", type=Path, help="scoreboard CSV")
+    parser.add_argument("-w", "--workers", type=int, default=WORKERS)
+    parser.add_argument(
+        "--reference",
+        action="store_true",
+        help="score F1 against offline boundaries (focus.boundaries)",
+    )
+    parser.add_argument("--tolerance", type=float)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    try:
+        grid = parse_grid(args.param)
+        tasks = split_grid(grid)
+    except ValueError as e:
+        parser.error(str(e))
+
+    reference = None
+    if args.reference:
+        with quiet():
+            reference = boundaries(read_events(args.paths, ReplayStats()))
+
+    started = time.perf_counter()
+    rows = sweep(args.paths, grid, args.workers, reference, args.tolerance)
+    elapsed = time.perf_counter() - started
+
+    names = list(grid)
+    if args.output:
+        with open(args.output, "w", newline="", encoding="utf-8") as out:
+            write_scoreboard(rows, out, names)
+
+    print(
+        f"{len(rows)} configurations ({len(tasks)} detector replays) "
+        f"on {args.workers} workers in {elapsed:.1f}s",
+        file=sys.stderr,
+    )
+
+    if reference is not None:
+        rows = sorted(rows, key=lambda r: -r[1].f1)
+    write_scoreboard(rows[: args.top], sys.stdout, names)
+
+
+if __name__ == "__main__":
+    main()
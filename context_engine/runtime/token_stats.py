@@ -0,0 +1,90 @@
+import heapq
+import math
+from operator import itemgetter
+from typing import Dict, Hashable, Iterable, Optional
+
+
+# ---------------- PARAMETERS ----------------
+
+IDF_HALF_LIFE = 6 * 3600  # seconds until a token sighting counts half
+IDF_MAX_TOKENS = 20000  # hard vocabulary cap
+IDF_PRUNE_TO = 0.75  # fraction of the cap kept when pruning
+IDF_FORGET = 1e-3  # decayed weight below which a token is dropped
+
+# weights are stored inflated relative to `origin`; rebase before floats overflow
+REBASE_LIMIT = 2.0**32
+
+
+# ---------------- TOKEN STATS ----------------
+
+
+class TokenStats:
+    """
+    Exponentially time-decayed token frequencies with a bounded vocabulary.
+
+    A sighting at time ts is stored as exp(rate * (ts - origin)) instead of
+    decaying every weight on every event. All weights share that factor,
+    so frequency() is a plain ratio and no per-event decay pass is needed.
+    """
+
+    def __init__(
+        self,
+        half_life: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+    ):
+        self.half_life = IDF_HALF_LIFE if half_life is None else half_life
+        self.max_tokens = IDF_MAX_TOKENS if max_tokens is None else max_tokens
+
+        self.rate = math.log(2) / self.half_life
+        self.origin: Optional[float] = None
+
+        self.weights: Dict[Hashable, float] = {}
+        self.total = 0.0
+
+    # ---------- PUBLIC ----------
+
+    def add(self, tokens: Iterable[Hashable], ts: float) -> None:
+        if self.origin is None:
+            self.origin = ts
+
+        gain = math.exp(self.rate * (ts - self.origin))
+
+        if gain > REBASE_LIMIT:
+            self._rebase(ts)
+            gain = 1.0
+
+        weights = self.weights
+        for t in tokens:
+            weights[t] = weights.get(t, 0.0) + gain
+            self.total += gain
+
+        if len(weights) > self.max_tokens:
+            self._prune()
+
+    def frequency(self, token: Hashable) -> float:
+        w = self.weights.get(token)
+        if not w:
+            return 0.0
+        return w / self.total
+
+    def __len__(self) -> int:
+        return len(self.weights)
+
+    # ---------- INTERNAL ----------
+
+    def _rebase(self, ts: float) -> None:
+        scale = math.exp(-self.rate * (ts - self.origin))
+        self.origin = ts
+        self.total *= scale
+
+        self.weights = {
+            t: w * scale for t, w in self.weights.items() if w * scale >= IDF_FORGET
+        }
+
+    def _prune(self) -> None:
+        # dropped tokens keep their share of `total`: they were seen, just
+        # too rarely to be worth remembering individually
+        keep = int(self.max_tokens * IDF_PRUNE_TO)
+        self.weights = dict(
+            heapq.nlargest(keep, self.weights.items(), key=itemgetter(1))
+        )
@@ -0,0 +1,189 @@
+import re
+from collections import OrderedDict
+from typing import FrozenSet, List, Optional, Tuple
+
+from .vocab import VOCAB, TokenIds
+
+
+# ---------------- PARAMETERS ----------------
+
+TITLE_CACHE = 4096  # (app, title) pairs
+TEXT_CACHE = 4096  # anchor strings
+
+STOP_WORDS = {
+    "youtube",
+    "google",
+    "search",
+    "stackoverflow",
+    "github",
+    "docs",
+    "documentation",
+    "home",
+    "watch",
+    "video",
+    "player",
+}
+
+
+# ---------------- NORMALIZATION ----------------
+
+TOKEN_RE = re.compile(r"[a-zA-Z0-9_]+")
+
+# one pass: urls are dropped, separators become spaces, other punctuation
+# is dropped; whitespace is collapsed by split()
+NORMALIZE_RE = re.compile(r"(https?://\S+)|([-–—|•·])|[^\w\s]")
+
+
+def _replace(m: re.Match) -> str:
+    return " " if m.lastindex == 2 else ""
+
+
+def normalize(text: str) -> str:
+    return " ".join(NORMALIZE_RE.sub(_replace, text.lower()).split())
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_RE.findall(text.lower())
+
+
+def extract_keywords(title: str) -> Tuple[str, ...]:
+    words = [w for w in normalize(title).split() if len(w) > 2 and w not in STOP_WORDS]
+
+    # keep top 4 words only (working memory constraint)
+    return tuple(words[:4])
+
+
+# ---------------- CACHED FEATURES ----------------
+
+
+class TitleTokens:
+    """
+    Everything the runtime derives from one (app, title) pair.
+    """
+
+    __slots__ = ("semantic", "ids", "keywords")
+
+    def __init__(self, app: str, title: str):
+        text = f"{app} {title}"
+
+        # lowercased text, as compared by reentry
+        self.semantic: str = text.lower()
+
+        # interned LoopDetector tokens
+        self.ids: TokenIds = VOCAB.encode(TOKEN_RE.findall(self.semantic))
+
+        # anchor keywords
+        self.keywords: Tuple[str, ...] = extract_keywords(title)
+
+
+class Tokenizer:
+    """
+    Bounded LRU memo over title and anchor tokenization.
+
+    Window titles repeat on every poll, so almost every lookup is a hit.
+    Cached ids are dropped whenever the vocabulary rolls over a
+    generation, so they can never refer to forgotten tokens.
+    """
+
+    def __init__(
+        self,
+        title_cache: Optional[int] = None,
+        text_cache: Optional[int] = None,
+    ):
+        self.title_limit = TITLE_CACHE if title_cache is None else title_cache
+        self.text_limit = TEXT_CACHE if text_cache is None else text_cache
+
+        self.titles: OrderedDict[Tuple[str, str], TitleTokens] = OrderedDict()
+        self.goals: OrderedDict[str, Tuple[str, ...]] = OrderedDict()
+        self.anchors: OrderedDict[str, FrozenSet[int]] = OrderedDict()
+
+        self.generation = VOCAB.generation
+
+        self.hits = 0
+        self.misses = 0
+
+    # ---------- PUBLIC ----------
+
+    def title(self, app: str, title: str) -> TitleTokens:
+        self._check_generation()
+
+        key = (app, title)
+        found = self.titles.get(key)
+
+        if found is not None:
+            self.hits += 1
+            self.titles.move_to_end(key)
+            return found
+
+        self.misses += 1
+        found = TitleTokens(app, title)
+        self._store(self.titles, key, found, self.title_limit)
+        return found
+
+    def goal_tokens(self, text: str) -> Tuple[str, ...]:
+        """
+        GoalContinuity tokens: lowercased words longer than two chars.
+        Strings, not ids: goal memory can outlive a token's vocabulary
+        generation.
+        """
+        self._check_generation()
+
+        found = self.goals.get(text)
+        if found is not None:
+            self.hits += 1
+            self.goals.move_to_end(text)
+            return found
+
+        self.misses += 1
+        found = tuple([t for t in text.lower().split() if len(t) > 2])
+        self._store(self.goals, text, found, self.text_limit)
+        return found
+
+    def anchor_ids(self, text: str) -> FrozenSet[int]:
+        """
+        Whitespace tokens of an anchor string as an id set.
+        """
+        self._check_generation()
+
+        found = self.anchors.get(text)
+        if found is not None:
+            self.hits += 1
+            self.anchors.move_to_end(text)
+            return found
+
+        self.misses += 1
+        found = frozenset(VOCAB.encode(text.split()))
+        self._store(self.anchors, text, found, self.text_limit)
+        return found
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "titles": len(self.titles),
+            "goals": len(self.goals),
+            "anchors": len(self.anchors),
+        }
+
+    def clear(self) -> None:
+        self.titles.clear()
+        self.goals.clear()
+        self.anchors.clear()
+
+    # ---------- INTERNAL ----------
+
+    def _check_generation(self) -> None:
+        if self.generation != VOCAB.generation:
+            self.generation = VOCAB.generation
+            self.clear()
+
+    @staticmethod
+    def _store(cache: OrderedDict, key, value, limit: int) -> None:
+        cache[key] = value
+        if len(cache) > limit:
+            cache.popitem(last=False)
+
+
+TOKENIZER = Tokenizer()
@@ -0,0 +1,96 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+# ---------------- PARAMETERS ----------------
+
+VOCAB_GENERATION = 50000  # tokens per generation before rollover
+
+
+TokenIds = Tuple[int, ...]
+
+
+# ---------------- VOCABULARY ----------------
+
+
+class Vocabulary:
+    """
+    Process-wide token interning: token strings -> small ints.
+
+    Runtime windows hold tuples / frozensets of ints instead of string
+    lists, and comparisons hash ints instead of strings. Tuples share the
+    int objects owned by the vocabulary, so encoding allocates nothing per
+    token (unlike array("I"), which boxes a fresh int on every read).
+
+    Memory stays bounded with two generations. When the current generation
+    is full it becomes the previous one; tokens seen again are promoted
+    with their old id, so ids are stable for every token still in use.
+    Tokens unseen for a whole generation are forgotten, and ids are never
+    reused, so stale ids can never alias a different token.
+    """
+
+    def __init__(self, generation_size: Optional[int] = None):
+        self.generation_size = (
+            VOCAB_GENERATION if generation_size is None else generation_size
+        )
+
+        self.ids: Dict[str, int] = {}
+        self.tokens: Dict[int, str] = {}
+
+        self.previous_ids: Dict[str, int] = {}
+        self.previous_tokens: Dict[int, str] = {}
+
+        self.next_id = 0
+
+        # bumped on rollover so caches of ids can invalidate themselves
+        self.generation = 0
+
+    # ---------- PUBLIC ----------
+
+    def intern(self, token: str) -> int:
+        i = self.ids.get(token)
+        if i is None:
+            i = self._add(token)
+        return i
+
+    def encode(self, tokens: Iterable[str]) -> TokenIds:
+        get = self.ids.get
+        return tuple(
+            [i if (i := get(t)) is not None else self._add(t) for t in tokens]
+        )
+
+    def decode(self, ids: Iterable[int]) -> List[str]:
+        return [self.token(i) for i in ids]
+
+    def token(self, i: int) -> str:
+        t = self.tokens.get(i)
+        if t is None:
+            t = self.previous_tokens[i]
+        return t
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    # ---------- INTERNAL ----------
+
+    def _add(self, token: str) -> int:
+        if len(self.ids) >= self.generation_size:
+            self._rollover()
+
+        i = self.previous_ids.get(token)
+        if i is None:
+            i = self.next_id
+            self.next_id += 1
+
+        self.ids[token] = i
+        self.tokens[i] = token
+        return i
+
+    def _rollover(self) -> None:
+        self.previous_ids = self.ids
+        self.previous_tokens = self.tokens
+        self.ids = {}
+        self.tokens = {}
+        self.generation += 1
+
+
+VOCAB = Vocabulary()
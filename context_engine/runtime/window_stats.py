@@ -0,0 +1,220 @@
+from collections import deque, Counter
+from math import log2
+from typing import Deque, Dict, Optional, Tuple
+
+
+def _clogc(c: int) -> float:
+    return c * log2(c) if c > 1 else 0.0
+
+
+class WindowStats:
+    """
+    Event window with aggregates maintained on push / evict.
+
+    Tracks, over consecutive events inside the window:
+    - context switches ((app, title) changes)
+    - the non-empty title histogram and its entropy
+    - app -> app transition counts and the dominant count
+    - the first event of the trailing same-context run
+
+    Every update is O(1), so metrics never rescan the window.
+    Eviction policy (time or size) is left to the owner.
+
+    Entries may be coalesced runs (runtime.coalesce.EventRun): a run
+    counts as its `count` samples, spanning start_ts .. ts. pop_sample()
+    evicts one sample, clipping the oldest run from the front, so with
+    per-sample eviction metrics match pushing the samples one by one.
+    """
+
+    def __init__(self):
+        self.events: Deque = deque()
+
+        self.switches = 0
+
+        self.titles: Counter[str] = Counter()
+        self.title_total = 0
+        self.title_clogc = 0.0  # sum of c * log2(c) over title counts
+
+        self.transitions: Counter[Tuple[str, str]] = Counter()
+        self.transition_total = 0
+        self.count_keys: Dict[int, int] = {}  # count -> transitions having it
+        self.dominant = 0
+
+        self.run_first = None
+
+        # samples of events[0] already evicted
+        self.head_offset = 0
+
+    # ---------- UPDATES ----------
+
+    def push(self, e, changed: Optional[bool] = None) -> None:
+        """
+        changed: whether e's context differs from the newest entry's,
+        if the caller already knows (runtime.features.Features.changed).
+        """
+        events = self.events
+        n = e.count
+
+        if events:
+            prev = events[-1]
+
+            if changed is None:
+                changed = prev.app != e.app or prev.title != e.title
+
+            if changed:
+                self.switches += 1
+                self.run_first = e
+
+            if prev.app:
+                self._add_transition((prev.app, e.app))
+        else:
+            self.run_first = e
+
+        # transitions between the samples of a run
+        if n > 1 and e.app:
+            self._add_transition((e.app, e.app), n - 1)
+
+        if e.title:
+            self._add_title(e.title, n)
+
+        events.append(e)
+
+    def popleft(self):
+        """
+        Evicts the oldest entry, or what is left of it.
+        """
+        events = self.events
+        e = events.popleft()
+        n = e.count - self.head_offset
+        self.head_offset = 0
+
+        if n > 1 and e.app:
+            self._remove_transition((e.app, e.app), n - 1)
+
+        if events:
+            nxt = events[0]
+
+            if e.app != nxt.app or e.title != nxt.title:
+                self.switches -= 1
+
+            if e.app:
+                self._remove_transition((e.app, nxt.app))
+
+            if self.run_first is e:
+                self.run_first = nxt
+        else:
+            self.run_first = None
+
+        if e.title:
+            self._remove_title(e.title, n)
+
+        return e
+
+    def pop_sample(self) -> None:
+        """
+        Evicts the oldest sample. Inside a run that only clips it: the
+        sample leaves the title count and its transition to the next
+        sample of the run.
+        """
+        e = self.events[0]
+        if e.count - self.head_offset == 1:
+            self.popleft()
+            return
+
+        self.head_offset += 1
+        if e.app:
+            self._remove_transition((e.app, e.app))
+        if e.title:
+            self._remove_title(e.title)
+
+    def first_ts(self) -> float:
+        """
+        Timestamp of the oldest sample still in the window.
+        """
+        e = self.events[0]
+        return e.stamps[self.head_offset] if self.head_offset else e.start_ts
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    # ---------- METRICS ----------
+
+    def title_entropy(self) -> float:
+        n = self.title_total
+        if not n:
+            return 0
+        # H = log2(n) - sum(c * log2(c)) / n, clamped against float drift
+        return max(0.0, log2(n) - self.title_clogc / n)
+
+    def dominant_share(self) -> float:
+        if not self.transition_total:
+            return 0
+        return self.dominant / self.transition_total
+
+    def run_duration(self) -> float:
+        if not self.events:
+            return 0
+        if self.run_first is self.events[0]:
+            return self.events[-1].ts - self.first_ts()
+        return self.events[-1].ts - self.run_first.start_ts
+
+    def span(self) -> float:
+        if not self.events:
+            return 0
+        return self.events[-1].ts - self.first_ts()
+
+    # ---------- INTERNAL ----------
+
+    def _add_title(self, title: str, n: int = 1) -> None:
+        c = self.titles[title]
+        self.titles[title] = c + n
+        self.title_total += n
+        self.title_clogc += _clogc(c + n) - _clogc(c)
+
+    def _remove_title(self, title: str, n: int = 1) -> None:
+        c = self.titles[title]
+        if c > n:
+            self.titles[title] = c - n
+        else:
+            del self.titles[title]
+
+        self.title_total -= n
+        if self.title_total:
+            self.title_clogc += _clogc(c - n) - _clogc(c)
+        else:
+            self.title_clogc = 0.0
+
+    def _add_transition(self, key: Tuple[str, str], n: int = 1) -> None:
+        c = self.transitions[key]
+        self.transitions[key] = c + n
+        self.transition_total += n
+
+        if c:
+            self._shift_count(c, -1)
+        self._shift_count(c + n, 1)
+
+        if c + n > self.dominant:
+            self.dominant = c + n
+
+    def _remove_transition(self, key: Tuple[str, str], n: int = 1) -> None:
+        c = self.transitions[key]
+        if c > n:
+            self.transitions[key] = c - n
+            self._shift_count(c - n, 1)
+        else:
+            del self.transitions[key]
+
+        self.transition_total -= n
+        self._shift_count(c, -1)
+
+        # the removed key held the maximum alone; with n == 1 it now
+        # holds c - 1, otherwise another key may be ahead of it
+        if c == self.dominant and c not in self.count_keys:
+            self.dominant = c - 1 if n == 1 else max(self.count_keys, default=0)
+
+    def _shift_count(self, c: int, delta: int) -> None:
+        n = self.count_keys.get(c, 0) + delta
+        if n:
+            self.count_keys[c] = n
+        else:
+            del self.count_keys[c]
@@ -0,0 +1,155 @@
+"""
+Human-readable episode labels, e.g. "Code: loop_detector context engine".
+
+Each open episode keeps the term counts of the anchors seen so far;
+an anchor only adds its own tokens, so labeling never revisits earlier
+anchors. Terms are ranked by count times their rarity across past
+episodes (time-decayed, see TokenStats), so words every episode
+shares ("main", "team") lose to the ones that name the task. A label
+is computed lazily and cached until the episode changes; finished
+episodes keep theirs in a bounded LRU cache.
+"""
+
+import heapq
+import math
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+from context_engine.runtime.episode import EpisodeFollower
+from context_engine.runtime.events import CognitiveEvent
+from context_engine.runtime.token_stats import TokenStats
+
+
+# ---------------- PARAMETERS ----------------
+
+LABEL_TERMS = 3  # task words after the app name
+LABEL_CACHE = 4096  # finished episode labels kept
+MIN_FREQUENCY = 1e-4  # rarity floor for terms never seen before
+
+
+def _is_term(token: str) -> bool:
+    return len(token) > 2 and not token.isdigit()
+
+
+# ---------------- EPISODE TERMS ----------------
+
+
+class EpisodeTerms:
+
+    __slots__ = ("apps", "terms", "label")
+
+    def __init__(self):
+        self.apps: Dict[str, int] = {}
+        self.terms: Dict[str, int] = {}
+        self.label: Optional[str] = None  # None = changed since last label
+
+    def add(self, anchor: str) -> None:
+        tokens = anchor.split()
+        if not tokens:
+            return
+
+        app, terms = tokens[0], self.terms
+        self.apps[app] = self.apps.get(app, 0) + 1
+
+        for t in tokens[1:]:
+            if _is_term(t):
+                terms[t] = terms.get(t, 0) + 1
+
+        self.label = None
+
+
+# ---------------- LABELER ----------------
+
+
+class Labeler(EpisodeFollower):
+    """
+    Incremental per-episode labels.
+
+    Fed directly by IntentBinder (start / add / finish), or attached to
+    a bus, where it follows EpisodeController's episodes (see
+    EpisodeFollower). on_label(episode_id, label) is called for every
+    finished episode.
+    """
+
+    def __init__(
+        self,
+        on_label: Optional[Callable[[int, str], None]] = None,
+        cache_size: Optional[int] = None,
+    ):
+        super().__init__()
+        self.on_label = on_label
+        self.cache_size = LABEL_CACHE if cache_size is None else cache_size
+
+        self.open: Dict[int, EpisodeTerms] = {}
+        self.labels: OrderedDict[int, str] = OrderedDict()
+        self.rarity = TokenStats()
+
+    # ---------- EPISODES ----------
+
+    def start(self, episode_id: int, anchor: str) -> None:
+        terms = self.open[episode_id] = EpisodeTerms()
+        terms.add(anchor)
+
+    def add(self, episode_id: int, anchor: str) -> None:
+        terms = self.open.get(episode_id)
+        if terms is not None:
+            terms.add(anchor)
+
+    def finish(self, episode_id: int, ts: float) -> Optional[str]:
+        terms = self.open.pop(episode_id, None)
+        if terms is None:
+            return self.labels.get(episode_id)
+
+        label = self._label(terms)
+
+        # rank later episodes against this one's vocabulary
+        self.rarity.add(terms.terms, ts)
+
+        self.labels[episode_id] = label
+        if len(self.labels) > self.cache_size:
+            self.labels.popitem(last=False)
+
+        if self.on_label is not None:
+            self.on_label(episode_id, label)
+        return label
+
+    def label(self, episode_id: int) -> Optional[str]:
+        terms = self.open.get(episode_id)
+        if terms is not None:
+            return self._label(terms)
+
+        label = self.labels.get(episode_id)
+        if label is not None:
+            self.labels.move_to_end(episode_id)
+        return label
+
+    # ---------- BUS ----------
+
+    def attach(self, bus, queued: bool = False) -> None:
+        bus.subscribe(self, types=self.TYPES, queued=queued)
+
+    def on_start(self, event: CognitiveEvent) -> None:
+        self.start(event.episode_id, event.anchor or "")
+
+    def on_loop(self, event: CognitiveEvent) -> None:
+        self.add(self.current, event.anchor)
+
+    def on_end(self, ts: float) -> None:
+        self.finish(self.current, ts)
+
+    # ---------- INTERNAL ----------
+
+    def _label(self, terms: EpisodeTerms) -> str:
+        if terms.label is not None:
+            return terms.label
+
+        app = max(terms.apps, key=terms.apps.get, default="")
+        frequency = self.rarity.frequency
+
+        def score(t: str) -> float:
+            return terms.terms[t] * -math.log(max(frequency(t), MIN_FREQUENCY))
+
+        words: List[str] = heapq.nlargest(LABEL_TERMS, terms.terms, key=score)
+
+        terms.label = f"{app.capitalize()}: {' '.join(words)}" if words else app
+        return terms.label
@@ -0,0 +1,292 @@
+import json
+import sqlite3
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+from context_engine.runtime.episode import Episode, EpisodeFollower
+from context_engine.runtime.events import CognitiveEvent
+
+
+# ---------------- PARAMETERS ----------------
+
+FORMAT = 1
+RECORD_BATCH = 256  # finished episodes buffered before one transaction
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value
+);
+
+CREATE TABLE IF NOT EXISTS episodes (
+    start_ts REAL NOT NULL,
+    id INTEGER NOT NULL,
+    end_ts REAL NOT NULL,
+    main_anchor TEXT NOT NULL,
+    anchors TEXT NOT NULL,
+    loop_count INTEGER NOT NULL,
+    suspend_count INTEGER NOT NULL,
+    ended INTEGER NOT NULL,
+    PRIMARY KEY (start_ts, id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS episode_tokens (
+    token TEXT NOT NULL,
+    start_ts REAL NOT NULL,
+    episode_id INTEGER NOT NULL,
+    PRIMARY KEY (token, start_ts, episode_id)
+) WITHOUT ROWID;
+"""
+
+COLUMNS = "start_ts, id, end_ts, main_anchor, anchors, loop_count, suspend_count, ended"
+JOINED = ", ".join(f"e.{c}" for c in COLUMNS.split(", "))
+
+
+def anchor_tokens(anchors: Iterable[str]) -> List[str]:
+    """
+    Anchors are normalized, space separated keywords.
+    """
+    return sorted({t for anchor in anchors for t in anchor.split()})
+
+
+# ---------------- STORE ----------------
+
+
+class EpisodeStore:
+    """
+    Durable episodes in SQLite, indexed by start time and by anchor token.
+
+    Episode ids restart with the runtime unless its state is restored,
+    so an episode is keyed by (start_ts, id), and rows are clustered by
+    start time. An episode overlaps [t0, t1] when start_ts <= t1 and
+    end_ts >= t0. The store keeps the longest episode span seen, so a
+    query only scans starts in [t0 - max_span, t1] instead of all
+    history; the token table is keyed (token, start_ts), so a token
+    query over a time range is one index range scan too.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        # AsyncRuntime records from its detection threads; calls are
+        # never concurrent, only on different threads
+        self.db = sqlite3.connect(self.path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+
+        self._check_format()
+        self.max_span = float(self._meta("max_span", 0.0))
+
+    # ---------- WRITE ----------
+
+    def put(self, episodes: Iterable[Episode]) -> int:
+        """
+        Inserts or replaces episodes in one transaction. An open
+        episode written again only gains anchors, so its token rows
+        are only ever added to.
+        """
+        rows = []
+        tokens = []
+        span = self.max_span
+
+        for e in episodes:
+            anchors = e.anchors or [e.main_anchor]
+            rows.append(
+                (
+                    e.start_ts,
+                    e.id,
+                    e.last_ts,
+                    e.main_anchor,
+                    json.dumps(anchors),
+                    e.loop_count,
+                    e.suspend_count,
+                    int(e.ended),
+                )
+            )
+            tokens.extend((t, e.start_ts, e.id) for t in anchor_tokens(anchors))
+            span = max(span, e.last_ts - e.start_ts)
+
+        if not rows:
+            return 0
+
+        with self.db:
+            self.db.executemany(
+                f"INSERT OR REPLACE INTO episodes ({COLUMNS}) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self.db.executemany(
+                "INSERT OR IGNORE INTO episode_tokens VALUES (?, ?, ?)", tokens
+            )
+            if span > self.max_span:
+                self.max_span = span
+                self._set_meta("max_span", span)
+
+        return len(rows)
+
+    def close(self) -> None:
+        self.db.close()
+
+    def __enter__(self) -> "EpisodeStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ---------- READ ----------
+
+    def overlapping(self, t0: float, t1: float) -> List[Episode]:
+        """
+        Episodes overlapping [t0, t1], by start time.
+        """
+        rows = self.db.execute(
+            f"SELECT {COLUMNS} FROM episodes "
+            "WHERE start_ts BETWEEN ? AND ? AND end_ts >= ? ORDER BY start_ts",
+            (t0 - self.max_span, t1, t0),
+        )
+        return [_episode(r) for r in rows]
+
+    def with_token(
+        self,
+        token: str,
+        t0: Optional[float] = None,
+        t1: Optional[float] = None,
+    ) -> List[Episode]:
+        """
+        Episodes whose anchors contain token, optionally only those
+        overlapping [t0, t1], by start time.
+        """
+        lo = float("-inf") if t0 is None else t0 - self.max_span
+        hi = float("inf") if t1 is None else t1
+        end = float("-inf") if t0 is None else t0
+
+        rows = self.db.execute(
+            f"SELECT {JOINED} "
+            "FROM episode_tokens t JOIN episodes e "
+            "ON e.start_ts = t.start_ts AND e.id = t.episode_id "
+            "WHERE t.token = ? AND t.start_ts BETWEEN ? AND ? AND e.end_ts >= ? "
+            "ORDER BY t.start_ts",
+            (token.lower(), lo, hi, end),
+        )
+        return [_episode(r) for r in rows]
+
+    def get(self, start_ts: float, episode_id: int) -> Optional[Episode]:
+        row = self.db.execute(
+            f"SELECT {COLUMNS} FROM episodes WHERE start_ts = ? AND id = ?",
+            (start_ts, episode_id),
+        ).fetchone()
+        return None if row is None else _episode(row)
+
+    def __len__(self) -> int:
+        return self.db.execute("SELECT COUNT(*) FROM episodes").fetchone()[0]
+
+    # ---------- INTERNAL ----------
+
+    def _meta(self, key: str, default=None):
+        row = self.db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return default if row is None else row[0]
+
+    def _set_meta(self, key: str, value) -> None:
+        self.db.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, value))
+
+    def _check_format(self) -> None:
+        found = self._meta("format")
+        if found is None:
+            with self.db:
+                self._set_meta("format", FORMAT)
+        elif found != FORMAT:
+            raise ValueError(f"unsupported episode store format {found}")
+
+
+def _episode(row: Tuple) -> Episode:
+    start_ts, id_, end_ts, main_anchor, anchors, loops, suspends, ended = row
+    return Episode(
+        id=id_,
+        start_ts=start_ts,
+        last_ts=end_ts,
+        main_anchor=main_anchor,
+        anchors=json.loads(anchors),
+        loop_count=loops,
+        suspend_count=suspends,
+        ended=bool(ended),
+    )
+
+
+# ---------------- RECORDER ----------------
+
+
+class EpisodeRecorder(EpisodeFollower):
+    """
+    Bus listener that assembles episodes from EPISODE_START / END,
+    LOOP_START and SUSPEND and writes them to an EpisodeStore in
+    batches of RECORD_BATCH.
+    """
+
+    def __init__(self, store: EpisodeStore, batch: Optional[int] = None):
+        super().__init__()
+        self.store = store
+        self.batch_size = RECORD_BATCH if batch is None else batch
+
+        self.episode: Optional[Episode] = None  # the open one
+        self.finished: List[Episode] = []
+        self.recorded = 0
+
+    def attach(self, bus) -> None:
+        bus.subscribe(self, types=self.TYPES)
+
+    def flush(self) -> None:
+        """
+        Writes finished episodes, plus the open one as not ended.
+        """
+        self.release()
+
+        episodes = self.finished
+        if self.episode is not None:
+            episodes = episodes + [self.episode]
+
+        self.recorded += self.store.put(episodes)
+        self.finished = []
+
+    # ---------- EPISODES ----------
+
+    def on_start(self, event: CognitiveEvent) -> None:
+        # the LOOP_START that opened it is its first loop
+        anchor = event.anchor or ""
+        self.episode = Episode(
+            event.episode_id, event.ts, event.ts, anchor, [anchor], loop_count=1
+        )
+
+    def on_loop(self, event: CognitiveEvent) -> None:
+        e = self.episode
+        e.last_ts = max(e.last_ts, event.ts)
+        e.loop_count += 1
+        if event.anchor not in e.anchors:
+            e.anchors.append(event.anchor)
+
+    def on_suspend(self, event: CognitiveEvent) -> None:
+        self.episode.suspend_count += 1
+
+    def on_end(self, ts: float) -> None:
+        e, self.episode = self.episode, None
+
+        e.last_ts = max(e.last_ts, ts)
+        e.ended = True
+        self.finished.append(e)
+
+        if len(self.finished) >= self.batch_size:
+            self.recorded += self.store.put(self.finished)
+            self.finished = []
+
+    def on_resume(self, event: CognitiveEvent) -> None:
+        """
+        Continues the episode's row as flushed on shutdown, if it was.
+        """
+        e = self.store.get(event.ts, event.episode_id)
+        if e is None:
+            self.on_start(event)
+            return
+
+        e.ended = False
+        self.episode = e
@@ -1,6 +1,9 @@
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional
+from typing import Dict
+
+
+STRING_POOL = 8192  # distinct app / title strings kept shared
 
 
 @dataclass
@@ -11,3 +14,64 @@ class WindowEvent:
     is_idle: bool
     idle_seconds: float
 
+
+# -------- STRING POOL --------
+
+# sys.intern'd strings are never freed on 3.12, and titles are unbounded,
+# so events share strings through a pool that is simply dropped when full
+_strings: Dict[str, str] = {}
+
+
+def share(text: str) -> str:
+    shared = _strings.get(text)
+    if shared is None:
+        if len(_strings) >= STRING_POOL:
+            _strings.clear()
+        _strings[text] = shared = text
+    return shared
+
+
+# -------- RUNTIME EVENT --------
+
+
+@dataclass(slots=True)
+class Event:
+    """
+    Canonical event consumed by every runtime detector.
+
+    No per-instance __dict__, a float epoch timestamp, and app / title
+    shared with every other event carrying the same text, so long
+    windows cost little more than their pointers.
+    """
+
+    ts: float
+    app: str
+    title: str
+    idle: float
+
+    def __post_init__(self):
+        self.app = share(self.app)
+        self.title = share(self.title)
+
+    def __reduce__(self):
+        # through __init__, so unpickled events (snapshots) share strings too
+        return Event, (self.ts, self.app, self.title, self.idle)
+
+    # an Event is also a run of one sample (see runtime.coalesce)
+
+    @property
+    def start_ts(self) -> float:
+        return self.ts
+
+    @property
+    def count(self) -> int:
+        return 1
+
+    @classmethod
+    def from_window_event(cls, event: WindowEvent) -> "Event":
+        return cls(
+            event.timestamp.timestamp(),
+            event.app,
+            event.title or "",
+            event.idle_seconds,
+        )
@@ -0,0 +1,349 @@
+import bisect
+import json
+import mmap
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from context_engine.state.event import Event
+
+
+# ---------------- PARAMETERS ----------------
+
+FORMAT = 1
+SEGMENT_EVENTS = 1 << 20  # rows per segment file set
+FLUSH_EVENTS = 4096  # rows buffered in memory before writing
+FLUSH_INTERVAL = 5.0  # ... or wall-clock seconds since the last write
+
+# column name -> array typecode (fixed width, native byte order)
+COLUMNS = {
+    "ts": "d",
+    "idle": "d",
+    "app": "I",
+    "title": "I",
+}
+
+
+# ---------------- READ SIDE ----------------
+
+
+class ColumnSlice:
+    """
+    Zero-copy view of consecutive rows of one segment.
+
+    ts / idle / app / title are memoryviews straight into the mapped
+    files; app and title hold ids into the store's string table. The
+    slice keeps its maps alive, so drop it before deleting the store.
+    """
+
+    __slots__ = ("ts", "idle", "app", "title", "_maps")
+
+    def __init__(self, views: Dict[str, memoryview], lo: int, hi: int, maps):
+        self.ts = views["ts"][lo:hi]
+        self.idle = views["idle"][lo:hi]
+        self.app = views["app"][lo:hi]
+        self.title = views["title"][lo:hi]
+        self._maps = maps
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+
+class Segment:
+    """
+    Memory-mapped columns of one segment. Rows are sorted by ts.
+    """
+
+    def __init__(self, root: Path, number: int):
+        self.number = number
+        self.maps: List[mmap.mmap] = []
+        self.views: Dict[str, memoryview] = {}
+
+        rows = None
+        for name, code in COLUMNS.items():
+            path = root / f"{number:06d}.{name}"
+            size = path.stat().st_size if path.exists() else 0
+            width = array(code).itemsize
+
+            if size:
+                with open(path, "rb") as f:
+                    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                self.maps.append(mapped)
+                view = memoryview(mapped)[: size - size % width].cast(code)
+            else:
+                view = memoryview(array(code))
+
+            self.views[name] = view
+            rows = len(view) if rows is None else min(rows, len(view))
+
+        # a crash between column writes leaves columns of unequal length
+        self.rows = rows or 0
+
+    def bounds(self) -> Optional[Tuple[float, float]]:
+        if not self.rows:
+            return None
+        ts = self.views["ts"]
+        return ts[0], ts[self.rows - 1]
+
+    def slice(self, t0: Optional[float], t1: Optional[float]) -> ColumnSlice:
+        ts = self.views["ts"]
+        lo = 0 if t0 is None else bisect.bisect_left(ts, t0, 0, self.rows)
+        hi = self.rows if t1 is None else bisect.bisect_right(ts, t1, lo, self.rows)
+        return ColumnSlice(self.views, lo, hi, self.maps)
+
+
+# ---------------- STORE ----------------
+
+
+class SessionStore:
+    """
+    Append-only segmented event store.
+
+    Each segment is four fixed-width column files (ts, idle as float64,
+    app and title as uint32 ids). Strings are dictionary-encoded in
+    strings.jsonl, one JSON string per line, line number = id.
+
+    Writes are buffered and appended in bulk. Reads memory-map the
+    column files and bisect the sorted ts column, so a time-range scan
+    touches only the rows it returns. An event older than the previous
+    one starts a new segment, which keeps every segment sorted.
+
+    There is one writer. Readers (replay, timelines, notebooks) open
+    the store read_only: they never repair or write anything, so they
+    can run while the writer appends, and each read picks up the
+    segments and strings written since.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        segment_events: Optional[int] = None,
+        flush_events: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        read_only: bool = False,
+    ):
+        self.root = Path(root)
+        self.segment_events = (
+            SEGMENT_EVENTS if segment_events is None else segment_events
+        )
+        self.flush_events = FLUSH_EVENTS if flush_events is None else flush_events
+        self.flush_interval = (
+            FLUSH_INTERVAL if flush_interval is None else flush_interval
+        )
+        self.read_only = read_only
+
+        if not read_only:
+            self.root.mkdir(parents=True, exist_ok=True)
+        self._check_format()
+
+        self.strings: List[str] = []
+        self.string_ids: Dict[str, int] = {}
+        self.strings_end = 0  # bytes of strings.jsonl loaded
+        self._load_strings()
+        self.pending_strings = 0
+
+        self.segment = self._last_segment()
+        if read_only:
+            self.segment_rows = Segment(self.root, self.segment).rows
+        else:
+            self.segment_rows = self._repair_segment()
+        self.last_ts: Optional[float] = self._last_ts()
+
+        self.buffer = {name: array(code) for name, code in COLUMNS.items()}
+        self.flushed_at = time.monotonic()
+
+        # sealed segments never change, so their maps are reused
+        self.sealed: Dict[int, Segment] = {}
+
+    # ---------- WRITE ----------
+
+    def append(self, event: Event) -> None:
+        if self.read_only:
+            raise ValueError("session store opened read-only")
+
+        buffered = len(self.buffer["ts"])
+
+        if self.last_ts is not None and event.ts < self.last_ts:
+            self._roll_segment()
+        elif self.segment_rows + buffered >= self.segment_events:
+            self._roll_segment()
+
+        self.buffer["ts"].append(event.ts)
+        self.buffer["idle"].append(event.idle)
+        self.buffer["app"].append(self._string_id(event.app))
+        self.buffer["title"].append(self._string_id(event.title))
+        self.last_ts = event.ts
+
+        if (
+            len(self.buffer["ts"]) >= self.flush_events
+            or time.monotonic() - self.flushed_at >= self.flush_interval
+        ):
+            self.flush()
+
+    def extend(self, events: Iterable[Event]) -> None:
+        for event in events:
+            self.append(event)
+
+    def flush(self) -> None:
+        self.flushed_at = time.monotonic()
+
+        # strings first: a reader must never see an id it cannot resolve
+        if self.pending_strings:
+            with open(self.root / "strings.jsonl", "a", encoding="utf-8") as f:
+                for s in self.strings[len(self.strings) - self.pending_strings :]:
+                    f.write(json.dumps(s))
+                    f.write("\n")
+            self.pending_strings = 0
+
+        rows = len(self.buffer["ts"])
+        if not rows:
+            return
+
+        for name, column in self.buffer.items():
+            with open(self._path(self.segment, name), "ab") as f:
+                column.tofile(f)
+            del column[:]
+
+        self.segment_rows += rows
+
+    def close(self) -> None:
+        self.flush()
+        self.sealed.clear()
+
+    def __enter__(self) -> "SessionStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ---------- READ ----------
+
+    def columns(
+        self, t0: Optional[float] = None, t1: Optional[float] = None
+    ) -> Iterator[ColumnSlice]:
+        """
+        Zero-copy column slices for rows with t0 <= ts <= t1, one per
+        overlapping segment, in segment order.
+        """
+        if self.read_only:
+            self.segment = self._last_segment()
+        else:
+            self.flush()
+
+        for number in range(self.segment + 1):
+            segment = self._open_segment(number)
+
+            # strings are written before the rows using them, so reading
+            # them after mapping the rows resolves every id
+            if self.read_only:
+                self._load_strings()
+
+            bounds = segment.bounds()
+            if bounds is None:
+                continue
+
+            first, last = bounds
+            if (t1 is not None and first > t1) or (t0 is not None and last < t0):
+                continue
+
+            part = segment.slice(t0, t1)
+            if len(part):
+                yield part
+
+    def scan(
+        self, t0: Optional[float] = None, t1: Optional[float] = None
+    ) -> Iterator[Event]:
+        strings = self.strings
+        for part in self.columns(t0, t1):
+            for ts, idle, app, title in zip(part.ts, part.idle, part.app, part.title):
+                yield Event(ts, strings[app], strings[title], idle)
+
+    def __len__(self) -> int:
+        self.flush()
+        return sum(self._open_segment(n).rows for n in range(self.segment + 1))
+
+    # ---------- INTERNAL ----------
+
+    def _path(self, number: int, name: str) -> Path:
+        return self.root / f"{number:06d}.{name}"
+
+    def _open_segment(self, number: int) -> Segment:
+        if number < self.segment:
+            segment = self.sealed.get(number)
+            if segment is None:
+                segment = self.sealed[number] = Segment(self.root, number)
+            return segment
+        return Segment(self.root, number)
+
+    def _roll_segment(self) -> None:
+        self.flush()
+        if self.segment_rows:
+            self.segment += 1
+            self.segment_rows = 0
+
+    def _string_id(self, text: str) -> int:
+        i = self.string_ids.get(text)
+        if i is None:
+            i = self.string_ids[text] = len(self.strings)
+            self.strings.append(text)
+            self.pending_strings += 1
+        return i
+
+    def _check_format(self) -> None:
+        meta = self.root / "meta.json"
+        if meta.exists():
+            found = json.loads(meta.read_text()).get("format")
+            if found != FORMAT:
+                raise ValueError(f"unsupported session store format {found}")
+        elif not self.read_only:
+            meta.write_text(json.dumps({"format": FORMAT}))
+
+    def _load_strings(self) -> None:
+        """
+        Loads strings appended since the last call.
+        """
+        path = self.root / "strings.jsonl"
+        if not path.exists():
+            return
+
+        with open(path, "rb") as f:
+            f.seek(self.strings_end)
+            data = f.read()
+
+        # a torn last line was never referenced by any flushed row; a
+        # reader leaves it, as the writer may still be writing it
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            text = json.loads(line)
+            self.string_ids[text] = len(self.strings)
+            self.strings.append(text)
+        self.strings_end += end
+
+        if end < len(data) and not self.read_only:
+            with open(path, "rb+") as f:
+                f.truncate(self.strings_end)
+
+    def _repair_segment(self) -> int:
+        """
+        Trims the active segment's columns to their common row count,
+        so appends after a crash stay aligned.
+        """
+        rows = Segment(self.root, self.segment).rows
+
+        for name, code in COLUMNS.items():
+            path = self._path(self.segment, name)
+            size = rows * array(code).itemsize
+            if path.exists() and path.stat().st_size != size:
+                with open(path, "rb+") as f:
+                    f.truncate(size)
+
+        return rows
+
+    def _last_segment(self) -> int:
+        numbers = [int(p.stem) for p in self.root.glob("*.ts") if p.stem.isdigit()]
+        return max(numbers, default=0)
+
+    def _last_ts(self) -> Optional[float]:
+        bounds = Segment(self.root, self.segment).bounds()
+        return bounds[1] if bounds else None
@@ -0,0 +1,140 @@
+import os
+import pickle
+import sys
+import time
+import types
+from pathlib import Path
+from typing import Optional
+
+from context_engine.runtime.tokenizer import TOKENIZER
+from context_engine.runtime.vocab import VOCAB
+
+
+# ---------------- PARAMETERS ----------------
+
+SNAPSHOT_VERSION = 3
+SNAPSHOT_INTERVAL = 30.0  # wall-clock seconds between periodic snapshots
+SNAPSHOT_PATH = Path("data/processed/runtime.snapshot")
+
+# never persisted: wiring is rebuilt by the process that restores
+EXCLUDE = {"bus"}
+
+
+# ---------------- STATE ----------------
+
+
+def component_state(obj) -> dict:
+    """
+    Instance attributes of a runtime component, minus the bus and any
+    per-instance function hooks (instrumentation wrappers).
+    """
+    return {
+        k: v
+        for k, v in vars(obj).items()
+        if k not in EXCLUDE
+        and not isinstance(v, (types.FunctionType, types.MethodType))
+        and not hasattr(v, "__wrapped__")
+    }
+
+
+def capture(detector, controller) -> bytes:
+    """
+    LoopDetector carries ReentryClassifier, TokenStats and its window
+    index; EpisodeController carries GoalContinuity. Windows hold
+    interned token ids, so the vocabulary is saved with them.
+    """
+    state = {
+        "version": SNAPSHOT_VERSION,
+        "vocab": vars(VOCAB),
+        "detector": component_state(detector),
+        "controller": component_state(controller),
+    }
+    return pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def restore(data: bytes, detector, controller) -> None:
+    state = pickle.loads(data)
+
+    if state.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"unsupported snapshot version {state.get('version')}")
+
+    if len(VOCAB) or VOCAB.previous_ids:
+        raise ValueError("snapshot must be restored before any event is processed")
+
+    vars(VOCAB).update(state["vocab"])
+    TOKENIZER.clear()
+    TOKENIZER.generation = VOCAB.generation
+
+    vars(detector).update(state["detector"])
+    vars(controller).update(state["controller"])
+
+
+# ---------------- FILES ----------------
+
+
+def save_snapshot(path: Path, detector, controller) -> None:
+    """
+    Atomic: readers see the previous snapshot or the new one, never a
+    partial file.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(capture(detector, controller))
+        f.flush()
+        os.fsync(f.fileno())
+
+    os.replace(tmp, path)
+
+
+def load_snapshot(path: Path, detector, controller) -> bool:
+    """
+    False when there is no usable snapshot: none yet, or one from
+    another version, truncated or corrupt, which is skipped with a
+    warning so the runtime cold starts.
+    """
+    path = Path(path)
+    if not path.exists():
+        return False
+
+    try:
+        restore(path.read_bytes(), detector, controller)
+    except (ValueError, pickle.UnpicklingError, EOFError, AttributeError) as exc:
+        print(f"Ignoring snapshot {path}: {exc}", file=sys.stderr)
+        return False
+
+    return True
+
+
+class Snapshotter:
+    """
+    Periodic snapshots from the ingestion loop; call maybe_save() after
+    every event; it only does work once per interval.
+    """
+
+    def __init__(
+        self,
+        detector,
+        controller,
+        path: Optional[Path] = None,
+        interval: Optional[float] = None,
+    ):
+        self.detector = detector
+        self.controller = controller
+        self.path = SNAPSHOT_PATH if path is None else Path(path)
+        self.interval = SNAPSHOT_INTERVAL if interval is None else interval
+        self.last_save = time.monotonic()
+
+    def restore(self) -> bool:
+        return load_snapshot(self.path, self.detector, self.controller)
+
+    def maybe_save(self) -> None:
+        now = time.monotonic()
+        if now - self.last_save >= self.interval:
+            self.save()
+            self.last_save = now
+
+    def save(self) -> None:
+        save_snapshot(self.path, self.detector, self.controller)
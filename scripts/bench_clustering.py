@@ -0,0 +1,75 @@
+"""
+Insert cost of AnchorClusters as the anchor history grows.
+
+Synthetic anchors come from a fixed set of tasks: each task has a few
+core keywords, and every anchor starts with one of a few apps and adds
+noise tokens (ticket numbers, file names). Reports inserts/s, verified
+comparisons per insert and cluster purity (share of anchors in their
+cluster's majority task).
+
+    python scripts/bench_clustering.py --anchors 200000 --tasks 2000
+"""
+
+import argparse
+import random
+import time
+from collections import Counter
+
+from context_engine.focus.clustering import AnchorClusters
+
+
+APPS = ["code", "firefox", "terminal"]
+
+
+def anchors(n: int, tasks: int, seed: int = 1):
+    rng = random.Random(seed)
+    cores = [[f"t{k}w{w}" for w in range(4)] for k in range(tasks)]
+
+    for _ in range(n):
+        task = rng.randrange(tasks)
+        words = [rng.choice(APPS)] + rng.sample(cores[task], 3)
+        words += [f"n{rng.randrange(100000)}" for _ in range(rng.randint(0, 2))]
+        yield task, " ".join(words)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--anchors", type=int, default=200000)
+    parser.add_argument("--tasks", type=int, default=2000)
+    parser.add_argument("--step", type=int, default=50000)
+    args = parser.parse_args()
+
+    clusters = AnchorClusters()
+    truth = {}
+
+    started = time.perf_counter()
+    last = started
+    compared = 0
+
+    for n, (task, anchor) in enumerate(anchors(args.anchors, args.tasks), 1):
+        truth[clusters.add(anchor)] = task
+
+        if n % args.step == 0:
+            now = time.perf_counter()
+            print(
+                f"{n:8d} anchors  {args.step / (now - last):8.0f} inserts/s  "
+                f"{(clusters.comparisons - compared) / args.step:6.1f} "
+                f"comparisons/insert"
+            )
+            last = now
+            compared = clusters.comparisons
+
+    by_cluster = {}
+    for i, task in truth.items():
+        by_cluster.setdefault(clusters.find(i), Counter())[task] += 1
+
+    majority = sum(c.most_common(1)[0][1] for c in by_cluster.values())
+    print(
+        f"{len(clusters)} distinct anchors in {len(by_cluster)} clusters "
+        f"({args.tasks} tasks), purity {majority / len(truth):.1%}, "
+        f"{time.perf_counter() - started:.1f}s total"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+`log stream` payload decoding: the old non-greedy regex + json.loads
+against LineDecoder (find + raw_decode), per line and batched.
+
+A share of the titles contain braces and some payloads carry a nested
+object, which the regex path cannot decode; the decoded counts show it.
+
+    python scripts/bench_decoder.py --lines 200000
+"""
+
+import argparse
+import json
+import random
+import re
+import time
+
+from context_engine.runtime.decoder import LineDecoder
+
+
+PREFIX = "2024-01-01 12:00:00.000 Df ContextAgent[123:456] [com.context.agent] "
+
+TITLES = [
+    "loop_detector.py — context-engine",
+    "python deque popleft - Stack Overflow",
+    "Flutter docs | StatefulWidget",
+    "main.dart — flutter_app",
+    "fn render() { ... } — scratch.rs",
+    "{} Untitled",
+]
+
+JSON_RE = re.compile(r"{.*?}")
+
+
+def lines(n: int, nested: float):
+    rng = random.Random(1)
+    for i in range(n):
+        payload = {
+            "ts": 1700000000.0 + i,
+            "app": "Code",
+            "title": rng.choice(TITLES),
+            "idle": round(rng.random() * 30, 2),
+        }
+        if rng.random() < nested:
+            payload["window"] = {"id": i, "screen": 1}
+        yield PREFIX + json.dumps(payload)
+
+
+def regex_decode(batch):
+    out = []
+    for line in batch:
+        match = JSON_RE.search(line)
+        if not match:
+            continue
+        try:
+            out.append(json.loads(match.group(0)))
+        except json.JSONDecodeError:
+            pass
+    return out
+
+
+def decoder_per_line(batch):
+    decode = LineDecoder().decode
+    out = []
+    for line in batch:
+        data = decode(line)
+        if data is not None:
+            out.append(data)
+    return out
+
+
+def decoder_batch(batch):
+    return LineDecoder().decode_batch(batch)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lines", type=int, default=200000)
+    parser.add_argument("--nested", type=float, default=0.1)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    batch = list(lines(args.lines, args.nested))
+
+    for name, fn in [
+        ("regex + json.loads", regex_decode),
+        ("LineDecoder.decode", decoder_per_line),
+        ("LineDecoder.decode_batch", decoder_batch),
+    ]:
+        best = float("inf")
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            decoded = fn(batch)
+            best = min(best, time.perf_counter() - started)
+
+        print(
+            f"{name:26s} {len(batch) / best:10.0f} lines/s  "
+            f"{len(decoded)}/{len(batch)} decoded"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Memory held by a window of events: per-module dataclass vs the slotted
+state.event.Event with shared app / title strings.
+
+Events are built from freshly parsed lines, as the runtime does, so
+every legacy event owns its own copies of app and title.
+
+    python scripts/bench_event_memory.py --events 50000
+"""
+
+import argparse
+import random
+import tracemalloc
+from collections import deque
+from dataclasses import dataclass
+
+from context_engine.state.event import Event
+
+
+@dataclass
+class LegacyEvent:
+    ts: float
+    app: str
+    title: str
+    idle: float
+
+
+TITLES = [
+    "Code|loop_detector.py — context-engine",
+    "Code|event_bus.py — context-engine",
+    "Firefox|python deque popleft - Stack Overflow",
+    "Firefox|Flutter docs | StatefulWidget",
+    "Terminal|pytest context-engine",
+    "Slack|general | team",
+]
+
+
+def lines(n: int):
+    rng = random.Random(1)
+    for i in range(n):
+        yield f"{1700000000 + i}|{rng.choice(TITLES)}|{rng.random() * 30:.2f}"
+
+
+def measure(cls, n: int) -> int:
+    window = deque()
+
+    tracemalloc.start()
+    for line in lines(n):
+        ts, app, rest = line.split("|", 2)
+        title, idle = rest.rsplit("|", 1)
+        window.append(cls(float(ts), app, title, float(idle)))
+
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=50_000)
+    args = parser.parse_args()
+
+    legacy = measure(LegacyEvent, args.events)
+    slotted = measure(Event, args.events)
+
+    print(f"{args.events} events in a window")
+    print(f"dataclass: {legacy / 2**20:7.2f} MB ({legacy / args.events:5.0f} B/event)")
+    print(f"slotted  : {slotted / 2**20:7.2f} MB ({slotted / args.events:5.0f} B/event)")
+    print(f"saving   : {1 - slotted / legacy:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Side-by-side detectors with and without the shared feature stage.
+
+Runs LoopDetector, CognitiveState, CognitiveSession, SessionBuilder,
+Sessionizer and extract_anchor over the same recorded log, first each
+deriving its own features from the raw event, then all subscribed to
+one FeaturePipeline. Detector printouts are discarded. Also checks
+that LoopDetector emits the same cognitive events both ways.
+
+    python scripts/bench_features.py data/raw_logs
+"""
+
+import argparse
+import contextlib
+import io
+import time
+from pathlib import Path
+
+from context_engine.runtime.anchor_extractor import extract_anchor
+from context_engine.runtime.cognitive_session import CognitiveSession
+from context_engine.runtime.cognitive_state import CognitiveState
+from context_engine.runtime.event_bus import EventBus
+from context_engine.runtime.features import FeaturePipeline
+from context_engine.runtime.loop_detector import LoopDetector
+from context_engine.runtime.replay import ReplayStats, read_events
+from context_engine.runtime.session_builder import SessionBuilder
+from context_engine.runtime.sessionizer import Sessionizer
+
+
+def detectors():
+    bus = EventBus()
+    emitted = []
+    bus.subscribe(emitted.append)
+
+    loop = LoopDetector(bus)
+    others = [CognitiveState(), CognitiveSession(), SessionBuilder(), Sessionizer()]
+    return loop, others, emitted
+
+
+def separate(events):
+    loop, (state, session, builder, sessionizer), emitted = detectors()
+    anchors = []
+
+    for e in events:
+        loop.process(e)
+        state.process(e)
+        session.process(e)
+        builder.process(e)
+        sessionizer.feed(e)
+        anchors.append(extract_anchor(e))
+
+    return emitted, anchors
+
+
+def shared(events):
+    loop, (state, session, builder, sessionizer), emitted = detectors()
+    anchors = []
+
+    pipeline = FeaturePipeline()
+    pipeline.subscribe(loop.process_features)
+    pipeline.subscribe(state.process_features)
+    pipeline.subscribe(session.process_features)
+    pipeline.subscribe(builder.process_features)
+    pipeline.subscribe(sessionizer.feed_features)
+    pipeline.subscribe(lambda f: anchors.append(extract_anchor(f)))
+
+    for e in events:
+        pipeline.process(e)
+
+    return emitted, anchors
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("paths", nargs="+", type=Path)
+    args = parser.parse_args()
+
+    events = list(read_events(args.paths, ReplayStats()))
+    results = {}
+
+    for name, run in (("per detector", separate), ("shared stage", shared)):
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            results[name] = run(events)
+            elapsed = time.perf_counter() - started
+
+        print(f"{name:14s} {len(events) / elapsed:10.0f} events/s  ({elapsed:.2f}s)")
+
+    (a_events, a_anchors), (b_events, b_anchors) = results.values()
+    print(f"same cognitive events: {a_events == b_events}")
+    print(f"same anchors:          {a_anchors == b_anchors}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+GoalContinuity.is_same_goal cost as goal memory grows.
+
+The previous implementation re-summed the goal Counter on every
+absorb and overlap score and decayed every key in place; it is kept
+here as CounterGoalContinuity. Both run over the same synthetic
+anchor stream: a few task words plus fresh detail words, so episodes
+are long and their vocabulary keeps growing. Reports calls/s and
+checks both make the same episode decisions.
+
+    python scripts/bench_goal_continuity.py --anchors 20000
+"""
+
+import argparse
+import random
+import time
+from collections import Counter
+
+from context_engine.runtime import goal_continuity
+from context_engine.runtime.goal_continuity import GoalContinuity
+
+
+class CounterGoalContinuity(GoalContinuity):
+    def __init__(self):
+        super().__init__()
+        self.goal_tokens = Counter()
+
+    def _overlap_score(self, tokens):
+        shared = sum(self.goal_tokens[t] for t in tokens if t in self.goal_tokens)
+        total = sum(self.goal_tokens.values()) + 1
+        return shared / total
+
+    def _specialization_score(self, tokens):
+        new_tokens = [t for t in tokens if t not in self.goal_tokens]
+        return goal_continuity.math.tanh(len(new_tokens) / 6)
+
+    def _absorb(self, tokens):
+        for t in tokens:
+            self.goal_tokens[t] += 1
+
+        if sum(self.goal_tokens.values()) > goal_continuity.GOAL_MEMORY:
+            for k in list(self.goal_tokens.keys()):
+                self.goal_tokens[k] *= 0.85
+
+
+def anchors(n: int, seed: int = 1):
+    rng = random.Random(seed)
+    words = ["flutter", "widget", "state", "render", "layout", "build"]
+
+    ts = 0.0
+    for i in range(n):
+        ts += rng.choice([2.0, 3.0, 5.0])
+        detail = [f"detail{i}x{k}" for k in range(rng.randint(1, 3))]
+        yield ts, " ".join(rng.sample(words, 2) + detail)
+
+
+def run(goal: GoalContinuity, stream):
+    decisions = []
+    started = time.perf_counter()
+    for ts, anchor in stream:
+        decisions.append(goal.is_same_goal("code", anchor, ts))
+    return decisions, time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--anchors", type=int, default=20000)
+    args = parser.parse_args()
+
+    stream = list(anchors(args.anchors))
+
+    before, before_s = run(CounterGoalContinuity(), stream)
+    goal = GoalContinuity()
+    after, after_s = run(goal, stream)
+
+    episodes = sum(1 for same in after if not same)
+    print(f"{args.anchors} anchors, {episodes} episodes")
+    print(f"  Counter memory   {args.anchors / before_s:10.0f} calls/s")
+    print(
+        f"  lazy scale       {args.anchors / after_s:10.0f} calls/s  "
+        f"({before_s / after_s:.1f}x, {len(goal.goal_tokens)} tokens held)"
+    )
+    print(f"  same decisions:  {before == after}")
+
+
+if __name__ == "__main__":
+    main()
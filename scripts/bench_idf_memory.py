@@ -0,0 +1,109 @@
+"""
+RSS against event count for LoopDetector IDF statistics.
+
+Compares the old unbounded Counter against TokenStats on a synthetic
+multi-day stream where titles keep introducing fresh tokens (ticket ids,
+file names, search terms). Each variant runs in its own process so the
+RSS numbers do not mix.
+
+    python scripts/bench_idf_memory.py --events 2000000
+"""
+
+import argparse
+import random
+import resource
+import subprocess
+import sys
+from collections import Counter
+
+from context_engine.runtime.tokenizer import tokenize
+from context_engine.runtime.token_stats import TokenStats
+
+
+COMMON = [
+    "code",
+    "firefox",
+    "terminal",
+    "context",
+    "engine",
+    "loop_detector",
+    "py",
+    "stack",
+    "overflow",
+    "python",
+    "deque",
+    "slack",
+    "general",
+]
+
+
+class LegacyStats:
+    def __init__(self):
+        self.global_freq = Counter()
+        self.total_tokens = 0
+
+    def add(self, tokens, ts):
+        for t in tokens:
+            self.global_freq[t] += 1
+            self.total_tokens += 1
+
+
+def rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * resource.getpagesize() / 2**20
+    except OSError:
+        # macOS: ru_maxrss is in bytes and only tracks the peak
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2**20
+
+
+def run(variant: str, events: int, step: int) -> None:
+    rng = random.Random(1)
+    stats = LegacyStats() if variant == "counter" else TokenStats()
+
+    ts = 0.0
+    for i in range(1, events + 1):
+        ts += 1.0
+        title = " ".join(rng.choices(COMMON, k=3))
+
+        # one in five titles carries a never-seen-before token
+        if rng.random() < 0.2:
+            title += f" ticket-{i} {rng.getrandbits(40):x}"
+
+        stats.add(tokenize(title), ts)
+
+        if i % step == 0:
+            print(f"{variant},{i},{rss_mb():.1f}", flush=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=1_000_000)
+    parser.add_argument("--step", type=int, default=100_000)
+    parser.add_argument("--variant", choices=["counter", "decayed"])
+    args = parser.parse_args()
+
+    if args.variant:
+        run(args.variant, args.events, args.step)
+        return
+
+    print("variant,events,rss_mb")
+    for variant in ("counter", "decayed"):
+        subprocess.run(
+            [
+                sys.executable,
+                __file__,
+                "--variant",
+                variant,
+                "--events",
+                str(args.events),
+                "--step",
+                str(args.step),
+            ],
+            check=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+WorkingMemory.nearest: linear SequenceMatcher scan vs indexed lookup.
+
+Fills the window with realistic window titles at the given event rate
+and times lookups for a stream of fresh titles. Both modes must return
+the same items and scores.
+
+    python scripts/bench_working_memory.py --rate 5 --queries 2000
+"""
+
+import argparse
+import random
+import time
+
+from context_engine.runtime.semantic_memory import WINDOW, WorkingMemory
+
+
+TITLES = [
+    "code loop_detector.py — context-engine",
+    "code event_bus.py — context-engine",
+    "firefox python deque popleft - stack overflow",
+    "firefox flutter error setstate called after dispose - stack overflow",
+    "firefox flutter docs | statefulwidget",
+    "terminal pytest context-engine",
+    "slack general | team",
+    "mail inbox (3) — work",
+    "spotify discover weekly",
+]
+
+
+def make_titles(rng: random.Random, n: int):
+    out = []
+    for i in range(n):
+        title = rng.choice(TITLES)
+        if rng.random() < 0.3:
+            title += f" ({rng.randint(1, 99)})"
+        if rng.random() < 0.1:
+            title = f"firefox search {rng.getrandbits(32):x} - google search"
+        out.append(title)
+    return out
+
+
+def run(indexed: bool, titles, rate: float):
+    memory = WorkingMemory(indexed=indexed)
+    results = []
+
+    ts = 0.0
+    elapsed = 0.0
+    for title in titles:
+        ts += 1.0 / rate
+
+        started = time.perf_counter()
+        best, score = memory.nearest(title)
+        elapsed += time.perf_counter() - started
+
+        results.append((best.text if best else None, score))
+        memory.add(ts, title)
+
+    return elapsed, results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rate", type=float, default=5.0, help="events per second")
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    titles = make_titles(random.Random(1), args.queries)
+    window = int(WINDOW * args.rate)
+
+    linear_s, linear = run(False, titles, args.rate)
+    indexed_s, indexed = run(True, titles, args.rate)
+
+    assert linear == indexed, "indexed lookup diverged from linear scan"
+
+    per = 1e6 / args.queries
+    print(f"window ~{window} items, {args.queries} lookups")
+    print(f"linear : {linear_s * per:8.1f} us/lookup")
+    print(f"indexed: {indexed_s * per:8.1f} us/lookup ({linear_s / indexed_s:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+import argparse
+from pathlib import Path
+
+from context_engine.runtime.replay import RAW_LOGS, ReplayStats, read_log_events
+from context_engine.runtime.run_runtime import STORE_PATH
+from context_engine.state.session_store import SessionStore
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Convert recorded agent logs into a columnar SessionStore"
+    )
+    parser.add_argument("paths", nargs="*", type=Path, default=[RAW_LOGS])
+    parser.add_argument("--store", type=Path, default=STORE_PATH)
+    args = parser.parse_args()
+
+    stats = ReplayStats()
+    with SessionStore(args.store) as store:
+        store.extend(read_log_events(args.paths, stats))
+
+    print(f"ingested {stats.events} events ({stats.skipped} skipped) into {args.store}")
+
+
+if __name__ == "__main__":
+    main()
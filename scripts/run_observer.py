@@ -1,6 +1,6 @@
-import time
 import platform
 
+from context_engine.observer.base import WatchStats
 from context_engine.observer.macos_ax import MacOSAXObserver
 
 
@@ -15,19 +15,22 @@ def main():
 
     print("Recording events... Ctrl+C to stop\n")
 
+    stats = WatchStats()
+
     try:
-        while True:
-            event = observer.poll()
+        for event in observer.watch(stats=stats):
             print(
                 f"{event.timestamp.strftime('%H:%M:%S')} | "
                 f"{event.app:20} | "
                 f"{str(event.title or '')[:40]:40} | "
                 f"idle={event.idle_seconds:.1f}"
             )
-            time.sleep(1)
 
     except KeyboardInterrupt:
-        print("\nStopped.")
+        print(
+            f"\nStopped. {stats.emitted} events from {stats.polls} polls "
+            f"({stats.heartbeats} heartbeats)"
+        )
 
 
 if __name__ == "__main__":
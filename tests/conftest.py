@@ -0,0 +1,75 @@
+import random
+
+import pytest
+
+from context_engine.runtime.tokenizer import TOKENIZER
+from context_engine.runtime.vocab import VOCAB, Vocabulary
+from context_engine.state.event import Event
+
+
+TASKS = [
+    [
+        ("Code", "loop_detector.py — context-engine"),
+        ("Firefox", "python deque popleft - Stack Overflow"),
+        ("Terminal", "pytest context-engine"),
+    ],
+    [
+        ("Firefox", "Flutter docs | StatefulWidget"),
+        ("Code", "main.dart — flutter_app"),
+        ("Simulator", "iPhone 15"),
+    ],
+    [("Slack", "general | team"), ("Mail", "Inbox (3)")],
+    [
+        ("Code", "event_bus.py — context-engine"),
+        ("Firefox", "asyncio queue - Python docs"),
+    ],
+]
+
+
+def agent_events(n, seed=3):
+    """
+    A recorded-looking agent stream: a few tasks of a few windows each,
+    1-2 s sampling, idle counting up with resets and long breaks.
+    """
+    rng = random.Random(seed)
+    ts = 1.7e9
+    idle = 0.0
+    task = rng.choice(TASKS)
+    app, title = rng.choice(task)
+
+    events = []
+    for _ in range(n):
+        ts += rng.choice([1, 1, 1, 2])
+        if rng.random() < 0.004:
+            task = rng.choice(TASKS)
+        if rng.random() < 0.15:
+            app, title = rng.choice(task)
+
+        idle = 0.0 if rng.random() < 0.3 else idle + 1
+        if rng.random() < 0.001:
+            idle = rng.choice([25, 60, 300])
+
+        events.append(Event(ts, app, title, idle))
+    return events
+
+
+@pytest.fixture(scope="session")
+def day_events():
+    return agent_events(15000)
+
+
+@pytest.fixture
+def fresh_vocabulary():
+    """
+    Resets the process-wide vocabulary to what a newly started process
+    has, e.g. before restoring a snapshot; reset again after the test,
+    so nothing it interned or rolled over leaks into later tests.
+    """
+
+    def reset():
+        vars(VOCAB).update(vars(Vocabulary()))
+        TOKENIZER.clear()
+        TOKENIZER.generation = VOCAB.generation
+
+    yield reset
+    reset()
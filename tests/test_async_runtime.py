@@ -0,0 +1,37 @@
+import asyncio
+import io
+
+from context_engine.runtime.async_runtime import AsyncRuntime
+from context_engine.runtime.replay import replay
+from context_engine.runtime.run_runtime import EPISODE_PATH, STORE_PATH
+from context_engine.state.episode_store import EpisodeStore
+from context_engine.state.session_store import SessionStore
+from context_engine.state.snapshot import SNAPSHOT_PATH
+
+
+def test_episodes_events_and_snapshot_are_kept(
+    tmp_path, monkeypatch, day_events, fresh_vocabulary
+):
+    events = day_events[:6000]
+    log = tmp_path / "agent.log"
+    log.write_text("".join(f"{e.ts}|{e.app}|{e.title}|{e.idle}\n" for e in events))
+
+    # the runtime's data paths are relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    runtime = AsyncRuntime(cmd=["cat", str(log)], batch_size=64)
+    asyncio.run(runtime.run())
+
+    fresh_vocabulary()
+    with EpisodeStore(tmp_path / "expected.sqlite") as expected_store:
+        replay(events, io.StringIO(), episodes=expected_store)
+        expected = expected_store.overlapping(float("-inf"), float("inf"))
+
+    with EpisodeStore(EPISODE_PATH) as store:
+        recorded = store.overlapping(float("-inf"), float("inf"))
+
+    assert len(expected) > 2
+    assert recorded == expected
+
+    with SessionStore(STORE_PATH, read_only=True) as store:
+        assert sum(len(part) for part in store.columns()) == len(events)
+    assert SNAPSHOT_PATH.exists()
@@ -0,0 +1,80 @@
+import random
+
+from context_engine.focus.boundaries import (
+    _Candidate,
+    _pelt,
+    compare,
+    segment,
+)
+from context_engine.state.event import Event
+
+
+def exhaustive_cost(tokens, penalty):
+    n = len(tokens)
+    best = [0.0] + [float("inf")] * n
+
+    for t in range(1, n + 1):
+        for s in range(t):
+            cand = _Candidate(s, 0.0)
+            for run in tokens[s:t]:
+                cand.add(run)
+            best[t] = min(best[t], best[s] + cand.cost() + penalty)
+
+    return best[n] - penalty
+
+
+def partition_cost(tokens, starts, penalty):
+    total = -penalty
+    for a, b in zip(starts, starts[1:] + [len(tokens)]):
+        cand = _Candidate(a, 0.0)
+        for run in tokens[a:b]:
+            cand.add(run)
+        total += cand.cost() + penalty
+    return total
+
+
+def test_pruned_search_finds_the_exhaustive_optimum():
+    rng = random.Random(5)
+    topics = [["code", "loop", "detector"], ["firefox", "docs", "flutter"], ["slack"]]
+
+    for _ in range(20):
+        tokens = []
+        for _ in range(rng.randint(1, 40)):
+            topic = rng.choice(topics)
+            tokens.append(rng.sample(topic, rng.randint(1, len(topic))))
+
+        for penalty in (0.5, 4.0, 15.0):
+            starts = _pelt(tokens, penalty)
+            assert starts[0] == 0
+            assert abs(
+                partition_cost(tokens, starts, penalty)
+                - exhaustive_cost(tokens, penalty)
+            ) < 1e-9
+
+
+def test_segments_split_on_topic_change_and_long_silence():
+    events = []
+    ts = 0.0
+    for title in ["loop_detector.py context"] * 30 + ["flutter docs widget"] * 30:
+        ts += 1.0
+        events.append(Event(ts, "Code" if "py" in title else "Firefox", title, 0.0))
+
+        # alternate titles so runs stay short
+        ts += 1.0
+        events.append(Event(ts, "Terminal", "pytest", 0.0))
+
+    ts += 1000.0
+    events.append(Event(ts, "Slack", "general", 0.0))
+
+    starts = [s.start for s in segment(events, penalty=10.0)]
+    # the shared pytest run at 60 may open either segment
+    assert len(starts) == 3
+    assert starts[0] == 1.0 and starts[1] in (60.0, 61.0) and starts[2] == ts
+
+
+def test_compare_matches_boundaries_one_to_one_within_tolerance():
+    score = compare([10.0, 100.0, 200.0], [12.0, 15.0, 150.0, 205.0], tolerance=10)
+
+    assert score.matched == 2
+    assert score.precision == 0.5
+    assert abs(score.recall - 2 / 3) < 1e-12
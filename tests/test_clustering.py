@@ -0,0 +1,95 @@
+import random
+
+from context_engine.focus.clustering import AnchorClusters, anchor_tokens, overlap
+from context_engine.runtime.episode import Episode
+
+
+APPS = ["code", "firefox", "terminal"]
+
+
+def partition(groups):
+    return {frozenset(anchors) for anchors in groups}
+
+
+def batch_clusters(anchors, threshold=0.35):
+    """
+    Every pair compared, related pairs joined transitively.
+    """
+    anchors = list(dict.fromkeys(anchors))
+    tokens = [anchor_tokens(a) for a in anchors]
+    parent = list(range(len(anchors)))
+
+    def find(i):
+        while parent[i] != i:
+            i = parent[i]
+        return i
+
+    for i in range(len(anchors)):
+        for j in range(i):
+            if overlap(tokens[i], tokens[j]) > threshold:
+                parent[find(i)] = find(j)
+
+    groups = {}
+    for i, anchor in enumerate(anchors):
+        groups.setdefault(find(i), []).append(anchor)
+    return partition(groups.values())
+
+
+def test_distinct_tasks_in_one_app_stay_separate():
+    clusters = AnchorClusters()
+    for anchor in ["code x", "code y", "code alpha beta", "code gamma delta"]:
+        clusters.add(anchor)
+
+    assert len(clusters.clusters()) == 4
+
+    # the same task in one app still merges
+    a = clusters.add("code loop_detector py context engine")
+    b = clusters.add("code event_bus py context engine")
+    assert clusters.find(a) == clusters.find(b)
+    assert len(clusters.clusters()) == 5
+
+
+def test_incremental_clusters_match_a_batch_build():
+    rng = random.Random(5)
+    cores = [[f"t{k}w{w}" for w in range(4)] for k in range(40)]
+
+    anchors = []
+    for _ in range(600):
+        words = rng.sample(rng.choice(cores), 3)
+        words += [f"n{rng.randrange(500)}" for _ in range(rng.randint(0, 2))]
+        anchors.append(" ".join([rng.choice(APPS)] + words))
+
+    clusters = AnchorClusters(max_bucket=len(anchors))
+    for anchor in anchors:
+        clusters.add(anchor)
+
+    expected = batch_clusters(anchors)
+    assert len(expected) > 10
+    assert partition(clusters.clusters().values()) == expected
+
+    # and far fewer comparisons than every pair
+    assert clusters.comparisons < len(clusters) ** 2 / 4
+
+
+def test_episode_anchors_share_one_cluster():
+    clusters = AnchorClusters()
+    clusters.add("firefox flutter docs statefulwidget")
+
+    episode = Episode(
+        7,
+        0.0,
+        60.0,
+        "code main dart flutter_app",
+        ["code main dart flutter_app", "simulator iphone", "slack"],
+    )
+    cluster = clusters.add_episode(episode)
+
+    assert clusters.episode_cluster(7) == cluster
+    assert clusters.cluster("simulator iphone") == cluster
+    assert clusters.cluster("slack") == cluster
+    assert clusters.cluster("firefox flutter docs statefulwidget") != cluster
+    assert clusters.episode_cluster(8) is None
+
+    # an episode without anchors is its main anchor
+    lone = clusters.add_episode(Episode(8, 0.0, 1.0, "terminal pytest"))
+    assert clusters.episode_cluster(8) == lone == clusters.cluster("terminal pytest")
@@ -0,0 +1,126 @@
+import contextlib
+import io
+import math
+import random
+
+from context_engine.runtime.coalesce import coalesce
+from context_engine.runtime.cognitive_state import CognitiveState
+from context_engine.runtime.replay import replay
+from context_engine.runtime.session_builder import SessionBuilder
+from context_engine.runtime.sessionizer import Sessionizer
+from context_engine.state.event import Event
+
+
+CONTEXTS = [
+    ("Code", "loop_detector.py"),
+    ("Code", "event_bus.py"),
+    ("Firefox", "deque docs"),
+    ("Terminal", ""),
+]
+
+
+def metrics(state):
+    return (
+        state._switch_frequency(),
+        state._anchor_stability(),
+        state._title_entropy(),
+        state.window.dominant_share(),
+        state._infer_state(),
+    )
+
+
+def test_run_metrics_match_per_event_metrics():
+    rng = random.Random(17)
+
+    events = []
+    ts = 0.0
+    context = CONTEXTS[0]
+    for _ in range(5000):
+        ts += rng.choice([0.5, 1.0, 2.0, 7.0])
+        if rng.random() < 0.3:
+            context = rng.choice(CONTEXTS)
+        events.append(Event(ts, *context, rng.choice([0.0, 1.0, 30.0])))
+
+    per_event = CognitiveState()
+    runs = CognitiveState()
+    i = 0
+
+    for run in coalesce(events, max_span=rng.choice([3.0, 10.0, 60.0])):
+        for e in events[i : i + run.count]:
+            per_event._add_event(e)
+        i += run.count
+        runs._add_event(run)
+
+        a, b = metrics(per_event), metrics(runs)
+        assert a[:2] == b[:2] and a[3:] == b[3:]
+        assert math.isclose(a[2], b[2], abs_tol=1e-9)
+
+
+def test_run_replay_matches_per_event_replay(day_events):
+    per_event, runs = io.StringIO(), io.StringIO()
+
+    replay(day_events, per_event)
+    replay(day_events, runs, runs=True)
+
+    assert per_event.getvalue() and runs.getvalue() == per_event.getvalue()
+
+
+def idle_stream(seed):
+    """
+    Few contexts, long runs, and idle readings past both session
+    detectors' breaks inside runs.
+    """
+    rng = random.Random(seed)
+
+    events = []
+    ts = 0.0
+    context = CONTEXTS[0]
+    for _ in range(3000):
+        ts += rng.choice([1.0, 1.0, 2.0, 30.0])
+        if rng.random() < 0.1:
+            context = rng.choice(CONTEXTS)
+        idle = rng.choice([0.0, 0.0, 1.0, 30.0, 200.0])
+        events.append(Event(ts, *context, idle))
+    return events
+
+
+def test_sessionizer_runs_match_per_event():
+    for seed in range(3):
+        events = idle_stream(seed)
+
+        per_event = Sessionizer()
+        expected = [s for s in map(per_event.feed, events) if s is not None]
+
+        runs = Sessionizer()
+        sessions = [s for run in coalesce(events) for s in runs.feed_run(run)]
+
+        assert len(expected) > 10
+        assert sessions == expected
+
+    # an idle sample inside the first run ends a session there
+    events = [Event(float(t), "Code", "a", 30.0 if t == 2 else 0.0) for t in range(5)]
+    events.append(Event(5.0, "Firefox", "b", 0.0))
+
+    runs = Sessionizer()
+    sessions = [s for run in coalesce(events) for s in runs.feed_run(run)]
+    assert [(s.start, s.end) for s in sessions] == [(0.0, 2.0)]
+
+
+def test_session_builder_runs_match_per_event():
+    for seed in range(3):
+        events = idle_stream(seed)
+
+        expected = io.StringIO()
+        with contextlib.redirect_stdout(expected):
+            builder = SessionBuilder()
+            for e in events:
+                builder.process(e)
+
+        printed = io.StringIO()
+        with contextlib.redirect_stdout(printed):
+            builder = SessionBuilder()
+            for run in coalesce(events):
+                builder.process_run(run)
+
+        assert expected.getvalue().count("[END]") > 10
+        assert printed.getvalue() == expected.getvalue()
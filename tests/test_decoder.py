@@ -0,0 +1,36 @@
+import json
+
+from context_engine.runtime.decoder import LineDecoder
+
+
+PREFIX = "2024-01-01 12:00:00.000 Df ContextAgent[123:456] [com.context.agent] "
+
+
+def test_nested_objects_and_braces_inside_strings():
+    payload = {
+        "ts": 1.0,
+        "app": "Code",
+        "title": "fn() { return {a: 1} } — main.rs",
+        "meta": {"window": {"id": 7, "tags": ["{", "}"]}},
+    }
+    decoder = LineDecoder()
+
+    assert decoder.decode(PREFIX + json.dumps(payload) + " trailing }") == payload
+    assert decoder.stats.decoded == 1
+
+
+def test_split_and_payloadless_lines_are_counted_not_decoded():
+    line = PREFIX + json.dumps({"ts": 1.0, "app": "Code", "title": "a {b}"})
+    payload = json.loads(line[len(PREFIX) :])
+
+    # a line cut inside the title: both halves hold a '{'
+    cut = len(line) - 6
+    lines = [line[:cut], line[cut:], "no payload here", line]
+
+    decoder = LineDecoder()
+    assert [decoder.decode(l) for l in lines] == [None, None, None, payload]
+    assert (decoder.stats.malformed, decoder.stats.no_payload) == (2, 1)
+
+    batch = LineDecoder()
+    assert batch.decode_batch(lines) == [payload]
+    assert batch.stats == decoder.stats
@@ -0,0 +1,98 @@
+from context_engine.runtime.episode import Episode
+from context_engine.runtime.event_bus import EventBus
+from context_engine.runtime.loop_detector import LoopDetector
+from context_engine.runtime.run_runtime import EpisodeController
+from context_engine.state import snapshot
+from context_engine.state.episode_store import EpisodeRecorder, EpisodeStore
+
+
+def episode(id_, start, end, *anchors):
+    return Episode(id_, start, end, anchors[0], list(anchors), ended=True)
+
+
+def ids(episodes):
+    return [e.id for e in episodes]
+
+
+def test_range_queries_include_boundaries_and_long_episodes(tmp_path):
+    with EpisodeStore(tmp_path / "episodes.sqlite") as store:
+        store.put(
+            [
+                episode(1, 0.0, 10.0, "code loop_detector py"),
+                episode(2, 20.0, 30.0, "firefox flutter docs"),
+                episode(3, 100.0, 400.0, "code flutter main dart"),
+            ]
+        )
+
+        # touching either end overlaps
+        assert ids(store.overlapping(10.0, 20.0)) == [1, 2]
+        assert ids(store.overlapping(10.5, 19.5)) == []
+
+        # started well before t0, found through the longest span seen
+        assert ids(store.overlapping(350.0, 360.0)) == [3]
+        assert ids(store.overlapping(400.5, 500.0)) == []
+
+        assert ids(store.with_token("Flutter")) == [2, 3]
+        assert ids(store.with_token("flutter", 30.0, 100.0)) == [2, 3]
+        assert ids(store.with_token("flutter", 30.5, 99.5)) == []
+        assert ids(store.with_token("code", 350.0, 360.0)) == [3]
+        assert ids(store.with_token("dart", 0.0, 50.0)) == []
+
+
+def runtime(store):
+    bus = EventBus()
+    detector = LoopDetector(bus)
+    controller = EpisodeController(bus)
+    recorder = EpisodeRecorder(store)
+
+    bus.subscribe(controller, types=EpisodeController.TYPES)
+    recorder.attach(bus)
+    return detector, controller, recorder
+
+
+def recorded(path, events, split=None, fresh_vocabulary=None):
+    """
+    Every episode recorded over events, optionally stopping and
+    restoring the runtime the way run_runtime does at split.
+    """
+    store = EpisodeStore(path)
+    detector, controller, recorder = runtime(store)
+
+    if split is not None:
+        for e in events[:split]:
+            detector.process(e)
+        snapshot.save_snapshot(path.with_suffix(".snapshot"), detector, controller)
+        recorder.flush()
+        store.close()
+
+        fresh_vocabulary()
+        store = EpisodeStore(path)
+        detector, controller, recorder = runtime(store)
+        snapshot.load_snapshot(path.with_suffix(".snapshot"), detector, controller)
+        recorder.resume(controller)
+        events = events[split:]
+
+    for e in events:
+        detector.process(e)
+    recorder.flush()
+
+    with store:
+        return store.overlapping(float("-inf"), float("inf"))
+
+
+def test_restored_recorder_continues_the_open_episode(
+    tmp_path, day_events, fresh_vocabulary
+):
+    expected = recorded(tmp_path / "once.sqlite", day_events)
+
+    fresh_vocabulary()
+    resumed = recorded(
+        tmp_path / "restarted.sqlite",
+        day_events,
+        split=len(day_events) // 2,
+        fresh_vocabulary=fresh_vocabulary,
+    )
+
+    assert len(expected) > 2
+    assert resumed == expected
+    assert all(e.ended for e in resumed[:-1])
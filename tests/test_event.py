@@ -0,0 +1,31 @@
+import pickle
+
+from context_engine.state.event import Event
+
+
+def test_events_compare_by_value():
+    event = Event(1.0, "Code", "loop_detector.py", 0.0)
+
+    assert event == Event(1.0, "Code", "loop_detector.py", 0.0)
+    assert event != Event(1.0, "Code", "loop_detector.py", 2.0)
+    assert not hasattr(event, "__dict__")
+
+
+def test_equal_strings_share_one_object():
+    # built at runtime, so the compiler cannot fold them into one constant
+    a = Event(1.0, "".join(["Fire", "fox"]), " ".join(["deque", "docs"]), 0.0)
+    b = Event(2.0, "".join(["Firef", "ox"]), " ".join(["deque", "docs"]), 0.0)
+
+    assert a.app is b.app
+    assert a.title is b.title
+
+
+def test_pickle_round_trip():
+    event = Event(1.0, "Code", "loop_detector.py", 5.0)
+
+    restored = pickle.loads(pickle.dumps(event))
+
+    assert restored == event
+    # unpickled events (snapshots) share strings with live ones
+    live = Event(2.0, "".join(["Co", "de"]), "".join(["loop_", "detector.py"]), 0.0)
+    assert restored.app is live.app and restored.title is live.title
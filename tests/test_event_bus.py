@@ -0,0 +1,72 @@
+import threading
+
+from context_engine.runtime.event_bus import EventBus, QueuedListener
+from context_engine.runtime.events import CognitiveEvent, EventType
+
+
+def test_events_reach_only_listeners_of_their_type_in_order():
+    bus = EventBus()
+    calls = []
+
+    everything = bus.subscribe(lambda e: calls.append(("all", e.type)))
+    bus.subscribe(
+        lambda e: calls.append(("loops", e.type)), types=[EventType.LOOP_START]
+    )
+
+    bus.emit_loop_start(1.0, "code loop")
+    bus.emit_phase(2.0, "STABLE")
+
+    assert calls == [
+        ("all", EventType.LOOP_START),
+        ("loops", EventType.LOOP_START),
+        ("all", EventType.PHASE),
+    ]
+    assert bus.wants(EventType.LOOP_START)
+
+    bus.unsubscribe(everything)
+    calls.clear()
+    bus.emit_phase(3.0, "STABLE")
+
+    assert calls == []
+    assert not bus.wants(EventType.PHASE)
+
+
+def test_queued_listener_runs_off_thread_and_close_drains_it():
+    bus = EventBus()
+    release = threading.Event()
+    seen = []
+
+    def slow(event):
+        release.wait()
+        seen.append((event.ts, threading.current_thread()))
+
+    bus.subscribe(slow, types=[EventType.SUSPEND], queued=True)
+
+    for ts in range(100):
+        bus.emit_suspend(float(ts))
+
+    # the emitter never waited on the sink
+    assert seen == []
+
+    release.set()
+    bus.close()
+
+    assert [ts for ts, _ in seen] == [float(ts) for ts in range(100)]
+    assert all(t is not threading.main_thread() for _, t in seen)
+
+
+def test_queued_listener_survives_a_failing_event(capsys):
+    seen = []
+
+    def sink(event):
+        if event.ts == 1.0:
+            raise RuntimeError("bad event")
+        seen.append(event.ts)
+
+    listener = QueuedListener(sink)
+    for ts in (0.0, 1.0, 2.0):
+        listener(CognitiveEvent(ts, EventType.PHASE))
+    listener.close()
+
+    assert seen == [0.0, 2.0]
+    assert "bad event" in capsys.readouterr().err
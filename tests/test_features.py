@@ -0,0 +1,99 @@
+import contextlib
+import io
+
+from context_engine.runtime.anchor_extractor import extract_anchor
+from context_engine.runtime.cognitive_session import CognitiveSession
+from context_engine.runtime.cognitive_state import CognitiveState
+from context_engine.runtime.event_bus import EventBus
+from context_engine.runtime.features import FeaturePipeline
+from context_engine.runtime.loop_detector import LoopDetector
+from context_engine.runtime.session_builder import SessionBuilder
+from context_engine.runtime.sessionizer import Sessionizer
+
+
+def printed(fn, events):
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        results = [fn(e) for e in events]
+    return out.getvalue(), results
+
+
+def each_listener(events):
+    """
+    Every consumer's printout and results, extracting its own features.
+    """
+    bus = EventBus()
+    emitted = []
+    bus.subscribe(emitted.append)
+
+    return {
+        "loop": (printed(LoopDetector(bus).process, events), emitted),
+        "state": printed(CognitiveState().process, events),
+        "session": printed(CognitiveSession().process, events),
+        "builder": printed(SessionBuilder().process, events),
+        "sessionizer": printed(Sessionizer().feed, events),
+        "anchor": printed(extract_anchor, events),
+    }
+
+
+def pipelined(events):
+    """
+    The same, each consumer alone on a FeaturePipeline.
+    """
+    bus = EventBus()
+    emitted = []
+    bus.subscribe(emitted.append)
+
+    def through_pipeline(fn):
+        pipeline = FeaturePipeline()
+        results = []
+        pipeline.subscribe(lambda f: results.append(fn(f)))
+
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            for e in events:
+                pipeline.process(e)
+        return out.getvalue(), results
+
+    return {
+        "loop": (through_pipeline(LoopDetector(bus).process_features), emitted),
+        "state": through_pipeline(CognitiveState().process_features),
+        "session": through_pipeline(CognitiveSession().process_features),
+        "builder": through_pipeline(SessionBuilder().process_features),
+        "sessionizer": through_pipeline(Sessionizer().feed_features),
+        "anchor": through_pipeline(extract_anchor),
+    }
+
+
+def test_shared_features_match_per_listener_extraction(day_events):
+    expected = each_listener(day_events)
+    shared = pipelined(day_events)
+
+    for name in expected:
+        assert shared[name] == expected[name], name
+
+    # the streams exercise every consumer
+    (_, sessions) = expected["sessionizer"]
+    assert expected["loop"][1]
+    assert expected["state"][0].count("[STATE]") > 2
+    assert expected["builder"][0].count("[END]") > 2
+    assert sum(s is not None for s in sessions) > 2
+
+
+def test_one_pipeline_feeds_every_consumer(day_events):
+    bus = EventBus()
+    emitted = []
+    bus.subscribe(emitted.append)
+
+    pipeline = FeaturePipeline()
+    pipeline.subscribe(LoopDetector(bus).process_features)
+    sessions = []
+    sessionizer = Sessionizer()
+    pipeline.subscribe(lambda f: sessions.append(sessionizer.feed_features(f)))
+
+    for e in day_events:
+        pipeline.process(e)
+
+    expected = each_listener(day_events)
+    assert emitted == expected["loop"][1]
+    assert sessions == expected["sessionizer"][1]
@@ -0,0 +1,70 @@
+import math
+import random
+from collections import Counter
+
+from context_engine.runtime import goal_continuity
+from context_engine.runtime.goal_continuity import GOAL_MEMORY, GoalContinuity
+
+
+class EagerGoalContinuity(GoalContinuity):
+    """
+    The original bookkeeping: a Counter re-summed on every call and
+    decayed key by key.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.goal_tokens = Counter()
+
+    def _overlap_score(self, tokens):
+        shared = sum(self.goal_tokens[t] for t in tokens if t in self.goal_tokens)
+        return shared / (sum(self.goal_tokens.values()) + 1)
+
+    def _specialization_score(self, tokens):
+        new_tokens = [t for t in tokens if t not in self.goal_tokens]
+        return math.tanh(len(new_tokens) / 6)
+
+    def _absorb(self, tokens):
+        for t in tokens:
+            self.goal_tokens[t] += 1
+
+        if sum(self.goal_tokens.values()) > GOAL_MEMORY:
+            for k in list(self.goal_tokens):
+                self.goal_tokens[k] *= goal_continuity.GOAL_DECAY
+
+
+def anchors(n, seed):
+    rng = random.Random(seed)
+    words = ["flutter", "widget", "state", "render", "layout", "build"]
+    other = ["slack", "general", "team", "inbox", "mail"]
+
+    ts = 0.0
+    for i in range(n):
+        ts += rng.choice([2.0, 3.0, 5.0, 90.0])
+        task = words if rng.random() < 0.9 else other
+        detail = [f"detail{i}x{k}" for k in range(rng.randint(0, 3))]
+        yield "code", " ".join(rng.sample(task, 2) + detail), ts
+
+
+def test_lazy_scale_makes_the_eager_decisions():
+    for seed in range(3):
+        lazy, eager = GoalContinuity(), EagerGoalContinuity()
+
+        for app, anchor, ts in anchors(4000, seed):
+            assert lazy.is_same_goal(app, anchor, ts) == eager.is_same_goal(
+                app, anchor, ts
+            )
+            assert math.isclose(lazy.goal_strength, eager.goal_strength, abs_tol=1e-9)
+
+
+def test_goal_memory_stays_bounded_in_a_long_episode():
+    goal = GoalContinuity()
+
+    for i in range(20000):
+        assert goal.is_same_goal("code", f"flutter widget detail{i}", float(i)) == (
+            i > 0
+        )
+
+    # faded detail words are dropped, the task words stay
+    assert len(goal.goal_tokens) < 1000
+    assert {"flutter", "widget"} <= goal.goal_tokens.keys()
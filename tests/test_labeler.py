@@ -0,0 +1,94 @@
+from context_engine.runtime.event_bus import EventBus
+from context_engine.runtime.loop_detector import LoopDetector
+from context_engine.runtime.run_runtime import EpisodeController
+from context_engine.semantics.labeler import Labeler
+from context_engine.state import snapshot
+
+
+def test_label_prefers_terms_other_episodes_lack():
+    labeler = Labeler()
+
+    for i, task in enumerate(["alpha", "beta", "delta"]):
+        labeler.start(i, f"code main team {task}")
+        labeler.finish(i, float(i))
+
+    labeler.start(9, "code main team gamma")
+    labeler.add(9, "firefox gamma docs")
+    labeler.add(9, "code gamma")
+
+    # the most frequent app names it; "gamma" outranks words every
+    # past episode had, and "docs" was never seen either
+    assert labeler.label(9) == "Code: gamma docs main"
+    assert labeler.finish(9, 10.0) == "Code: gamma docs main"
+    assert labeler.label(9) == "Code: gamma docs main"
+
+
+def labeled(events, first, split=None, path=None, fresh_vocabulary=None):
+    """
+    (episode id, label) for every finished episode, with the labeler
+    subscribed before or after EpisodeController, optionally stopping
+    and restoring the runtime the way run_runtime does at split.
+    """
+    labels = []
+
+    def runtime():
+        bus = EventBus()
+        detector = LoopDetector(bus)
+        controller = EpisodeController(bus)
+        labeler = Labeler(on_label=lambda i, label: labels.append((i, label)))
+
+        if first:
+            labeler.attach(bus)
+        bus.subscribe(controller, types=EpisodeController.TYPES)
+        if not first:
+            labeler.attach(bus)
+        return detector, controller, labeler
+
+    detector, controller, labeler = runtime()
+
+    if split is not None:
+        for e in events[:split]:
+            detector.process(e)
+        snapshot.save_snapshot(path, detector, controller)
+
+        fresh_vocabulary()
+        detector, controller, labeler = runtime()
+        snapshot.load_snapshot(path, detector, controller)
+        labeler.resume(controller)
+        events = events[split:]
+
+    for e in events:
+        detector.process(e)
+    return labels
+
+
+def test_bus_labels_do_not_depend_on_subscription_order(
+    day_events, fresh_vocabulary
+):
+    before = labeled(day_events, first=True)
+    fresh_vocabulary()
+    after = labeled(day_events, first=False)
+
+    assert len(before) > 2
+    assert after == before
+
+
+def test_restored_labeler_labels_the_resumed_episode(
+    tmp_path, day_events, fresh_vocabulary
+):
+    expected = labeled(day_events, first=False)
+    split = len(day_events) // 2
+
+    fresh_vocabulary()
+    resumed = labeled(
+        day_events,
+        first=False,
+        split=split,
+        path=tmp_path / "runtime.snapshot",
+        fresh_vocabulary=fresh_vocabulary,
+    )
+
+    # every episode is labeled once, including the one open at the
+    # restart; its words can differ, since rarity is not snapshotted
+    assert [i for i, _ in resumed] == [i for i, _ in expected]
+    assert all(label for _, label in resumed)
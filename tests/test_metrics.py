@@ -0,0 +1,17 @@
+from context_engine.runtime.metrics import RATE_WINDOW, Metrics
+
+
+def test_events_per_s_covers_only_the_recent_window():
+    metrics = Metrics()
+    t0 = metrics.marks[0][0]
+
+    # a burst long ago, then a steady 100 events/s
+    metrics.events = 1_000_000
+    metrics.mark(t0 + 1)
+    for s in range(2, 100):
+        metrics.events += 100
+        metrics.mark(t0 + s)
+
+    assert metrics.rate(t0 + 99, metrics.events) == 100
+    assert len(metrics.marks) <= RATE_WINDOW + 2
+
@@ -0,0 +1,141 @@
+import types
+
+import pytest
+
+from context_engine.observer import base
+from context_engine.observer.base import (
+    HEARTBEAT,
+    POLL_IDLE,
+    POLL_MAX,
+    POLL_MIN,
+    BaseObserver,
+    WatchStats,
+)
+
+
+class Stop(Exception):
+    pass
+
+
+class Clock:
+    """
+    Stands in for the time module: sleeping advances the clock, and
+    raises Stop once it passes until.
+    """
+
+    def __init__(self, until):
+        self.now = 0.0
+        self.until = until
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+        if self.now > self.until:
+            raise Stop
+
+
+class FakeObserver(BaseObserver):
+    """
+    windows: (from_ts, app, title), in time order; inputs: times of
+    user input, idle counting up from the latest one.
+    """
+
+    def __init__(self, clock, windows, inputs=(0.0,)):
+        self.clock = clock
+        self.windows = windows
+        self.inputs = inputs
+        self.polls = []
+
+    def get_active_window(self):
+        self.polls.append(self.clock.now)
+        _, app, title = [w for w in self.windows if w[0] <= self.clock.now][-1]
+        return app, title
+
+    def get_idle_seconds(self):
+        return self.clock.now - max(t for t in self.inputs if t <= self.clock.now)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    def install(until):
+        fake = Clock(until)
+        time = types.SimpleNamespace(monotonic=fake.monotonic, sleep=fake.sleep)
+        monkeypatch.setattr(base, "time", time)
+        return fake
+
+    return install
+
+
+def watch(observer, stats=None):
+    emitted = []
+    with pytest.raises(Stop):
+        for event in observer.watch(stats=stats):
+            emitted.append((observer.clock.now, event.app, event.title))
+    return emitted
+
+
+def gaps(polls):
+    return [round(b - a, 6) for a, b in zip(polls, polls[1:])]
+
+
+def test_only_changes_and_heartbeats_are_emitted(clock):
+    fake = clock(until=3 * HEARTBEAT)
+    windows = [(0.0, "Code", "a.py"), (10.0, "Firefox", "docs")]
+    stats = WatchStats()
+
+    # input every second keeps the idle bucket fixed
+    observer = FakeObserver(fake, windows, inputs=[float(t) for t in range(200)])
+    emitted = watch(observer, stats)
+
+    assert [e[1] for e in emitted] == ["Code", "Firefox", "Firefox", "Firefox"]
+    assert 10.0 <= emitted[1][0] < 10.0 + POLL_MAX + 1e-9
+    assert emitted[2][0] - emitted[1][0] == pytest.approx(HEARTBEAT, abs=POLL_MAX)
+    assert stats.emitted == 4 and stats.heartbeats == 2
+    assert stats.polls == len(observer.polls) > stats.emitted
+
+
+def test_polling_backs_off_to_poll_max_while_active(clock):
+    fake = clock(until=20.0)
+    observer = FakeObserver(
+        fake, [(0.0, "Code", "a.py")], inputs=[float(t) for t in range(30)]
+    )
+    watch(observer)
+
+    assert gaps(observer.polls)[:4] == [POLL_MIN, 2 * POLL_MIN, POLL_MAX, POLL_MAX]
+    assert max(gaps(observer.polls)) == POLL_MAX
+
+
+def test_polling_backs_off_to_poll_idle_once_idle(clock):
+    fake = clock(until=200.0)
+    observer = FakeObserver(fake, [(0.0, "Code", "a.py")])
+    watch(observer)
+
+    # past the idle buckets' edges (changes) the interval climbs to POLL_IDLE
+    assert max(gaps(observer.polls)) == POLL_IDLE
+    assert gaps(observer.polls)[-3:] == [POLL_IDLE] * 3
+
+
+def test_a_switch_resets_polling_to_poll_min(clock):
+    fake = clock(until=15.0)
+    windows = [(0.0, "Code", "a.py"), (10.0, "Firefox", "docs")]
+    observer = FakeObserver(fake, windows, inputs=[float(t) for t in range(30)])
+    watch(observer)
+
+    polls = observer.polls
+    switch = next(i for i, t in enumerate(polls) if t >= 10.0)
+
+    assert polls[switch - 1] - polls[switch - 2] == POLL_MAX
+    assert polls[switch + 1] - polls[switch] == POLL_MIN
+
+
+def test_input_wakes_an_idle_wait_early(clock):
+    fake = clock(until=100.0)
+    observer = FakeObserver(fake, [(0.0, "Code", "a.py")], inputs=(0.0, 59.0))
+    emitted = watch(observer)
+
+    # idle bucket 0 again: seen within POLL_MAX of the input, not at
+    # the end of a POLL_IDLE wait
+    back = [t for t, *_ in emitted if t > 59.0]
+    assert back and back[0] - 59.0 <= POLL_MAX
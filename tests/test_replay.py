@@ -0,0 +1,68 @@
+import gzip
+import io
+
+from context_engine.runtime.event_bus import EventBus
+from context_engine.runtime.loop_detector import LoopDetector
+from context_engine.runtime.replay import (
+    JsonlSink,
+    ReplayStats,
+    discover,
+    read_events,
+    replay,
+)
+from context_engine.runtime.run_runtime import EpisodeController
+from context_engine.state.session_store import SessionStore
+
+
+def agent_line(e):
+    return f"{e.ts!r}|{e.app}|{e.title}|{e.idle!r}\n"
+
+
+def write_log(path, events, garbage=()):
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "wt", encoding="utf-8") as f:
+        f.writelines(garbage)
+        f.writelines(map(agent_line, events))
+
+
+def test_read_events_from_logs_and_stores(tmp_path, day_events):
+    events = day_events[:300]
+    first, second, third = events[:100], events[100:200], events[200:]
+
+    logs = tmp_path / "logs"
+    logs.mkdir()
+    write_log(logs / "2024-01-01.log.gz", first)
+    write_log(logs / "2024-01-02.log", second, ["not an event\n", "1.0|Code\n"])
+    (logs / ".partial.log").write_text("garbage\n")
+    (logs / "notes.md").write_text("garbage\n")
+
+    assert [p.name for p in discover([logs])] == ["2024-01-01.log.gz", "2024-01-02.log"]
+
+    store = tmp_path / "store"
+    with SessionStore(store) as s:
+        s.extend(third)
+
+    stats = ReplayStats()
+    assert list(read_events([logs, store], stats)) == events
+    assert (stats.lines, stats.events, stats.skipped) == (302, 300, 2)
+
+
+def test_replay_matches_feeding_the_detector(tmp_path, day_events):
+    path = tmp_path / "day.log.gz"
+    write_log(path, day_events)
+
+    replayed = io.StringIO()
+    stats = replay(read_events([path], ReplayStats()), replayed)
+
+    direct = io.StringIO()
+    bus = EventBus()
+    detector = LoopDetector(bus)
+    controller = EpisodeController(bus)
+    sink = JsonlSink(direct)
+    bus.subscribe(sink)
+    bus.subscribe(controller, types=EpisodeController.TYPES)
+    for event in day_events:
+        detector.process(event)
+
+    assert sink.count > 10 and stats.emitted == sink.count
+    assert replayed.getvalue() == direct.getvalue()
@@ -0,0 +1,72 @@
+from context_engine.state.session_store import SessionStore
+from context_engine.state.event import Event
+
+
+def events(n, start=0.0):
+    return [
+        Event(start + i, "Code" if i % 3 else "Firefox", f"title {i % 5}", 0.5)
+        for i in range(n)
+    ]
+
+
+def test_reopen_repairs_torn_writes(tmp_path):
+    with SessionStore(tmp_path, flush_events=10) as store:
+        store.extend(events(25))
+
+    # crash mid-flush: one column got a partial row, strings a torn line
+    with open(tmp_path / "000000.ts", "ab") as f:
+        f.write(b"\x00" * 12)
+    with open(tmp_path / "strings.jsonl", "ab") as f:
+        f.write(b'"torn')
+
+    with SessionStore(tmp_path) as store:
+        assert len(store) == 25
+        store.extend(events(5, start=100.0))
+        store.append(Event(200.0, "Slack", "general", 3.0))
+
+    reopened = SessionStore(tmp_path)
+    assert list(reopened.scan()) == events(25) + events(5, start=100.0) + [
+        Event(200.0, "Slack", "general", 3.0)
+    ]
+    assert [e.ts for e in reopened.scan(101.0, 103.0)] == [101.0, 102.0, 103.0]
+
+
+def test_out_of_order_event_starts_a_new_segment(tmp_path):
+    with SessionStore(tmp_path) as store:
+        store.extend(events(10, start=50.0))
+        store.extend(events(10))
+
+    store = SessionStore(tmp_path)
+    assert store.segment == 1
+    assert [e.ts for e in store.scan(5.0, 52.0)] == [50.0, 51.0, 52.0] + [
+        float(i) for i in range(5, 10)
+    ]
+
+
+def test_read_only_store_never_repairs_and_follows_the_writer(tmp_path):
+    writer = SessionStore(tmp_path, flush_events=4, flush_interval=1e9)
+    writer.extend(events(8))
+
+    # the writer's next flush is half done
+    with open(tmp_path / "000000.ts", "ab") as f:
+        f.write(b"\x00" * 8)
+    size = (tmp_path / "000000.ts").stat().st_size
+
+    reader = SessionStore(tmp_path, read_only=True)
+    assert len(list(reader.scan())) == 8
+    assert (tmp_path / "000000.ts").stat().st_size == size
+
+    # undo the half flush, then write new strings and rows
+    with open(tmp_path / "000000.ts", "rb+") as f:
+        f.truncate(8 * 8)
+    writer.append(Event(20.0, "Terminal", "pytest", 0.0))
+    writer.flush()
+
+    assert list(reader.scan(20.0))[0] == Event(20.0, "Terminal", "pytest", 0.0)
+
+
+def test_buffered_rows_are_flushed_after_the_interval(tmp_path):
+    store = SessionStore(tmp_path, flush_events=1000, flush_interval=0.0)
+    store.extend(events(3))
+
+    assert len(list(SessionStore(tmp_path, read_only=True).scan())) == 3
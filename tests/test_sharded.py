@@ -0,0 +1,101 @@
+import io
+import json
+import threading
+import time
+
+import pytest
+
+from context_engine.runtime.replay import ReplayStats, replay
+from context_engine.runtime.sharded import ShardedRuntime, run_sharded, stream_events
+from context_engine.state.event import Event
+
+
+def write_log(path, events):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(
+        "".join(f"{e.ts}|{e.app}|{e.title}|{e.idle}\n" for e in events)
+    )
+
+
+def test_same_named_logs_stay_separate_streams(tmp_path, day_events):
+    a, b = day_events[:3000], day_events[3000:6000]
+    write_log(tmp_path / "alice" / "agent.log", a)
+    write_log(tmp_path / "bob" / "agent.log", b)
+
+    out = io.StringIO()
+    paths = [tmp_path / "alice" / "agent.log", tmp_path / "bob" / "agent.log"]
+    run_sharded(stream_events(paths, ReplayStats()), out, workers=2)
+
+    emitted = {}
+    for line in out.getvalue().splitlines():
+        record = json.loads(line)
+        emitted.setdefault(record.pop("stream"), []).append(record)
+
+    assert sorted(emitted) == sorted(str(p.resolve()) for p in paths)
+    assert all(emitted.values())
+
+    for path, events in zip(paths, (a, b)):
+        expected = io.StringIO()
+        replay(events, expected)
+        assert emitted[str(path.resolve())] == [
+            json.loads(line) for line in expected.getvalue().splitlines()
+        ]
+
+
+def test_failing_worker_raises_instead_of_hanging():
+    with ShardedRuntime(workers=1) as runtime:
+        runtime.submit("s", Event(1.0, "Code", "main.py", 0.0))
+        runtime.submit("s", Event(2.0, "Code", "main.py", "not a number"))
+
+        with pytest.raises(RuntimeError, match="shard 0 failed"):
+            runtime.drain()
+
+
+def test_dead_worker_raises_instead_of_hanging():
+    with ShardedRuntime(workers=1) as runtime:
+        runtime.procs[0].kill()
+        runtime.procs[0].join()
+        runtime.submit("s", Event(1.0, "Code", "main.py", 0.0))
+
+        with pytest.raises(RuntimeError, match="exited"):
+            runtime.drain()
+
+
+def test_live_output_drains_while_input_is_quiet(day_events):
+    events = day_events[:3000]
+    quiet = threading.Event()
+    resume = threading.Event()
+    out = io.StringIO()
+    drained_while_quiet = []
+
+    def source():
+        # started once the workers are forked
+        watcher.start()
+        for e in events:
+            yield "s", e
+        # a live stream that stops sending for a while
+        quiet.set()
+        resume.wait(10)
+
+    def watch():
+        try:
+            quiet.wait(10)
+            deadline = time.monotonic() + 5
+            while not out.getvalue() and time.monotonic() < deadline:
+                time.sleep(0.05)
+            drained_while_quiet.append(out.getvalue())
+        finally:
+            resume.set()
+
+    watcher = threading.Thread(target=watch)
+    run_sharded(source(), out, drain_interval=0.2)
+    watcher.join()
+
+    expected = io.StringIO()
+    replay(events, expected)
+    emitted = [json.loads(line) for line in out.getvalue().splitlines()]
+
+    assert drained_while_quiet[0]
+    assert [{k: v for k, v in r.items() if k != "stream"} for r in emitted] == [
+        json.loads(line) for line in expected.getvalue().splitlines()
+    ]
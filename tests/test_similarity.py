@@ -0,0 +1,112 @@
+import random
+
+from context_engine.runtime.event_bus import EventBus
+from context_engine.runtime.goal_continuity import GoalContinuity, tokenset
+from context_engine.runtime.loop_detector import WINDOW, Event, LoopDetector
+from context_engine.runtime.semantic_memory import WorkingMemory
+from context_engine.runtime.vocab import VOCAB, Vocabulary
+
+
+TITLES = [
+    ("Code", "loop_detector.py — context-engine"),
+    ("Code", "event_bus.py — context-engine"),
+    ("Firefox", "python deque popleft - Stack Overflow"),
+    ("Firefox", "Flutter docs | StatefulWidget"),
+    ("Terminal", "pytest context-engine"),
+    ("Slack", "general | team"),
+    ("Spotify", ""),
+]
+
+
+def linear_best_match(detector, tokens):
+    best_score = 0.0
+    best_match = None
+
+    for _, past in detector.memory:
+        if past == tokens:
+            continue
+
+        s = detector.weighted_similarity(tokens, past)
+        if s > best_score:
+            best_score = s
+            best_match = past
+
+    return best_score, best_match
+
+
+def test_indexed_best_match_equals_linear_scan():
+    rng = random.Random(7)
+    detector = LoopDetector(EventBus())
+
+    ts = 0.0
+    for _ in range(3000):
+        ts += rng.choice([0.1, 0.5, 1.0, 5.0])
+        app, title = rng.choice(TITLES)
+        event = Event(ts, app, title, 0.0)
+        detector.detect_loop(event)
+
+        if not detector.memory:
+            continue
+
+        tokens = detector.memory[-1][1]
+        assert detector.best_match(tokens) == linear_best_match(detector, tokens)
+
+
+def test_postings_follow_window_eviction():
+    detector = LoopDetector(EventBus())
+
+    detector.detect_loop(Event(0.0, "Code", "alpha beta", 0.0))
+    detector.detect_loop(Event(1.0, "Code", "beta gamma", 0.0))
+    detector.detect_loop(Event(WINDOW + 0.5, "Firefox", "delta", 0.0))
+
+    assert VOCAB.intern("alpha") not in detector.postings
+    assert list(detector.postings[VOCAB.intern("beta")]) == [detector.memory_base]
+    assert sum(len(p) for p in detector.postings.values()) == sum(
+        len(set(tokens)) for _, tokens in detector.memory
+    )
+
+
+def test_vocabulary_keeps_ids_of_live_tokens_across_generations():
+    vocab = Vocabulary(generation_size=4)
+
+    live = vocab.intern("context")
+    for i in range(20):
+        vocab.intern(f"noise{i}")
+        assert vocab.intern("context") == live
+
+    assert vocab.decode([live]) == ["context"]
+    assert len(vocab.ids) <= 4
+    assert "noise0" not in vocab.ids and "noise0" not in vocab.previous_ids
+
+
+def test_indexed_working_memory_matches_linear_scan():
+    rng = random.Random(11)
+    texts = [f"{app} {title}".lower() for app, title in TITLES] + ["", "code", "x"]
+
+    linear = WorkingMemory(indexed=False)
+    indexed = WorkingMemory(indexed=True)
+
+    ts = 0.0
+    for _ in range(1500):
+        ts += rng.choice([0.5, 1.0, 4.0])
+        text = rng.choice(texts)
+        if rng.random() < 0.5:
+            text = text[: rng.randint(0, len(text))] + rng.choice(["", " 2", " (3)"])
+
+        assert indexed.nearest(text) == linear.nearest(text)
+        assert indexed.match(text) == linear.match(text)
+
+        linear.add(ts, text)
+        indexed.add(ts, text)
+
+
+def test_goal_memory_survives_vocabulary_rollover(fresh_vocabulary):
+    goal = GoalContinuity()
+    goal.is_same_goal("code", "code loop_detector context", 0.0)
+
+    # two rollovers forget every id interned before them; the fixture
+    # resets the process-wide vocabulary afterwards
+    VOCAB._rollover()
+    VOCAB._rollover()
+
+    assert goal._overlap_score(tokenset("code loop_detector context")) > 0.5
@@ -0,0 +1,75 @@
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from context_engine.focus import slice as focus_slice  # noqa: E402
+from context_engine.runtime.cognitive_state import CognitiveState  # noqa: E402
+from context_engine.state.event import Event  # noqa: E402
+
+
+CONTEXTS = [
+    ("Code", "loop_detector.py"),
+    ("Code", "event_bus.py"),
+    ("Firefox", "deque docs"),
+    ("Firefox", "asyncio docs"),
+    ("Terminal", ""),
+    ("Finder", ""),
+]
+
+
+def random_stream(seed, n=4000):
+    rng = random.Random(seed)
+
+    events = []
+    ts = 0.0
+    context = CONTEXTS[0]
+    for _ in range(n):
+        # repeated timestamps and gaps past the window included
+        ts += rng.choice([0.0, 0.5, 1.0, 1.0, 3.0, 7.0, 45.0])
+        if rng.random() < 0.35:
+            context = rng.choice(CONTEXTS)
+        events.append(Event(ts, *context, rng.choice([0.0, 1.0, 5.0, 30.0])))
+    return events
+
+
+def streamed(events):
+    state = CognitiveState()
+    columns = {name: [] for name in ("switch", "stability", "entropy", "state")}
+
+    for e in events:
+        state._add_event(e)
+        columns["switch"].append(state._switch_frequency())
+        columns["stability"].append(state._anchor_stability())
+        columns["entropy"].append(state._title_entropy())
+        columns["state"].append(state._infer_state())
+
+    return columns
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_vectorized_metrics_match_the_streaming_detector(seed):
+    events = random_stream(seed)
+    expected = streamed(events)
+
+    tl = focus_slice.Timeline.from_events(events)
+    metrics = focus_slice.metrics(tl)
+
+    np.testing.assert_array_equal(metrics["switch_frequency"], expected["switch"])
+    np.testing.assert_array_equal(metrics["anchor_stability"], expected["stability"])
+    np.testing.assert_allclose(
+        metrics["title_entropy"], expected["entropy"], rtol=0, atol=1e-9
+    )
+    assert list(metrics["state"]) == expected["state"]
+
+    # the stream reaches every state
+    assert len(set(expected["state"])) == 5
+
+
+def test_decreasing_timestamps_are_rejected():
+    tl = focus_slice.Timeline.from_events(
+        [Event(2.0, "Code", "a", 0.0), Event(1.0, "Code", "a", 0.0)]
+    )
+    with pytest.raises(ValueError):
+        focus_slice.switch_frequency(tl)
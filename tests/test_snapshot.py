@@ -0,0 +1,95 @@
+import io
+
+import pytest
+
+from context_engine.runtime.event_bus import EventBus
+from context_engine.runtime.loop_detector import LoopDetector
+from context_engine.runtime.replay import JsonlSink
+from context_engine.runtime.run_runtime import EpisodeController
+from context_engine.runtime.vocab import VOCAB
+from context_engine.state import snapshot
+
+
+def runtime():
+    bus = EventBus()
+    out = io.StringIO()
+    detector = LoopDetector(bus)
+    controller = EpisodeController(bus)
+
+    bus.subscribe(JsonlSink(out))
+    bus.subscribe(controller, types=EpisodeController.TYPES)
+    return detector, controller, out
+
+
+def test_restored_runtime_continues_like_the_original(
+    tmp_path, day_events, fresh_vocabulary
+):
+    half = len(day_events) // 2
+    path = tmp_path / "runtime.snapshot"
+
+    detector, controller, out = runtime()
+    for e in day_events[:half]:
+        detector.process(e)
+    snapshot.save_snapshot(path, detector, controller)
+
+    mark = len(out.getvalue())
+    for e in day_events[half:]:
+        detector.process(e)
+    expected = out.getvalue()[mark:]
+
+    fresh_vocabulary()
+    detector, controller, out = runtime()
+    assert snapshot.load_snapshot(path, detector, controller)
+
+    for e in day_events[half:]:
+        detector.process(e)
+
+    assert expected and out.getvalue() == expected
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_restore_rejects_other_versions_and_used_vocabularies(
+    tmp_path, fresh_vocabulary
+):
+    detector, controller, _ = runtime()
+    data = snapshot.capture(detector, controller)
+
+    VOCAB.intern("context")
+    with pytest.raises(ValueError, match="before any event"):
+        snapshot.restore(data, *runtime()[:2])
+
+    fresh_vocabulary()
+    old = snapshot.SNAPSHOT_VERSION
+    try:
+        snapshot.SNAPSHOT_VERSION = old + 1
+        with pytest.raises(ValueError, match="unsupported snapshot version"):
+            snapshot.restore(data, *runtime()[:2])
+    finally:
+        snapshot.SNAPSHOT_VERSION = old
+
+
+def test_unusable_snapshots_cold_start(tmp_path, capsys, fresh_vocabulary):
+    fresh_vocabulary()
+    path = tmp_path / "runtime.snapshot"
+    detector, controller, _ = runtime()
+    snapshot.save_snapshot(path, detector, controller)
+    data = path.read_bytes()
+
+    old = snapshot.SNAPSHOT_VERSION
+    try:
+        snapshot.SNAPSHOT_VERSION = old + 1
+        assert not snapshot.load_snapshot(path, *runtime()[:2])
+    finally:
+        snapshot.SNAPSHOT_VERSION = old
+
+    path.write_bytes(data[: len(data) // 2])
+    assert not snapshot.load_snapshot(path, *runtime()[:2])
+
+    path.write_bytes(b"not a pickle")
+    assert not snapshot.load_snapshot(path, *runtime()[:2])
+
+    # rejected before anything was restored
+    err = capsys.readouterr().err
+    assert err.count("Ignoring snapshot") == 3
+    assert "unsupported snapshot version" in err
+    assert not len(VOCAB)
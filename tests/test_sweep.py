@@ -0,0 +1,90 @@
+import csv
+import io
+
+import pytest
+
+from context_engine.runtime import goal_continuity, loop_detector, sweep
+
+
+GRID = {
+    "loop_detector.ANCHOR_CONFIRM": [3, 4],
+    "goal_continuity.NEW_EPISODE_THRESHOLD": [0.3, 0.4],
+}
+
+
+def write_log(path, events):
+    path.write_text("".join(f"{e.ts}|{e.app}|{e.title}|{e.idle}\n" for e in events))
+
+
+def test_patched_restores_constants_even_on_error():
+    params = {"loop_detector.WINDOW": 30.0, "goal_continuity.GOAL_DECAY": 0.5}
+
+    with pytest.raises(RuntimeError):
+        with sweep.patched(params):
+            # integral values keep int constants int
+            assert loop_detector.WINDOW == 30
+            assert type(loop_detector.WINDOW) is int
+            assert goal_continuity.GOAL_DECAY == 0.5
+            raise RuntimeError
+
+    assert loop_detector.WINDOW == 60
+    assert goal_continuity.GOAL_DECAY == 0.85
+
+
+@pytest.mark.parametrize(
+    "name",
+    [
+        "tokenizer.STOP_WORDS",  # not a sweepable module
+        "loop_detector.NO_SUCH",
+        "loop_detector.LoopDetector",  # not a constant
+        "loop_detector",
+    ],
+)
+def test_resolve_rejects_names_that_are_not_sweepable(name):
+    with pytest.raises(ValueError):
+        sweep._resolve(name)
+
+    # nothing is patched when a later name is bad
+    with pytest.raises(ValueError):
+        with sweep.patched({"loop_detector.WINDOW": 1, name: 1}):
+            pass
+    assert loop_detector.WINDOW == 60
+
+
+def test_serial_and_pooled_sweeps_agree(tmp_path, day_events):
+    log = tmp_path / "agent.log"
+    write_log(log, day_events[:5000])
+
+    serial = sweep.sweep([log], GRID, workers=1)
+    pooled = sweep.sweep([log], GRID, workers=2)
+
+    assert len(serial) == 4
+    assert pooled == serial
+    assert len({score.episodes for _, score in serial}) > 1
+
+
+@pytest.mark.parametrize("workers", ["1", "2"])
+def test_stdout_carries_only_the_scoreboard(
+    tmp_path, day_events, monkeypatch, capfd, workers
+):
+    log = tmp_path / "agent.log"
+    write_log(log, day_events[:3000])
+
+    # detectors print as they go (ReentryClassifier); workers fork, so
+    # they inherit the patch
+    detect = sweep.detect
+
+    def noisy(events):
+        print("[REENTRY START]")
+        return detect(events)
+
+    monkeypatch.setattr(sweep, "detect", noisy)
+
+    args = [str(log), "-w", workers]
+    for name, values in GRID.items():
+        args += ["-p", f"{name}={','.join(map(str, values))}"]
+    sweep.main(args)
+
+    rows = list(csv.reader(io.StringIO(capfd.readouterr().out)))
+    assert rows[0][:2] == list(GRID)
+    assert len(rows) == 5
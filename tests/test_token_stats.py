@@ -0,0 +1,44 @@
+import math
+
+from context_engine.runtime.token_stats import IDF_FORGET, REBASE_LIMIT, TokenStats
+
+
+def test_frequency_decays_with_half_life():
+    stats = TokenStats(half_life=10.0)
+
+    stats.add(["old"], 0.0)
+    stats.add(["new"], 10.0)
+
+    # a sighting one half-life older counts half as much
+    assert math.isclose(stats.frequency("old"), 1 / 3)
+    assert math.isclose(stats.frequency("new"), 2 / 3)
+    assert stats.frequency("unseen") == 0.0
+
+
+def test_rebase_keeps_frequencies_and_forgets_faded_tokens():
+    stats = TokenStats(half_life=1.0)
+
+    stats.add(["faded"], 0.0)
+    stats.add(["kept"], 5.0)
+
+    # far enough ahead that the stored gain would pass REBASE_LIMIT
+    ts = math.log2(REBASE_LIMIT) + 1
+    stats.add(["kept"], ts)
+
+    assert stats.origin == ts
+    assert "faded" not in stats.weights
+    assert all(w >= IDF_FORGET for w in stats.weights.values())
+    assert math.isclose(stats.frequency("kept"), 1.0, rel_tol=1e-6)
+
+
+def test_vocabulary_is_capped_at_max_tokens():
+    stats = TokenStats(max_tokens=100)
+
+    for i in range(1000):
+        stats.add([f"t{i}", "common"], float(i))
+        assert len(stats) <= 100
+
+    # the frequent token survives pruning, and pruned tokens keep
+    # their share of the total
+    assert "common" in stats.weights
+    assert stats.frequency("common") < 0.5
@@ -0,0 +1,64 @@
+import math
+import random
+from collections import Counter
+
+from context_engine.runtime.window_stats import WindowStats
+from context_engine.state.event import Event
+
+
+CONTEXTS = [
+    ("Code", "loop_detector.py"),
+    ("Code", "event_bus.py"),
+    ("Firefox", "deque docs"),
+    ("Terminal", ""),
+    ("", "untitled"),
+]
+
+
+def rescan(events):
+    events = list(events)
+
+    switches = sum(
+        1
+        for a, b in zip(events, events[1:])
+        if (a.app, a.title) != (b.app, b.title)
+    )
+
+    titles = Counter(e.title for e in events if e.title)
+    n = sum(titles.values())
+    entropy = -sum(c / n * math.log2(c / n) for c in titles.values()) if n else 0
+
+    transitions = Counter((a.app, b.app) for a, b in zip(events, events[1:]) if a.app)
+    total = sum(transitions.values())
+    dominant = max(transitions.values()) / total if total else 0
+
+    run = len(events) - 1
+    while run > 0 and (events[run - 1].app, events[run - 1].title) == (
+        events[-1].app,
+        events[-1].title,
+    ):
+        run -= 1
+    duration = events[-1].ts - events[run].ts if events else 0
+
+    return switches, entropy, dominant, duration
+
+
+def test_incremental_metrics_match_full_rescan():
+    rng = random.Random(3)
+    window = WindowStats()
+
+    ts = 0.0
+    for _ in range(3000):
+        ts += rng.choice([0.5, 1.0, 3.0])
+        window.push(Event(ts, *rng.choice(CONTEXTS), 0.0))
+
+        # evict by time and, now and then, by size
+        limit = rng.choice([8, 60])
+        while ts - window.events[0].ts > 40 or len(window) > limit:
+            window.popleft()
+
+        switches, entropy, dominant, duration = rescan(window.events)
+        assert window.switches == switches
+        assert math.isclose(window.title_entropy(), entropy, abs_tol=1e-9)
+        assert math.isclose(window.dominant_share(), dominant)
+        assert window.run_duration() == duration